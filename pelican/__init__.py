@@ -1,15 +1,86 @@
 """Pelican - Modern database migrations for Python."""
 
-from .runner import MigrationRunner
-from ._context import use_context, get_runner, get_registry
-from .schema import create_table, change_table, drop_table
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-from importlib.metadata import version, PackageNotFoundError
+if TYPE_CHECKING:
+    from .runner import MigrationRunner
+    from ._context import use_context, get_runner, get_registry
+    from .check import is_up_to_date
+    from .schema import (
+        create_table,
+        change_table,
+        drop_table,
+        create_tables,
+        drop_tables,
+        vacuum,
+        reindex,
+        bulk_insert,
+        range_,
+        list_,
+        hash_,
+        create_partition,
+        attach_partition,
+        detach_partition,
+        create_future_partitions,
+        drop_expired_partitions,
+    )
+
+# Resolved on first access so `import pelican` (and the CLI) don't pay for
+# SQLAlchemy until something actually needs it.
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "MigrationRunner": ".runner",
+    "use_context": "._context",
+    "get_runner": "._context",
+    "get_registry": "._context",
+    "is_up_to_date": ".check",
+    "create_table": ".schema",
+    "change_table": ".schema",
+    "drop_table": ".schema",
+    "create_tables": ".schema",
+    "drop_tables": ".schema",
+    "vacuum": ".schema",
+    "reindex": ".schema",
+    "bulk_insert": ".schema",
+    "range_": ".schema",
+    "list_": ".schema",
+    "hash_": ".schema",
+    "create_partition": ".schema",
+    "attach_partition": ".schema",
+    "detach_partition": ".schema",
+    "create_future_partitions": ".schema",
+    "drop_expired_partitions": ".schema",
+}
+
+
+def _get_version() -> str:
+    from importlib.metadata import version, PackageNotFoundError
+
+    try:
+        return version("pelican")
+    except PackageNotFoundError:
+        from pelican._version import version as fallback
+
+        return fallback
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        value = globals()["__version__"] = _get_version()
+        return value
+
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _LAZY_ATTRIBUTES.keys() | {"__version__"})
 
-try:
-    __version__ = version("pelican")
-except PackageNotFoundError:
-    from pelican._version import version as __version__
 
 __all__ = [
     "__version__",
@@ -17,7 +88,21 @@ __all__ = [
     "use_context",
     "get_runner",
     "get_registry",
+    "is_up_to_date",
     "create_table",
     "change_table",
     "drop_table",
+    "create_tables",
+    "drop_tables",
+    "vacuum",
+    "reindex",
+    "bulk_insert",
+    "range_",
+    "list_",
+    "hash_",
+    "create_partition",
+    "attach_partition",
+    "detach_partition",
+    "create_future_partitions",
+    "drop_expired_partitions",
 ]
@@ -1,13 +1,16 @@
 from contextvars import ContextVar
 from contextlib import contextmanager
-from typing import Iterator
+from typing import TYPE_CHECKING, Any, Iterator
 
-from sqlalchemy import MetaData
-
-from .runner import MigrationRunner
 from .registry import MigrationRegistry
 
-_active_runner: ContextVar[MigrationRunner | None] = ContextVar(
+if TYPE_CHECKING:
+    from sqlalchemy import MetaData
+    from sqlalchemy.engine import Connection, Engine
+
+    from .runner import MigrationRunner
+
+_active_runner: ContextVar["MigrationRunner | None"] = ContextVar(
     "active_runner", default=None
 )
 _active_registry: ContextVar[MigrationRegistry | None] = ContextVar(
@@ -15,7 +18,7 @@ _active_registry: ContextVar[MigrationRegistry | None] = ContextVar(
 )
 
 
-def get_runner() -> MigrationRunner:
+def get_runner() -> "MigrationRunner":
     """Return the active `MigrationRunner` for the current context.
 
     ## Example
@@ -62,8 +65,12 @@ def get_registry() -> MigrationRegistry:
 def use_context(
     *,
     database_url: str | None = None,
-    metadata: MetaData | None = None,
-) -> Iterator[MigrationRunner]:
+    metadata: "MetaData | None" = None,
+    engine: "Engine | None" = None,
+    connection: "Connection | None" = None,
+    engine_options: dict[str, Any] | None = None,
+    schema: str | None = None,
+) -> Iterator["MigrationRunner"]:
     """Activate a runner and registry for the duration of a `with` block.
 
     ## Example
@@ -77,8 +84,25 @@ def use_context(
         for migration in registry:
             runner.upgrade(migration)
     ```
+
+    To run inside an application that already has an engine, pass it (or
+    an open `connection`) instead of a URL so no second pool is created:
+
+    ```python
+    with use_context(engine=app.engine) as runner:
+        ...
+    ```
     """
-    active = MigrationRunner(database_url=database_url, metadata=metadata)
+    from .runner import MigrationRunner
+
+    active = MigrationRunner(
+        database_url=database_url,
+        metadata=metadata,
+        engine=engine,
+        connection=connection,
+        engine_options=engine_options,
+        schema=schema,
+    )
     registry = MigrationRegistry()
 
     r_token = _active_runner.set(active)
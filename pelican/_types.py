@@ -1,5 +1,12 @@
-from dataclasses import dataclass
-from typing import Any, Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Literal, get_args
+
+if TYPE_CHECKING:
+    from .watchdog import BlockingReport
+
+MigrationPhase = Literal["pre", "post"]
+
+PHASES: tuple[MigrationPhase, ...] = get_args(MigrationPhase)
 
 
 class MigrationError(Exception):
@@ -10,12 +17,190 @@ class DuplicateMigrationError(MigrationError):
     pass
 
 
-@dataclass
+class MigrationBatchError(MigrationError):
+    """A migration in a batch failed; the ones before it stay committed.
+
+    `index_failures` holds index builds of those earlier migrations that
+    failed after they committed.
+    """
+
+    def __init__(
+        self,
+        migration: "Migration",
+        completed: list["Migration"],
+        index_failures: dict[str, BaseException] | None = None,
+    ) -> None:
+        super().__init__(
+            f"Migration {migration.revision} failed "
+            f"after {len(completed)} completed migration(s)"
+        )
+        self.migration = migration
+        self.completed = completed
+        self.index_failures = index_failures or {}
+
+
+class LockContentionError(MigrationError):
+    """The lock watchdog cancelled a statement that was blocking other sessions."""
+
+    def __init__(self, report: "BlockingReport") -> None:
+        super().__init__(
+            f"Statement cancelled after blocking {len(report.blocked)} session(s) "
+            f"for {report.blocking_ms:.0f}ms: {report.statement}"
+        )
+        self.report = report
+
+
+class IntegrityCheckError(MigrationError):
+    """A migrated copy failed its integrity or foreign key check."""
+
+    def __init__(self, problems: list[str]) -> None:
+        super().__init__(
+            "Migrated copy failed its checks: "
+            + "; ".join(problems[:5])
+            + (f" (and {len(problems) - 5} more)" if len(problems) > 5 else "")
+        )
+        self.problems = problems
+
+
+class IndexBuildError(MigrationError):
+    """Index builds that ran after their migration committed failed.
+
+    `failures` maps each failed index to its error; `built` lists the ones
+    that succeeded.
+    """
+
+    def __init__(self, failures: dict[str, BaseException], built: list[str]) -> None:
+        super().__init__(
+            f"{len(failures)} index build(s) failed: "
+            + "; ".join(f"{name}: {error}" for name, error in failures.items())
+        )
+        self.failures = failures
+        self.built = built
+
+
+def parse_file_name(file_name: str) -> tuple[int, str]:
+    """Split a `<revision>_<name>.py` file name into its revision and name."""
+    base_name = Path(file_name).stem
+
+    try:
+        revision_str, name = base_name.split("_", 1)
+        revision = int(revision_str)
+    except ValueError:
+        raise ValueError(
+            f"Invalid migration file name '{file_name}'. "
+            "Expected format: <revision>_<name>.py"
+        )
+    return revision, name
+
+
 class Migration:
-    name: str
-    revision: int
-    up: Callable[..., Any] | None = None
-    down: Callable[..., Any] | None = None
+    """A migration revision and its `up`/`down` functions.
+
+    A migration registered from a file path is lazy: its module is only
+    imported the first time `up` or `down` is read.
+
+    `phase` is `"pre"` for migrations the next release depends on, and
+    `"post"` for work that can run after it is deployed (index builds,
+    backfills).
+    """
+
+    __slots__ = (
+        "name",
+        "revision",
+        "path",
+        "_up",
+        "_down",
+        "_touches",
+        "_phase",
+        "_profile",
+        "_jobs",
+        "_loaded",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        revision: int,
+        up: Callable[..., Any] | None = None,
+        down: Callable[..., Any] | None = None,
+        path: Path | None = None,
+    ) -> None:
+        self.name = name
+        self.revision = revision
+        self.path = path
+        self._up = up
+        self._down = down
+        self._touches: frozenset[str] | None = None
+        self._phase: MigrationPhase = "pre"
+        self._profile: str | None = None
+        self._jobs: dict[str, Callable[..., Any]] = {}
+        self._loaded = path is None
+
+    @classmethod
+    def from_path(cls, path: Path) -> "Migration":
+        revision, name = parse_file_name(path.name)
+        return cls(name=name, revision=revision, path=path)
+
+    @property
+    def up(self) -> Callable[..., Any] | None:
+        self.load()
+        return self._up
+
+    @up.setter
+    def up(self, func: Callable[..., Any] | None) -> None:
+        self._up = func
+
+    @property
+    def down(self) -> Callable[..., Any] | None:
+        self.load()
+        return self._down
+
+    @down.setter
+    def down(self, func: Callable[..., Any] | None) -> None:
+        self._down = func
+
+    @property
+    def touches(self) -> frozenset[str] | None:
+        """Tables declared with `@migration.touches`, or `None` if undeclared."""
+        self.load()
+        return self._touches
+
+    @touches.setter
+    def touches(self, tables: frozenset[str] | None) -> None:
+        self._touches = tables
+
+    @property
+    def profile(self) -> str | None:
+        """Tuning profile to apply while `up` runs, if any."""
+        self.load()
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile: str | None) -> None:
+        self._profile = profile
+
+    @property
+    def jobs(self) -> dict[str, Callable[..., Any]]:
+        """Background job functions declared with `@migration.job`, by name."""
+        self.load()
+        return self._jobs
+
+    @property
+    def phase(self) -> MigrationPhase:
+        self.load()
+        return self._phase
+
+    @phase.setter
+    def phase(self, phase: MigrationPhase) -> None:
+        if phase not in PHASES:
+            raise ValueError(
+                f"Invalid migration phase '{phase}'. Expected one of: {', '.join(PHASES)}"
+            )
+        self._phase = phase
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
 
     @property
     def display_name(self) -> str:
@@ -24,3 +209,48 @@ class Migration:
     @property
     def file_name(self) -> str:
         return f"{self.revision}_{self.name}.py"
+
+    def load(self) -> None:
+        """Import the migration module, registering its functions on this migration."""
+        if self._loaded or self.path is None:
+            return
+
+        # Deferred: the loader depends on the registry context, which depends on us
+        from .loader import load_migration_file
+
+        self._loaded = True
+        try:
+            load_migration_file(self.path)
+        except BaseException:
+            self._loaded = False
+            raise
+
+    def release(self) -> None:
+        """Drop the loaded module and functions; they are re-imported on next use.
+
+        Migrations that weren't registered from a file are left untouched,
+        since there would be nothing to reload them from.
+        """
+        if self.path is None or not self._loaded:
+            return
+
+        from .loader import unload_migration_file
+
+        unload_migration_file(self.path)
+        self._up = self._down = None
+        self._touches = None
+        self._phase = "pre"
+        self._profile = None
+        self._jobs = {}
+        self._loaded = False
+
+    def attach(self, direction: str, func: Callable[..., Any]) -> None:
+        attr = f"_{direction}"
+        if getattr(self, attr) is not None:
+            raise DuplicateMigrationError(
+                f"'{direction}' migration already registered for revision {self.revision}"
+            )
+        setattr(self, attr, func)
+
+    def __repr__(self) -> str:
+        return f"Migration(revision={self.revision!r}, name={self.name!r})"
@@ -0,0 +1,142 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from ._context import get_runner
+from ._types import MigrationPhase, parse_file_name
+from .loader import get_head_revision
+from .manifest import Manifest, find_phase, scan_migration_files
+
+
+@dataclass(frozen=True)
+class SchemaStatus:
+    """Latest revision on disk versus latest revision applied to the database.
+
+    Only the two heads are compared, so a pending migration older than the
+    applied head isn't noticed; `pelican status` lists those.
+
+    `required_revision` is the newest revision the database must have
+    reached, when that isn't the disk head: a pre-deploy check leaves
+    newer post-deploy migrations pending.
+    """
+
+    disk_revision: int | None
+    database_revision: int | None
+    required_revision: int | None = None
+
+    @property
+    def is_up_to_date(self) -> bool:
+        return not self.is_ahead and not self.is_pending
+
+    @property
+    def is_pending(self) -> bool:
+        required = (
+            self.disk_revision
+            if self.required_revision is None
+            else self.required_revision
+        )
+        return (required or 0) > (self.database_revision or 0)
+
+    @property
+    def is_ahead(self) -> bool:
+        """Whether the database has a revision newer than any file on disk."""
+        return (self.database_revision or 0) > (self.disk_revision or 0)
+
+
+def get_schema_status(
+    migrations_dir: str | Path = "db/migrations",
+    *,
+    phase: MigrationPhase | None = None,
+    manifest_path: str | Path | None = None,
+) -> SchemaStatus:
+    """Compare heads using file names and one `MAX(version)` query.
+
+    No migration module is imported and no table is reflected. A missing
+    migrations directory counts as having no migrations. With
+    `phase="pre"`, pending post-deploy migrations are ignored; their phase
+    is read from the source of the files newer than the database head.
+    With `manifest_path`, revisions and phases come from the `Manifest`,
+    so unchanged files aren't read at all.
+    """
+    if manifest_path is not None:
+        return _status_from_manifest(migrations_dir, manifest_path, phase)
+
+    try:
+        disk_revision = get_head_revision(migrations_dir)
+    except FileNotFoundError:
+        disk_revision = None
+
+    database_revision = get_runner().get_head_version()
+    required_revision = None
+    if phase == "pre" and disk_revision is not None:
+        required_revision = _latest_pre_deploy(Path(migrations_dir), database_revision)
+
+    return SchemaStatus(disk_revision, database_revision, required_revision)
+
+
+def is_up_to_date(
+    migrations_dir: str | Path = "db/migrations",
+    *,
+    phase: MigrationPhase | None = None,
+    manifest_path: str | Path | None = None,
+) -> bool:
+    """Whether the database is at the latest revision on disk.
+
+    With `phase="pre"`, pending post-deploy migrations don't count, so a
+    readiness probe passes after `pelican up --phase pre`.
+
+    ## Example
+
+    ```python
+    from pelican import use_context, is_up_to_date
+
+    with use_context():
+        if not is_up_to_date():
+            raise SystemExit("Run 'pelican up' first.")
+    ```
+    """
+    return get_schema_status(
+        migrations_dir, phase=phase, manifest_path=manifest_path
+    ).is_up_to_date
+
+
+def _status_from_manifest(
+    migrations_dir: str | Path,
+    manifest_path: str | Path,
+    phase: MigrationPhase | None,
+) -> SchemaStatus:
+    try:
+        entries = list(Manifest.open(migrations_dir, manifest_path))
+    except FileNotFoundError:
+        entries = []
+
+    disk_revision = entries[-1].revision if entries else None
+    database_revision = get_runner().get_head_version()
+    required_revision = None
+    if phase == "pre" and disk_revision is not None:
+        required_revision = max(
+            (
+                entry.revision
+                for entry in entries
+                if entry.phase == "pre" and entry.revision > (database_revision or 0)
+            ),
+            default=0,
+        )
+
+    return SchemaStatus(disk_revision, database_revision, required_revision)
+
+
+def _latest_pre_deploy(migrations_dir: Path, database_revision: int | None) -> int:
+    # Only files newer than the database head can be pending; 0 if none
+    # of them is a pre-deploy migration.
+    newer = sorted(
+        (
+            (revision, entry.path)
+            for entry in scan_migration_files(migrations_dir)
+            if (revision := parse_file_name(entry.name)[0]) > (database_revision or 0)
+        ),
+        reverse=True,
+    )
+    for revision, path in newer:
+        if find_phase(Path(path).read_bytes()) == "pre":
+            return revision
+    return 0
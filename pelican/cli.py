@@ -1,16 +1,97 @@
+import json
 import sys
+from collections.abc import Callable, Iterator, Mapping
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import click
 from click import group, argument, option, echo, style, pass_context, Context
 
 from pelican._context import use_context, get_runner
-from pelican.runner import MigrationRunner
 from pelican.registry import MigrationRegistry
+from pelican._types import (
+    PHASES,
+    IndexBuildError,
+    IntegrityCheckError,
+    Migration,
+    MigrationBatchError,
+    MigrationPhase,
+)
 from pelican import loader
+from pelican.check import get_schema_status
+from pelican.config import WorkerConfig, load_config
+from pelican.manifest import DEFAULT_MANIFEST_PATH, Manifest
+
+if TYPE_CHECKING:
+    from pelican.fanout import TargetResult
+    from pelican.jobs import Job
+    from pelican.watchdog import BlockingReport
+    from pelican.runner import MigrationRunner
+
+
+def _activate_context(exit_code: int = 1) -> "_CliState":
+    # Commands that never touch the database (init, help, blank generate)
+    # skip this, so the runner and SQLAlchemy are only imported here.
+    ctx = click.get_current_context()
+    state = ctx.ensure_object(_CliState)
+    if not state.active:
+        try:
+            config = load_config()
+            state.engine_options = config.engine.to_engine_options()
+            state.worker = config.worker
+            state.profiles = config.profiles
+        except ValueError as e:
+            echo(style("Error:", fg="red") + f" {e}", err=True)
+            sys.exit(exit_code)
+
+        runner = ctx.with_resource(
+            use_context(
+                database_url=state.database_url or config.database_url,
+                engine_options=state.engine_options,
+            )
+        )
+        runner.profiles = dict(config.profiles)
+        if config.watchdog.enabled:
+            from pelican.watchdog import LockWatchdog
+
+            runner.lock_watchdog = LockWatchdog(
+                max_blocked=config.watchdog.max_blocked,
+                max_blocking_ms=config.watchdog.max_blocking_ms,
+                retries=config.watchdog.retries,
+                on_report=_report_blocking,
+            )
+        if config.throttle.limits:
+            from pelican.throttle import Throttler
+
+            try:
+                runner.throttler = Throttler.from_limits(
+                    config.throttle.limits,
+                    max_delay=config.throttle.max_delay,
+                    on_pause=_report_throttle,
+                )
+            except ValueError as e:
+                echo(style("Error:", fg="red") + f" {e}", err=True)
+                sys.exit(exit_code)
+        state.active = True
+    return state
+
+
+def _report_blocking(report: "BlockingReport") -> None:
+    echo(
+        style("Cancelled:", fg="yellow")
+        + f" {report.statement} blocked {len(report.blocked)} session(s) "
+        f"for {report.blocking_ms:.0f}ms",
+        err=True,
+    )
+    for session in report.blocked:
+        echo(
+            f"  pid {session.pid} waited {session.waiting_ms:.0f}ms: {session.query}",
+            err=True,
+        )
 
 
-def _load_or_exit() -> tuple[MigrationRunner, MigrationRegistry]:
+def _runner_or_exit(exit_code: int = 1) -> "MigrationRunner":
+    _activate_context(exit_code)
     runner = get_runner()
 
     if not runner.has_database_url:
@@ -19,10 +100,14 @@ def _load_or_exit() -> tuple[MigrationRunner, MigrationRegistry]:
             + " DATABASE_URL is not set. Set it in your environment or .env file.",
             err=True,
         )
-        sys.exit(1)
+        sys.exit(exit_code)
+
+    return runner
 
+
+def _registry_or_exit() -> MigrationRegistry:
     try:
-        registry = loader.load_migrations()
+        return loader.load_migrations(manifest_path=DEFAULT_MANIFEST_PATH)
     except FileNotFoundError:
         echo(
             "No migrations directory found. "
@@ -30,7 +115,19 @@ def _load_or_exit() -> tuple[MigrationRunner, MigrationRegistry]:
         )
         sys.exit(0)
 
-    return runner, registry
+
+def _load_or_exit() -> tuple["MigrationRunner", MigrationRegistry]:
+    runner = _runner_or_exit()
+    return runner, _registry_or_exit()
+
+
+class _CliState:
+    def __init__(self, database_url: str | None = None) -> None:
+        self.database_url = database_url
+        self.engine_options: dict[str, Any] = {}
+        self.worker = WorkerConfig()
+        self.profiles: dict[str, dict[str, Any]] = {}
+        self.active = False
 
 
 @group()
@@ -38,7 +135,7 @@ def _load_or_exit() -> tuple[MigrationRunner, MigrationRegistry]:
 @pass_context
 def cli(ctx: Context, database_url: str | None) -> None:
     """Pelican - Modern database migrations for SQLAlchemy"""
-    ctx.with_resource(use_context(database_url=database_url))
+    ctx.obj = _CliState(database_url)
 
 
 @cli.command()
@@ -85,57 +182,419 @@ def generate(name: str, models_path: str | None) -> None:
 
 @cli.command()
 @argument("revision", nargs=1, default=None, required=False, type=int)
-def up(revision: int | None) -> None:
+@option(
+    "--to",
+    "target",
+    default=None,
+    type=int,
+    help="Apply every pending migration up to and including this revision.",
+)
+@option(
+    "--stream",
+    is_flag=True,
+    help="Release each migration's module and metadata after applying it.",
+)
+@option(
+    "--phase",
+    default=None,
+    type=click.Choice(PHASES),
+    help="Only apply pre-deploy or post-deploy migrations.",
+)
+@option(
+    "--profile",
+    default=None,
+    metavar="NAME",
+    help="Apply this tuning profile to migrations that don't name their own.",
+)
+@option(
+    "--parallel",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Run up to this many migrations on disjoint tables at once.",
+)
+@option(
+    "--index-jobs",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Build up to this many concurrent indexes on different tables at once.",
+)
+@option(
+    "--analyze",
+    is_flag=True,
+    help="Afterwards, refresh planner statistics of the tables migrations changed.",
+)
+@option(
+    "--vacuum",
+    is_flag=True,
+    help="Like --analyze, but VACUUM (ANALYZE) the tables.",
+)
+@option(
+    "--fast-swap",
+    is_flag=True,
+    help="SQLite only: migrate a copy of the database file, then swap it in.",
+)
+@option(
+    "--targets",
+    "targets_file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Migrate every database URL listed in this file instead of DATABASE_URL.",
+)
+@option(
+    "--tenants",
+    "tenant_pattern",
+    default=None,
+    metavar="PATTERN",
+    help="Migrate every PostgreSQL schema matching this LIKE pattern (e.g. 'tenant_%').",
+)
+@option(
+    "--jobs",
+    default=4,
+    type=click.IntRange(min=1),
+    help="With --targets or --tenants, how many to migrate at once.",
+)
+@option(
+    "--canary",
+    is_flag=True,
+    help="With --targets, migrate the first target alone before the others.",
+)
+def up(
+    revision: int | None,
+    target: int | None,
+    stream: bool,
+    phase: MigrationPhase | None,
+    profile: str | None,
+    parallel: int,
+    index_jobs: int,
+    analyze: bool,
+    vacuum: bool,
+    fast_swap: bool,
+    targets_file: Path | None,
+    tenant_pattern: str | None,
+    jobs: int,
+    canary: bool,
+) -> None:
     """Upgrade the migration to the given or latest revision."""
-    runner, registry = _load_or_exit()
+    if revision and target is not None:
+        raise click.UsageError("Pass either REVISION or --to, not both.")
+    if revision and phase is not None:
+        raise click.UsageError("Pass either REVISION or --phase, not both.")
+    if parallel > 1 and stream:
+        raise click.UsageError("--parallel can't be combined with --stream.")
+    if parallel > 1 and fast_swap:
+        raise click.UsageError("--parallel can't be combined with --fast-swap.")
+
+    if targets_file is not None or tenant_pattern is not None:
+        if (
+            revision
+            or stream
+            or parallel > 1
+            or profile
+            or fast_swap
+            or analyze
+            or vacuum
+            or index_jobs > 1
+            or (targets_file and tenant_pattern)
+        ):
+            raise click.UsageError(
+                "--targets and --tenants can't be combined with each other, "
+                "REVISION, --stream, --profile, --fast-swap, --analyze, "
+                "--vacuum, --index-jobs or --parallel."
+            )
+        if targets_file is not None:
+            _up_targets(targets_file, target, phase, jobs, canary)
+        else:
+            _up_tenants(tenant_pattern or "%", target, phase, jobs)
+        return
 
-    if revision:
-        migration = registry.get(revision)
-        if not migration:
-            echo(f"Migration {revision} not found.")
-            sys.exit(1)
-        applied = list(runner.get_applied_versions())
-        if migration.revision in applied:
-            echo(f"Migration {revision} is already applied.")
+    runner, registry = _load_or_exit()
+    _use_profile_or_exit(runner, profile)
+    runner.index_jobs = index_jobs
+
+    with runner.connect():
+        applied = set(runner.get_applied_versions())
+
+        if revision:
+            migration = _get_or_exit(registry, revision)
+            if migration.revision in applied:
+                echo(f"Migration {revision} is already applied.")
+                return
+            migrations = [migration]
+        else:
+            migrations = registry.pending(applied)
+            if target is not None:
+                _get_or_exit(registry, target)
+                migrations = [m for m in migrations if m.revision <= target]
+            if phase == "post" and any(m.phase == "pre" for m in migrations):
+                echo(
+                    style("Error:", fg="red") + " Pre-deploy migrations are pending; "
+                    "run 'pelican up --phase pre' first.",
+                    err=True,
+                )
+                sys.exit(1)
+            if phase is not None:
+                migrations = [m for m in migrations if m.phase == phase]
+
+        if not migrations:
+            echo("No migration(s) to apply.")
             return
-        migrations = [migration]
-    else:
-        applied = list(runner.get_applied_versions())
-        migrations = [m for m in registry.get_all() if m.revision not in applied]
 
-    if not migrations:
-        echo("No migration(s) to apply.")
+        reached: Callable[[list[Migration]], int | None] = lambda done: max(
+            applied | {m.revision for m in done}, default=None
+        )
+        if fast_swap:
+            _up_fast_swap(runner, migrations, stream, reached)
+        else:
+            batch = (
+                runner.upgrade_parallel(migrations, jobs=parallel)
+                if parallel > 1
+                else runner.upgrade_many(migrations, release=stream)
+            )
+            _run_batch(batch, "Applied", reached)
+
+    if analyze or vacuum:
+        tables = runner.maintain(vacuum=vacuum)
+        if tables:
+            verb = "Vacuumed" if vacuum else "Analyzed"
+            echo(f"{verb} {len(tables)} table(s): {', '.join(tables)}")
+
+
+def _up_fast_swap(
+    runner: "MigrationRunner",
+    migrations: list[Migration],
+    stream: bool,
+    reached: Callable[[list[Migration]], int | None],
+) -> None:
+    from pelican.swap import fast_swap, sqlite_path
+
+    try:
+        path = sqlite_path(runner.engine.url)
+        _run_batch(fast_swap(runner, migrations, release=stream), "Applied", reached)
+    except (ValueError, IntegrityCheckError) as e:
+        echo(style("Error:", fg="red") + f" {e}", err=True)
+        echo("The database was left unchanged.", err=True)
+        sys.exit(1)
+    echo(f"Swapped the migrated copy into {path}.")
+
+
+def _up_targets(
+    targets_file: Path,
+    up_to: int | None,
+    phase: MigrationPhase | None,
+    jobs: int,
+    canary: bool,
+) -> None:
+    from pelican.fanout import fan_out, read_targets
+
+    state = _activate_context()
+    registry = _registry_or_exit()
+
+    urls = read_targets(targets_file)
+    if not urls:
+        echo(f"No targets found in {targets_file}.")
         return
+    if up_to is not None:
+        _get_or_exit(registry, up_to)
+
+    results = fan_out(
+        urls,
+        registry,
+        jobs=jobs,
+        canary=canary,
+        up_to=up_to,
+        phase=phase,
+        engine_options=state.engine_options,
+        profiles=state.profiles,
+        throttler=get_runner().throttler,
+        on_result=_report_target,
+    )
+    _summarize_targets(results)
+
+
+def _up_tenants(
+    pattern: str, up_to: int | None, phase: MigrationPhase | None, jobs: int
+) -> None:
+    from pelican.tenants import discover_schemas, migrate_schemas
+
+    runner = _runner_or_exit()
+    registry = _registry_or_exit()
+
+    schemas = discover_schemas(runner.engine, pattern)
+    if not schemas:
+        echo(f"No schemas match '{pattern}'.")
+        return
+    if up_to is not None:
+        _get_or_exit(registry, up_to)
+
+    results = migrate_schemas(
+        schemas,
+        registry,
+        engine=runner.engine,
+        jobs=jobs,
+        up_to=up_to,
+        phase=phase,
+        profiles=runner.profiles,
+        throttler=runner.throttler,
+        on_result=_report_target,
+    )
+    _summarize_targets(results)
+
 
-    for migration in migrations:
-        runner.upgrade(migration)
+def _use_profile_or_exit(runner: "MigrationRunner", profile: str | None) -> None:
+    if profile is None:
+        return
+    try:
+        runner.get_profile(profile)
+    except ValueError as e:
+        echo(style("Error:", fg="red") + f" {e}", err=True)
+        sys.exit(1)
+    runner.profile = profile
+
+
+def _summarize_targets(results: list["TargetResult"]) -> None:
+    counts = {
+        status: sum(1 for r in results if r.status == status)
+        for status in ("applied", "up-to-date", "failed", "skipped")
+    }
+    echo(
+        f"\n{counts['applied']} migrated, {counts['up-to-date']} up to date, "
+        f"{counts['failed']} failed, {counts['skipped']} skipped"
+    )
+    if counts["failed"]:
+        sys.exit(1)
+
+
+def _report_target(result: "TargetResult") -> None:
+    elapsed = f"({result.elapsed:.1f}s)"
+
+    if result.status == "applied":
+        echo(
+            f"  {style('✓', fg='green')} {result.target} "
+            f"applied {len(result.applied)} migration(s) {elapsed}"
+        )
+    elif result.status == "up-to-date":
+        echo(f"  {style('✓', fg='green')} {result.target} up to date {elapsed}")
+    elif result.status == "failed":
+        where = (
+            f" at {result.failed_revision}"
+            if result.failed_revision is not None
+            else ""
+        )
         echo(
-            f"  {style('✓', fg='green')} Applied {migration.revision} {migration.display_name}"
+            f"  {style('✗', fg='red')} {result.target} failed{where}: {result.error} {elapsed}",
+            err=True,
         )
+    else:
+        echo(f"  {style('-', fg='yellow')} {result.target} skipped")
 
 
 @cli.command()
 @argument("revision", nargs=1, default=None, required=False, type=int)
-def down(revision: int | None) -> None:
+@option(
+    "--steps",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Roll back this many of the most recently applied revisions.",
+)
+@option(
+    "--to",
+    "target",
+    default=None,
+    type=int,
+    help="Roll back every revision after this one (0 rolls back everything).",
+)
+@option(
+    "--profile",
+    default=None,
+    metavar="NAME",
+    help="Apply this tuning profile while rolling back.",
+)
+def down(
+    revision: int | None, steps: int | None, target: int | None, profile: str | None
+) -> None:
     """Downgrade the migration to the given or latest revision."""
+    if sum(arg is not None for arg in (revision, steps, target)) > 1:
+        raise click.UsageError("Pass only one of REVISION, --steps or --to.")
+
     runner, registry = _load_or_exit()
+    _use_profile_or_exit(runner, profile)
 
-    if not revision:
-        applied = list(runner.get_applied_versions())
+    with runner.connect():
+        applied = sorted(runner.get_applied_versions(), reverse=True)
         if not applied:
             echo("No migrations have been applied.")
             return
-        revision = max(applied)
 
+        if revision:
+            revisions = [revision]
+        elif target is not None:
+            if target != 0:
+                _get_or_exit(registry, target)
+            revisions = [r for r in applied if r > target]
+        else:
+            revisions = applied[: steps or 1]
+
+        migrations = [_get_or_exit(registry, r) for r in revisions]
+        if not migrations:
+            echo("No migration(s) to roll back.")
+            return
+
+        _run_batch(
+            runner.downgrade_many(migrations),
+            "Rolled back",
+            lambda done: max(set(applied) - {m.revision for m in done}, default=None),
+        )
+
+
+def _get_or_exit(registry: MigrationRegistry, revision: int) -> Migration:
     migration = registry.get(revision)
     if not migration:
         echo(f"Migration {revision} not found.")
         sys.exit(1)
+    return migration
 
-    runner.downgrade(migration)
-    echo(
-        f"  {style('✓', fg='green')} Rolled back {migration.revision} {migration.display_name}"
-    )
+
+def _run_batch(
+    batch: Iterator[Migration],
+    verb: str,
+    reached: Callable[[list[Migration]], int | None],
+) -> None:
+    try:
+        for migration in batch:
+            echo(
+                f"  {style('✓', fg='green')} {verb} {migration.revision} {migration.display_name}"
+            )
+    except MigrationBatchError as e:
+        _report_index_failures(e.index_failures)
+        failed = e.migration
+        echo(
+            f"  {style('✗', fg='red')} Failed {failed.revision} {failed.display_name}: {e.__cause__}",
+            err=True,
+        )
+        head = reached(e.completed)
+        echo(
+            (
+                f"Stopped at revision {head}."
+                if head is not None
+                else "Stopped with no migrations applied."
+            ),
+            err=True,
+        )
+        sys.exit(1)
+    except IndexBuildError as e:
+        _report_index_failures(e.failures)
+        echo(
+            f"Migrations were applied, but {len(e.failures)} index build(s) failed.",
+            err=True,
+        )
+        sys.exit(1)
+
+
+def _report_index_failures(failures: Mapping[str, BaseException]) -> None:
+    for name, error in failures.items():
+        echo(
+            f"  {style('✗', fg='red')} Failed to build index {name}: {error}", err=True
+        )
 
 
 @cli.command()
@@ -144,20 +603,190 @@ def status() -> None:
     runner, registry = _load_or_exit()
 
     applied = set(runner.get_applied_versions())
+    # Phases come from the manifest, so pending modules aren't imported
+    phases = _manifest_phases()
 
     echo("\nMigration Status")
     echo("-" * 30)
 
+    pending = {"pre": 0, "post": 0}
     for migration in registry:
         is_applied = migration.revision in applied
         status_symbol = "✓" if is_applied else "○"
         color = "green" if is_applied else "yellow"
+        suffix = ""
+
+        if not is_applied:
+            phase = phases.get(migration.revision) or migration.phase
+            pending[phase] += 1
+            if phase == "post":
+                suffix = style(" (post-deploy)", fg="cyan")
 
         echo(
-            f"{style(status_symbol, fg=color)} {migration.revision} {migration.display_name}"
+            f"{style(status_symbol, fg=color)} {migration.revision} {migration.display_name}{suffix}"
         )
+
+    if pending["pre"] or pending["post"]:
+        echo(f"\nPending: {pending['pre']} pre-deploy, {pending['post']} post-deploy")
     echo()
 
+    from pelican import jobs
+
+    background_jobs = jobs.get_jobs(runner)
+    if background_jobs:
+        echo("Background Jobs")
+        echo("-" * 30)
+
+        done = [job for job in background_jobs if job.status == "done"]
+        for job in background_jobs:
+            if job.status != "done":
+                _report_job(job)
+        if done:
+            echo(f"{style('✓', fg='green')} {len(done)} job(s) done")
+        echo()
+
+
+def _manifest_phases() -> dict[int, MigrationPhase]:
+    try:
+        manifest = Manifest.open("db/migrations", DEFAULT_MANIFEST_PATH)
+    except FileNotFoundError:
+        return {}
+    return {entry.revision: entry.phase for entry in manifest}
+
+
+@cli.command()
+@option(
+    "--once",
+    is_flag=True,
+    help="Exit when no job can run instead of waiting for more.",
+)
+@option(
+    "--window",
+    "windows",
+    multiple=True,
+    metavar="HH:MM-HH:MM",
+    help="Only run jobs during this daily window; repeatable. "
+    "Overrides [tool.pelican.worker] windows.",
+)
+def worker(once: bool, windows: tuple[str, ...]) -> None:
+    """Run background jobs queued by migrations."""
+    import signal
+    from datetime import timedelta
+
+    from pelican.jobs import RunWindow, Worker
+
+    state = _activate_context()
+    runner, registry = _load_or_exit()
+
+    try:
+        run_windows = [RunWindow.parse(w) for w in windows or state.worker.windows]
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--window")
+
+    job_worker = Worker(
+        runner,
+        registry,
+        windows=run_windows,
+        poll_interval=state.worker.poll_interval,
+        lease=timedelta(seconds=state.worker.lease),
+        throttler=runner.throttler,
+    )
+
+    # Let the current batch commit before exiting on Ctrl+C or a deploy's SIGTERM.
+    previous = {
+        signum: signal.signal(signum, lambda *_: job_worker.stop())
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        echo(f"Worker {job_worker.worker_id} started.")
+        finished = job_worker.run(once=once, on_job=_report_job)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    echo(f"{finished} job(s) finished.")
+
+
+_JOB_SYMBOLS = {
+    "pending": ("○", "yellow"),
+    "running": ("●", "cyan"),
+    "done": ("✓", "green"),
+    "failed": ("✗", "red"),
+}
+
+
+def _report_throttle(exceeded: list[str], delay: float) -> None:
+    echo(f"  {style('…', fg='yellow')} throttled {delay:g}s: {', '.join(exceeded)}")
+
+
+def _report_job(job: "Job") -> None:
+    symbol, color = _JOB_SYMBOLS[job.status]
+    details = []
+    if job.checkpoint is not None and job.status != "done":
+        details.append(f"checkpoint {json.dumps(job.checkpoint)}")
+    if job.attempts:
+        details.append(f"attempt {job.attempts}/{job.max_attempts}")
+    if job.last_error and job.status != "done":
+        details.append(job.last_error)
+
+    suffix = f" ({', '.join(details)})" if details else ""
+    echo(
+        f"{style(symbol, fg=color)} {job.id} {job.name} [{job.revision}] {job.status}{suffix}"
+    )
+
+
+@cli.command()
+@option(
+    "--phase",
+    default=None,
+    type=click.Choice(PHASES),
+    help="With 'pre', pending post-deploy migrations don't count.",
+)
+def check(phase: MigrationPhase | None) -> None:
+    """Check that the database is at the latest revision.
+
+    Exits 0 when up to date, 1 when migrations are pending and 2 when the
+    state can't be determined or the database is ahead of the files.
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+
+    _runner_or_exit(exit_code=2)
+
+    try:
+        schema_status = get_schema_status(
+            phase=phase, manifest_path=DEFAULT_MANIFEST_PATH
+        )
+    except (SQLAlchemyError, ValueError) as e:
+        echo(style("Error:", fg="red") + f" {e}", err=True)
+        sys.exit(2)
+
+    database = schema_status.database_revision
+    disk = schema_status.disk_revision
+
+    if schema_status.is_up_to_date:
+        echo(
+            "Up to date, no migrations found."
+            if database is None
+            else f"Up to date at revision {database}."
+        )
+    elif schema_status.is_ahead:
+        echo(
+            style("Error:", fg="red")
+            + f" Database is at revision {database}, newer than the latest file ({disk}).",
+            err=True,
+        )
+        sys.exit(2)
+    else:
+        latest = (
+            disk
+            if schema_status.required_revision is None
+            else schema_status.required_revision
+        )
+        echo(
+            f"Pending migrations: database is at revision {database}, latest is {latest}."
+        )
+        sys.exit(1)
+
 
 def _confirm_renames(renames: list) -> list:
     confirmed = []
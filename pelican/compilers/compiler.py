@@ -1,25 +1,62 @@
+import re
 from abc import ABC, abstractmethod
-from typing import Any, Iterable
+from typing import Any, Collection, Iterable, NamedTuple
 from sqlalchemy.types import TypeEngine
 from sqlalchemy.engine import Engine
-from sqlalchemy.sql import Executable, DDLElement
-from sqlalchemy.schema import (
-    CreateColumn,
-    CreateIndex,
-    DDL,
-    DropIndex,
-)
-from sqlalchemy import (
-    text,
-    Table,
-    Column,
-    Index,
-    Double,
-    MetaData,
+from sqlalchemy.sql import Executable
+from sqlalchemy.schema import CreateColumn, DDL
+from sqlalchemy import text, Column
+
+_SETTING_NAME = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_$]*")
+_INDEX_ELEMENT = re.compile(
+    r"^\s*(?P<expression>.+?)"
+    r"(?:\s+(?P<opclass>[A-Za-z_]\w*_ops))?"
+    r"(?:\s+(?P<direction>ASC|DESC))?"
+    r"(?:\s+NULLS\s+(?P<nulls>FIRST|LAST))?\s*$",
+    re.IGNORECASE | re.DOTALL,
 )
 
 
+class IndexElement(NamedTuple):
+    """One entry of an index: a column or expression and how it's ordered."""
+
+    expression: str
+    opclass: str | None = None
+    descending: bool = False
+    nulls: str | None = None  # "FIRST" or "LAST"
+
+    @property
+    def is_column(self) -> bool:
+        return _IDENTIFIER.fullmatch(self.expression) is not None
+
+
+def split_index_element(element: str) -> IndexElement:
+    """Split `lower(name) text_pattern_ops DESC NULLS LAST` into its parts.
+
+    Operator classes are recognised by their `_ops` suffix.
+    """
+    match = _INDEX_ELEMENT.match(element)
+    if match is None:
+        raise ValueError("Index entries can't be empty")
+    return IndexElement(
+        match["expression"].strip(),
+        match["opclass"],
+        (match["direction"] or "").upper() == "DESC",
+        match["nulls"].upper() if match["nulls"] else None,
+    )
+
+
 class DialectCompiler(ABC):
+    # Whether a rollback undoes `set_setting`, so it needn't be restored by hand
+    settings_roll_back = False
+    # Whether indexes can be built and dropped without blocking writes
+    concurrent_indexes = False
+    # Whether foreign keys can be added to a table after it was created
+    alter_foreign_keys = False
+    # Whether indexes take operator classes, INCLUDE columns and USING methods
+    index_methods = False
+
     def __init__(self, engine: Engine) -> None:
         self.engine = engine
         self.dialect = engine.dialect
@@ -56,20 +93,226 @@ class DialectCompiler(ABC):
         index_name: str,
         column_names: list[str],
         unique: bool = False,
-    ) -> Iterable[DDLElement]:
-        metadata = MetaData()
-        table = Table(
-            table_name, metadata, autoload_with=self.engine, extend_existing=True
+        concurrently: bool = False,
+        *,
+        where: str | None = None,
+        include: list[str] | None = None,
+        using: str | None = None,
+        table_columns: Collection[str] = (),
+    ) -> Iterable[DDL]:
+        """Compile `CREATE INDEX` from names alone, without reflecting the table.
+
+        Each entry is a column or an expression, optionally followed by an
+        operator class, `ASC`/`DESC` and `NULLS FIRST`/`NULLS LAST`. Entries
+        naming one of `table_columns`, or a bare identifier, are quoted as
+        columns; anything else is an expression. `where` makes a partial
+        index. `concurrently` is ignored by dialects without
+        `concurrent_indexes`; `include`, `using` and operator classes need
+        `index_methods`.
+        """
+        elements = [split_index_element(name) for name in column_names]
+        if not self.index_methods and (
+            include or using or any(e.opclass for e in elements)
+        ):
+            raise NotImplementedError(
+                f"{self.dialect.name} does not support operator classes, "
+                "INCLUDE columns or index access methods"
+            )
+
+        if using and not _IDENTIFIER.fullmatch(using):
+            raise ValueError(f"Invalid index access method '{using}'")
+
+        columns = ", ".join(
+            self.index_element(
+                element, element.is_column or element.expression in table_columns
+            )
+            for element in elements
+        )
+        unique_part = "UNIQUE " if unique else ""
+        concurrently_part = (
+            "CONCURRENTLY " if concurrently and self.concurrent_indexes else ""
+        )
+        using_part = f" USING {using}" if using else ""
+        include_part = (
+            f" INCLUDE ({', '.join(self.quote(name) for name in include)})"
+            if include
+            else ""
+        )
+        # DDL statements are %-formatted at compile time
+        where_part = f" WHERE {where.replace('%', '%%')}" if where else ""
+
+        return [
+            DDL(
+                f"CREATE {unique_part}INDEX {concurrently_part}{self.quote(index_name)} "
+                f"ON {self.quote(table_name)}{using_part} ({columns})"
+                f"{include_part}{where_part}"
+            )
+        ]
+
+    def index_element(self, element: IndexElement, is_column: bool) -> str:
+        expression = (
+            self.quote(element.expression)
+            if is_column
+            else f"({element.expression.replace('%', '%%')})"
+        )
+        parts = [expression]
+        if element.opclass:
+            parts.append(element.opclass)
+        if element.descending:
+            parts.append("DESC")
+        if element.nulls:
+            parts.append(f"NULLS {element.nulls}")
+        return " ".join(parts)
+
+    def drop_index(
+        self, table_name: str, index_name: str, concurrently: bool = False
+    ) -> Iterable[DDL]:
+        concurrently_part = (
+            "CONCURRENTLY " if concurrently and self.concurrent_indexes else ""
+        )
+        return [DDL(f"DROP INDEX {concurrently_part}{self.quote(index_name)}")]
+
+    def invalid_index(self, index_name: str) -> Executable | None:
+        """A query returning a row if a failed concurrent build left the index behind."""
+        return None
+
+    def add_foreign_key(
+        self,
+        table_name: str,
+        constraint_name: str,
+        column_names: list[str],
+        referred_table: str,
+        referred_columns: list[str],
+        *,
+        on_delete: str | None = None,
+        validate: bool = True,
+    ) -> Iterable[DDL]:
+        """Add a foreign key; without `validate`, existing rows aren't checked yet."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support adding foreign keys to existing tables"
+        )
+
+    def validate_foreign_key(
+        self, table_name: str, constraint_name: str
+    ) -> Iterable[DDL]:
+        """Check the existing rows against a foreign key added without `validate`."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support adding foreign keys to existing tables"
         )
 
-        columns = [table.c[col_name] for col_name in column_names]
-        index = Index(index_name, *columns, unique=unique)
+    def partition_clause(self, strategy: str, column_names: list[str]) -> str:
+        """The `PARTITION BY` clause of a partitioned table, without the keywords."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support table partitioning"
+        )
+
+    def partition_bounds(
+        self,
+        *,
+        from_: list[Any] | None = None,
+        to: list[Any] | None = None,
+        values: list[Any] | None = None,
+        modulus: int | None = None,
+        remainder: int | None = None,
+        default: bool = False,
+    ) -> str:
+        """The bound spec of one partition: a range, a list, a hash slot or `DEFAULT`."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support table partitioning"
+        )
+
+    def create_partition(
+        self, table_name: str, partition_name: str, bounds: str
+    ) -> Iterable[DDL]:
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support table partitioning"
+        )
+
+    def attach_partition(
+        self, table_name: str, partition_name: str, bounds: str
+    ) -> Iterable[DDL]:
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support table partitioning"
+        )
+
+    def detach_partition(
+        self, table_name: str, partition_name: str, concurrently: bool = False
+    ) -> Iterable[DDL]:
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support table partitioning"
+        )
+
+    def list_partitions(self, table_name: str) -> Executable:
+        """A query returning the `name` and `bounds` of each partition of a table."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support table partitioning"
+        )
+
+    def drop_tables(
+        self, table_names: list[str], cascade: bool = False
+    ) -> Iterable[DDL]:
+        tables = ", ".join(self.quote(name) for name in table_names)
+        cascade_part = " CASCADE" if cascade else ""
+        return [DDL(f"DROP TABLE {tables}{cascade_part}")]
+
+    def use_schema(self, schema: str) -> Iterable[DDL]:
+        """Resolve unqualified names in `schema` for the rest of the transaction."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support running migrations per schema"
+        )
+
+    def analyze(self, table_names: list[str]) -> Iterable[DDL]:
+        """Refresh the planner statistics of the tables."""
+        return [DDL(f"ANALYZE {self.quote(name)}") for name in table_names]
+
+    def vacuum(self, table_names: list[str], analyze: bool = False) -> Iterable[DDL]:
+        """Reclaim space from dead rows; never valid inside a transaction."""
+        raise NotImplementedError(f"{self.dialect.name} does not support VACUUM")
+
+    def reindex(
+        self, name: str, *, index: bool = False, concurrently: bool = False
+    ) -> Iterable[DDL]:
+        """Rebuild a table's indexes, or one index."""
+        return [DDL(f"REINDEX {self.quote(name)}")]
+
+    def use_session_schema(self, schema: str) -> Iterable[DDL]:
+        """Like `use_schema`, for statements that run outside a transaction."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support running migrations per schema"
+        )
+
+    def reset_session_schema(self) -> Iterable[DDL]:
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support running migrations per schema"
+        )
+
+    def get_setting(self, name: str) -> Executable:
+        """A query returning the session setting's current value."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support session tuning settings"
+        )
+
+    def set_setting(self, name: str, value: Any) -> Iterable[DDL]:
+        """Change a session setting for the rest of the transaction, if scoped."""
+        raise NotImplementedError(
+            f"{self.dialect.name} does not support session tuning settings"
+        )
 
-        return [CreateIndex(index)]
+    def setting_name(self, name: str) -> str:
+        if not _SETTING_NAME.fullmatch(name):
+            raise ValueError(f"Invalid setting name '{name}'")
+        return name
 
-    def drop_index(self, table_name: str, index_name: str) -> Iterable[DDLElement]:
-        metadata = MetaData()
-        table = Table(table_name, metadata)
-        index = Index(index_name, _table=table)
+    def literal(self, value: Any) -> str:
+        """Render a setting value; strings are single-quoted."""
+        if isinstance(value, bool):
+            return "on" if value else "off"
+        if isinstance(value, (int, float)):
+            return str(value)
+        escaped = str(value).replace("'", "''").replace("%", "%%")
+        return f"'{escaped}'"
 
-        return [DropIndex(index)]
+    def quote(self, identifier: str) -> str:
+        """Quote `identifier` for this dialect, only when it needs quoting."""
+        # DDL statements are %-formatted at compile time
+        return self.dialect.identifier_preparer.quote(identifier).replace("%", "%%")
@@ -1,12 +1,20 @@
 from typing import Any, Iterable
 
+from sqlalchemy import text
 from sqlalchemy.schema import DDL
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.compiler import FK_ON_DELETE
 from sqlalchemy.types import TypeEngine
 
 from .compiler import DialectCompiler
 
 
 class PostgreSQLCompiler(DialectCompiler):
+    settings_roll_back = True
+    concurrent_indexes = True
+    alter_foreign_keys = True
+    index_methods = True
+
     def rename_column(
         self, table_name: str, old_name: str, new_name: str
     ) -> Iterable[DDL]:
@@ -56,3 +64,171 @@ class PostgreSQLCompiler(DialectCompiler):
             )
 
         return statements
+
+    def add_foreign_key(
+        self,
+        table_name: str,
+        constraint_name: str,
+        column_names: list[str],
+        referred_table: str,
+        referred_columns: list[str],
+        *,
+        on_delete: str | None = None,
+        validate: bool = True,
+    ) -> Iterable[DDL]:
+        columns = ", ".join(self.quote(name) for name in column_names)
+        referred = ", ".join(self.quote(name) for name in referred_columns)
+        on_delete_part = (
+            " ON DELETE "
+            + self.dialect.identifier_preparer.validate_sql_phrase(
+                on_delete, FK_ON_DELETE
+            )
+            if on_delete
+            else ""
+        )
+        not_valid_part = "" if validate else " NOT VALID"
+        return [
+            DDL(
+                f"ALTER TABLE {self.quote(table_name)} "
+                f"ADD CONSTRAINT {self.quote(constraint_name)} "
+                f"FOREIGN KEY ({columns}) "
+                f"REFERENCES {self.quote(referred_table)} ({referred})"
+                f"{on_delete_part}{not_valid_part}"
+            )
+        ]
+
+    def validate_foreign_key(
+        self, table_name: str, constraint_name: str
+    ) -> Iterable[DDL]:
+        return [
+            DDL(
+                f"ALTER TABLE {self.quote(table_name)} "
+                f"VALIDATE CONSTRAINT {self.quote(constraint_name)}"
+            )
+        ]
+
+    def partition_clause(self, strategy: str, column_names: list[str]) -> str:
+        # Goes through SQLAlchemy's CREATE TABLE, so no %-escaping here
+        preparer = self.dialect.identifier_preparer
+        columns = ", ".join(preparer.quote(name) for name in column_names)
+        return f"{strategy.upper()} ({columns})"
+
+    def partition_bounds(
+        self,
+        *,
+        from_: list[Any] | None = None,
+        to: list[Any] | None = None,
+        values: list[Any] | None = None,
+        modulus: int | None = None,
+        remainder: int | None = None,
+        default: bool = False,
+    ) -> str:
+        forms = [
+            from_ is not None or to is not None,
+            values is not None,
+            modulus is not None or remainder is not None,
+            default,
+        ]
+        if forms.count(True) != 1:
+            raise ValueError(
+                "Give exactly one of: from_ and to, values, modulus and "
+                "remainder, or default"
+            )
+
+        if default:
+            return "DEFAULT"
+        if values is not None:
+            return f"FOR VALUES IN ({self._literals(values)})"
+        if modulus is not None and remainder is not None:
+            return (
+                f"FOR VALUES WITH (MODULUS {int(modulus)}, REMAINDER {int(remainder)})"
+            )
+        if from_ is not None and to is not None:
+            return (
+                f"FOR VALUES FROM ({self._literals(from_)}) TO ({self._literals(to)})"
+            )
+        raise ValueError(
+            "Range partitions need both from_ and to, hash both modulus and remainder"
+        )
+
+    def create_partition(
+        self, table_name: str, partition_name: str, bounds: str
+    ) -> Iterable[DDL]:
+        return [
+            DDL(
+                f"CREATE TABLE {self.quote(partition_name)} "
+                f"PARTITION OF {self.quote(table_name)} {bounds}"
+            )
+        ]
+
+    def attach_partition(
+        self, table_name: str, partition_name: str, bounds: str
+    ) -> Iterable[DDL]:
+        return [
+            DDL(
+                f"ALTER TABLE {self.quote(table_name)} "
+                f"ATTACH PARTITION {self.quote(partition_name)} {bounds}"
+            )
+        ]
+
+    def detach_partition(
+        self, table_name: str, partition_name: str, concurrently: bool = False
+    ) -> Iterable[DDL]:
+        concurrently_part = " CONCURRENTLY" if concurrently else ""
+        return [
+            DDL(
+                f"ALTER TABLE {self.quote(table_name)} "
+                f"DETACH PARTITION {self.quote(partition_name)}{concurrently_part}"
+            )
+        ]
+
+    def list_partitions(self, table_name: str) -> Executable:
+        return text("""
+            SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bounds
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:table_name)
+            ORDER BY c.relname
+            """).bindparams(
+            table_name=self.dialect.identifier_preparer.quote(table_name)
+        )
+
+    def _literals(self, values: list[Any]) -> str:
+        return ", ".join(self.literal(value) for value in values)
+
+    def use_schema(self, schema: str) -> Iterable[DDL]:
+        # LOCAL keeps the setting from leaking to the next user of a pooled connection
+        return [DDL(f"SET LOCAL search_path TO {self.quote(schema)}")]
+
+    def analyze(self, table_names: list[str]) -> Iterable[DDL]:
+        return [DDL(f"ANALYZE {', '.join(self.quote(n) for n in table_names)}")]
+
+    def vacuum(self, table_names: list[str], analyze: bool = False) -> Iterable[DDL]:
+        options = " (ANALYZE)" if analyze else ""
+        tables = ", ".join(self.quote(name) for name in table_names)
+        return [DDL(f"VACUUM{options} {tables}".rstrip())]
+
+    def reindex(
+        self, name: str, *, index: bool = False, concurrently: bool = False
+    ) -> Iterable[DDL]:
+        kind = "INDEX" if index else "TABLE"
+        concurrently_part = " CONCURRENTLY" if concurrently else ""
+        return [DDL(f"REINDEX {kind}{concurrently_part} {self.quote(name)}")]
+
+    def invalid_index(self, index_name: str) -> Executable:
+        return text(
+            "SELECT 1 FROM pg_index "
+            "WHERE indexrelid = to_regclass(:name) AND NOT indisvalid"
+        ).bindparams(name=self.dialect.identifier_preparer.quote(index_name))
+
+    def use_session_schema(self, schema: str) -> Iterable[DDL]:
+        return [DDL(f"SET search_path TO {self.quote(schema)}")]
+
+    def reset_session_schema(self) -> Iterable[DDL]:
+        return [DDL("RESET search_path")]
+
+    def get_setting(self, name: str) -> Executable:
+        return text(f"SELECT current_setting('{self.setting_name(name)}')")
+
+    def set_setting(self, name: str, value: Any) -> Iterable[DDL]:
+        return [DDL(f"SET LOCAL {self.setting_name(name)} TO {self.literal(value)}")]
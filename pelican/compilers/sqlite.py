@@ -1,6 +1,8 @@
 from typing import Any, Iterable
 from sqlalchemy.types import TypeEngine
+from sqlalchemy import text
 from sqlalchemy.schema import DDL
+from sqlalchemy.sql import Executable
 from .compiler import DialectCompiler
 
 
@@ -25,3 +27,34 @@ class SQLiteCompiler(DialectCompiler):
             "Column type/constraint changes require table recreation. "
             "Use batch_alter_table() instead."
         )
+
+    def drop_tables(
+        self, table_names: list[str], cascade: bool = False
+    ) -> Iterable[DDL]:
+        """SQLite drops one table per statement and has no CASCADE.
+
+        Nothing in SQLite blocks a drop the way dependent objects do elsewhere,
+        so `cascade` is accepted and ignored. Callers pass referencing tables first.
+        """
+        return [DDL(f"DROP TABLE {self.quote(name)}") for name in table_names]
+
+    def analyze(self, table_names: list[str]) -> Iterable[DDL]:
+        """ANALYZE each table, then let `PRAGMA optimize` do anything else due."""
+        return [*super().analyze(table_names), DDL("PRAGMA optimize")]
+
+    def vacuum(self, table_names: list[str], analyze: bool = False) -> Iterable[DDL]:
+        """SQLite only vacuums whole databases, so the table names just feed `analyze`."""
+        return [DDL("VACUUM"), *(self.analyze(table_names) if analyze else [])]
+
+    def reindex(
+        self, name: str, *, index: bool = False, concurrently: bool = False
+    ) -> Iterable[DDL]:
+        """`REINDEX` takes a table or index name alike; there's no concurrent form."""
+        return super().reindex(name)
+
+    def get_setting(self, name: str) -> Executable:
+        return text(f"PRAGMA {self.setting_name(name)}")
+
+    def set_setting(self, name: str, value: Any) -> Iterable[DDL]:
+        """PRAGMAs last for the connection, not the transaction."""
+        return [DDL(f"PRAGMA {self.setting_name(name)} = {self.literal(value)}")]
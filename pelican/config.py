@@ -0,0 +1,295 @@
+import json
+import os
+import tomllib
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any
+
+_ENV_PREFIX = "PELICAN_"
+
+_POOL_CLASSES: dict[str, str] = {
+    "null": "NullPool",
+    "queue": "QueuePool",
+    "static": "StaticPool",
+    "singleton": "SingletonThreadPool",
+}
+
+
+@dataclass
+class EngineConfig:
+    """Options for the engine Pelican creates from a database URL.
+
+    Unset options keep SQLAlchemy's defaults. `poolclass` is one of
+    `null`, `queue`, `static` or `singleton`; `null` suits one-shot CLI
+    runs that shouldn't keep connections around.
+    """
+
+    poolclass: str | None = None
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    pool_timeout: float | None = None
+    pool_recycle: int | None = None
+    pool_pre_ping: bool | None = None
+    isolation_level: str | None = None
+    connect_args: dict[str, Any] = field(default_factory=dict)
+
+    def update(self, values: Mapping[str, Any], source: str) -> None:
+        """Set options from raw values, converting strings to each option's type."""
+        known = {f.name: f for f in fields(self)}
+
+        for key, raw in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown engine option '{key}' in {source}")
+            try:
+                setattr(self, key, _convert(key, raw))
+            except ValueError as e:
+                raise ValueError(f"Invalid value for '{key}' in {source}: {e}")
+
+    def to_engine_options(self) -> dict[str, Any]:
+        """Keyword arguments for `sqlalchemy.create_engine`."""
+        options: dict[str, Any] = {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name not in ("poolclass", "connect_args")
+            and getattr(self, f.name) is not None
+        }
+
+        if self.connect_args:
+            options["connect_args"] = dict(self.connect_args)
+
+        if self.poolclass is not None:
+            import sqlalchemy.pool
+
+            options["poolclass"] = getattr(
+                sqlalchemy.pool, _POOL_CLASSES[self.poolclass]
+            )
+
+        return options
+
+
+@dataclass
+class WorkerConfig:
+    """Options for `pelican worker`.
+
+    `windows` are daily `HH:MM-HH:MM` ranges, in local time, outside which
+    no job runs; empty means always.
+    """
+
+    windows: list[str] = field(default_factory=list)
+    poll_interval: float = 5.0
+    lease: float = 600.0
+
+    def update(self, values: Mapping[str, Any], source: str) -> None:
+        known = {f.name for f in fields(self)}
+
+        for key, raw in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown worker option '{key}' in {source}")
+            if key == "windows":
+                if not isinstance(raw, list) or not all(
+                    isinstance(w, str) for w in raw
+                ):
+                    raise ValueError(
+                        f"Invalid value for 'windows' in {source}: expected a list of strings"
+                    )
+                self.windows = list(raw)
+            else:
+                try:
+                    setattr(self, key, float(raw))
+                except (TypeError, ValueError):
+                    raise ValueError(
+                        f"Invalid value for '{key}' in {source}: expected a number"
+                    )
+
+
+@dataclass
+class ThrottleConfig:
+    """Throttler limits for `pelican worker` and `bulk_insert`, keyed by signal name.
+
+    See `pelican.throttle.SIGNALS` for the names; `max_delay` caps the
+    back-off between batches.
+    """
+
+    limits: dict[str, float] = field(default_factory=dict)
+    max_delay: float = 60.0
+
+    def update(self, values: Mapping[str, Any], source: str) -> None:
+        for key, raw in values.items():
+            try:
+                value = float(raw)
+            except (TypeError, ValueError):
+                raise ValueError(
+                    f"Invalid value for '{key}' in {source}: expected a number"
+                )
+            if key == "max_delay":
+                self.max_delay = value
+            else:
+                self.limits[key] = value
+
+
+@dataclass
+class WatchdogConfig:
+    """Thresholds for the lock watchdog; it is off unless one is set."""
+
+    max_blocked: int | None = None
+    max_blocking_ms: float | None = None
+    retries: int = 3
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_blocked is not None or self.max_blocking_ms is not None
+
+    def update(self, values: Mapping[str, Any], source: str) -> None:
+        known = {f.name: f for f in fields(self)}
+
+        for key, raw in values.items():
+            if key not in known:
+                raise ValueError(f"Unknown watchdog option '{key}' in {source}")
+            try:
+                value = float(raw) if key == "max_blocking_ms" else int(raw)
+            except (TypeError, ValueError):
+                raise ValueError(
+                    f"Invalid value for '{key}' in {source}: expected a number"
+                )
+            setattr(self, key, value)
+
+
+@dataclass
+class PelicanConfig:
+    database_url: str | None = None
+    engine: EngineConfig = field(default_factory=EngineConfig)
+    worker: WorkerConfig = field(default_factory=WorkerConfig)
+    throttle: ThrottleConfig = field(default_factory=ThrottleConfig)
+    watchdog: WatchdogConfig = field(default_factory=WatchdogConfig)
+    profiles: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+def load_config(
+    pyproject_path: str | Path = "pyproject.toml",
+    env_file: str | Path = ".env",
+) -> PelicanConfig:
+    """Read settings from `[tool.pelican.*]`, `.env` and the environment.
+
+    Later sources win: environment variables override `.env`, which
+    overrides `pyproject.toml`. Engine options use a `PELICAN_` prefix in
+    `.env` and the environment (`PELICAN_POOL_SIZE=5`, or a JSON object for
+    `PELICAN_CONNECT_ARGS`); other `PELICAN_` variables are ignored. `.env`
+    may also set `DATABASE_URL`. Worker, throttle and watchdog options and
+    tuning profiles are only read from `pyproject.toml`.
+
+    ## Example
+
+    ```toml
+    [tool.pelican.engine]
+    poolclass = "null"
+    pool_pre_ping = true
+    connect_args = { connect_timeout = 5 }
+
+    [tool.pelican.worker]
+    windows = ["22:00-06:00"]
+
+    [tool.pelican.throttle]
+    replication_lag = 5
+    active_sessions = 40
+
+    [tool.pelican.watchdog]
+    max_blocked = 5
+    max_blocking_ms = 2000
+
+    [tool.pelican.profiles.bulk]
+    maintenance_work_mem = "2GB"
+    synchronous_commit = "off"
+    ```
+    """
+    config = PelicanConfig()
+
+    pyproject = Path(pyproject_path)
+    if pyproject.is_file():
+        with pyproject.open("rb") as f:
+            data = tomllib.load(f)
+        pelican_table = data.get("tool", {}).get("pelican", {})
+        config.engine.update(
+            pelican_table.get("engine", {}), f"{pyproject} [tool.pelican.engine]"
+        )
+        config.worker.update(
+            pelican_table.get("worker", {}), f"{pyproject} [tool.pelican.worker]"
+        )
+        config.throttle.update(
+            pelican_table.get("throttle", {}), f"{pyproject} [tool.pelican.throttle]"
+        )
+        config.watchdog.update(
+            pelican_table.get("watchdog", {}), f"{pyproject} [tool.pelican.watchdog]"
+        )
+        config.profiles = _profiles(
+            pelican_table.get("profiles", {}), f"{pyproject} [tool.pelican.profiles]"
+        )
+
+    env_path = Path(env_file)
+    dotenv: dict[str, str | None] = {}
+    if env_path.is_file():
+        from dotenv import dotenv_values
+
+        dotenv = dotenv_values(env_path)
+
+    for source, values in ((str(env_path), dotenv), ("environment", os.environ)):
+        config.engine.update(_prefixed(values), source)
+        if url := values.get("DATABASE_URL"):
+            config.database_url = url
+
+    return config
+
+
+def _profiles(values: Mapping[str, Any], source: str) -> dict[str, dict[str, Any]]:
+    profiles = {}
+    for name, settings in values.items():
+        if not isinstance(settings, dict):
+            raise ValueError(f"Invalid profile '{name}' in {source}: expected a table")
+        for key, value in settings.items():
+            if not isinstance(value, (str, int, float, bool)):
+                raise ValueError(
+                    f"Invalid value for '{key}' in profile '{name}' in {source}: "
+                    "expected a string, number or boolean"
+                )
+        profiles[name] = dict(settings)
+    return profiles
+
+
+def _prefixed(values: Mapping[str, str | None]) -> dict[str, str]:
+    # Other tools may own PELICAN_* variables too, so only engine options count
+    known = {f.name for f in fields(EngineConfig)}
+    return {
+        name: value
+        for key, value in values.items()
+        if key.startswith(_ENV_PREFIX)
+        and value is not None
+        and (name := key.removeprefix(_ENV_PREFIX).lower()) in known
+    }
+
+
+def _convert(key: str, raw: Any) -> Any:
+    if not isinstance(raw, str):
+        if key == "poolclass" and raw not in _POOL_CLASSES:
+            raise ValueError(f"expected one of {', '.join(_POOL_CLASSES)}")
+        return raw
+
+    if key == "poolclass":
+        if raw.lower() not in _POOL_CLASSES:
+            raise ValueError(f"expected one of {', '.join(_POOL_CLASSES)}")
+        return raw.lower()
+    if key in ("pool_size", "max_overflow", "pool_recycle"):
+        return int(raw)
+    if key == "pool_timeout":
+        return float(raw)
+    if key == "pool_pre_ping":
+        if raw.lower() in ("1", "true", "yes", "on"):
+            return True
+        if raw.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"expected a boolean, got '{raw}'")
+    if key == "connect_args":
+        value = json.loads(raw)
+        if not isinstance(value, dict):
+            raise ValueError("expected a JSON object")
+        return value
+    return raw
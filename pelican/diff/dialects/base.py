@@ -1,6 +1,7 @@
 from typing import Any
 
-from sqlalchemy.engine import Engine
+from sqlalchemy import Table
+from sqlalchemy.engine import Engine, Inspector
 from sqlalchemy.types import TypeEngine
 
 from ..schema import SchemaEnum
@@ -9,14 +10,34 @@ from ..schema import SchemaEnum
 class DialectInspector:
     """Base dialect inspector — no-op defaults suitable for generic/unknown dialects."""
 
-    def get_enums(self, engine: Engine) -> list[SchemaEnum]:
+    def get_enums(self, engine: Engine, schema: str | None = None) -> list[SchemaEnum]:
         return []
 
     def filter_indexes(self, indexes: list[Any]) -> list[Any]:
         return indexes
 
+    def get_indexes(
+        self, inspector: Inspector, table_name: str, schema: str | None = None
+    ) -> list[Any]:
+        """Reflected indexes of a table, as `Inspector.get_indexes` returns them."""
+        return self.filter_indexes(inspector.get_indexes(table_name, schema))
+
     def extract_column_enums(
         self, col_type: TypeEngine, col_name: str
     ) -> dict[str, list[str]]:
         """Extract named enum types from a SQLAlchemy column type, if the dialect supports them."""
         return {}
+
+    def get_partition_keys(
+        self, engine: Engine, schema: str | None = None
+    ) -> dict[str, str]:
+        """Partitioned tables and their `PARTITION BY` clause."""
+        return {}
+
+    def get_partitions(self, engine: Engine, schema: str | None = None) -> set[str]:
+        """Tables that are partitions of another table."""
+        return set()
+
+    def extract_partition_by(self, table: Table) -> str | None:
+        """The `PARTITION BY` clause a SQLAlchemy table is declared with, if any."""
+        return None
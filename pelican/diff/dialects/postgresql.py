@@ -1,4 +1,4 @@
-from sqlalchemy import text
+from sqlalchemy import Table, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.sql.sqltypes import Enum as SAEnum
 from sqlalchemy.types import TypeEngine
@@ -8,16 +8,20 @@ from ..schema import SchemaEnum
 
 
 class PostgreSQLInspector(DialectInspector):
-    def get_enums(self, engine: Engine) -> list[SchemaEnum]:
+    def get_enums(self, engine: Engine, schema: str | None = None) -> list[SchemaEnum]:
+        """Enum types in `schema`, or in the connection's current schema."""
         with engine.connect() as conn:
-            rows = conn.execute(text("""
+            rows = conn.execute(
+                text("""
                     SELECT t.typname AS name, e.enumlabel AS value
                     FROM pg_type t
                     JOIN pg_enum e ON e.enumtypid = t.oid
                     JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace
-                    WHERE n.nspname = 'public'
+                    WHERE n.nspname = COALESCE(:schema, current_schema())
                     ORDER BY t.typname, e.enumsortorder
-                    """)).fetchall()
+                    """),
+                {"schema": schema},
+            ).fetchall()
 
         enums: dict[str, list[str]] = {}
         for name, value in rows:
@@ -31,3 +35,36 @@ class PostgreSQLInspector(DialectInspector):
         if isinstance(col_type, SAEnum) and col_type.name:
             return {col_type.name: list(col_type.enums)}
         return {}
+
+    def get_partition_keys(
+        self, engine: Engine, schema: str | None = None
+    ) -> dict[str, str]:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("""
+                    SELECT c.relname AS name, pg_get_partkeydef(c.oid) AS key
+                    FROM pg_class c
+                    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                    WHERE c.relkind = 'p'
+                      AND n.nspname = COALESCE(:schema, current_schema())
+                    """),
+                {"schema": schema},
+            ).fetchall()
+        return {name: key for name, key in rows}
+
+    def get_partitions(self, engine: Engine, schema: str | None = None) -> set[str]:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text("""
+                    SELECT c.relname
+                    FROM pg_class c
+                    JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                    WHERE c.relispartition
+                      AND n.nspname = COALESCE(:schema, current_schema())
+                    """),
+                {"schema": schema},
+            ).scalars()
+            return set(rows)
+
+    def extract_partition_by(self, table: Table) -> str | None:
+        return table.dialect_options["postgresql"].get("partition_by")
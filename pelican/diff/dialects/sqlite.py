@@ -1,4 +1,11 @@
+from contextlib import nullcontext
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, Inspector
+
 from .base import DialectInspector
+from ..normalizer import parse_create_index
 
 
 class SQLiteInspector(DialectInspector):
@@ -8,3 +15,44 @@ class SQLiteInspector(DialectInspector):
             for idx in indexes
             if not (idx.get("name") or "").startswith("sqlite_autoindex_")
         ]
+
+    def get_indexes(
+        self, inspector: Inspector, table_name: str, schema: str | None = None
+    ) -> list[Any]:
+        """Indexes parsed from their `CREATE INDEX` statements.
+
+        SQLAlchemy skips expression indexes on SQLite, so the statements
+        kept in `sqlite_master` are read instead. Automatic indexes have
+        none and are left out.
+        """
+        master = (
+            f"{inspector.dialect.identifier_preparer.quote_identifier(schema)}"
+            ".sqlite_master"
+            if schema
+            else "sqlite_master"
+        )
+        bind = inspector.bind
+        with bind.connect() if isinstance(bind, Engine) else nullcontext(bind) as conn:
+            rows = conn.execute(
+                text(
+                    f"SELECT name, sql FROM {master} "
+                    "WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL "
+                    "ORDER BY name"
+                ),
+                {"table": table_name},
+            ).fetchall()
+
+        indexes = []
+        for name, sql in rows:
+            parsed = parse_create_index(sql)
+            if parsed is None:
+                continue
+            indexes.append(
+                {
+                    "name": name,
+                    "unique": parsed["unique"],
+                    "expressions": parsed["columns"],
+                    "dialect_options": {"sqlite_where": parsed["where"]},
+                }
+            )
+        return indexes
@@ -14,6 +14,7 @@ from .operations import (
     AlterColumnServerDefault,
     CreateIndex,
     DropIndex,
+    AlterPartitioning,
     AddCheckConstraint,
     DropCheckConstraint,
     CreateEnum,
@@ -90,6 +91,10 @@ def _diff_tables(current: SchemaState, desired: SchemaState) -> list[DiffOperati
 
 def _diff_table(current: SchemaTable, desired: SchemaTable) -> list[DiffOperation]:
     ops: list[DiffOperation] = []
+    if current.partition_by != desired.partition_by:
+        ops.append(
+            AlterPartitioning(current.name, current.partition_by, desired.partition_by)
+        )
     ops.extend(_diff_columns(current, desired))
     ops.extend(_diff_indexes(current, desired))
     ops.extend(_diff_check_constraints(current, desired))
@@ -226,6 +231,12 @@ def _diff_indexes(current: SchemaTable, desired: SchemaTable) -> list[DiffOperat
     for name in current_idxs.keys() - desired_idxs.keys():
         ops.append(DropIndex(current.name, current_idxs[name]))
 
+    # An index can't be altered in place, so a changed definition rebuilds it
+    for name in sorted(current_idxs.keys() & desired_idxs.keys()):
+        if current_idxs[name] != desired_idxs[name]:
+            ops.append(DropIndex(current.name, current_idxs[name]))
+            ops.append(CreateIndex(desired.name, desired_idxs[name]))
+
     return ops
 
 
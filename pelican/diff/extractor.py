@@ -2,7 +2,14 @@ from typing import cast
 
 from sqlalchemy import MetaData
 from sqlalchemy.engine import Dialect
-from sqlalchemy.sql.schema import CheckConstraint, Column, ForeignKeyConstraint, Table
+from sqlalchemy.schema import CreateIndex as SACreateIndex
+from sqlalchemy.sql.schema import (
+    CheckConstraint,
+    Column,
+    ForeignKeyConstraint,
+    Index,
+    Table,
+)
 
 from .dialects import inspector_for
 from .dialects.base import DialectInspector
@@ -19,9 +26,14 @@ from .normalizer import (
     normalize_type,
     normalize_server_default,
     normalize_check_expression,
+    normalize_partition_by,
+    normalize_index_element,
+    normalize_index_predicate,
+    normalize_index_method,
+    parse_create_index,
 )
 
-_EXCLUDED_TABLES = {"pelican_migration"}
+_EXCLUDED_TABLES = {"pelican_migration", "pelican_job"}
 
 
 def extract_from_metadata(metadata: MetaData, dialect: Dialect) -> SchemaState:
@@ -71,12 +83,8 @@ def _extract_table(
         )
 
     indexes = [
-        SchemaIndex(
-            name=idx.name,
-            columns=[col.name for col in idx.columns],
-            unique=bool(idx.unique),
-        )
-        for idx in table.indexes
+        _extract_index(idx, dialect)
+        for idx in sorted(table.indexes, key=lambda i: str(i.name))
         if idx.name
     ]
 
@@ -107,6 +115,8 @@ def _extract_table(
                     )
                 )
 
+    partition_by = dialect_inspector.extract_partition_by(table)
+
     return (
         SchemaTable(
             name=table.name,
@@ -114,11 +124,34 @@ def _extract_table(
             indexes=indexes,
             check_constraints=check_constraints,
             foreign_keys=foreign_keys,
+            partition_by=normalize_partition_by(partition_by) if partition_by else None,
         ),
         enums,
     )
 
 
+def _extract_index(index: Index, dialect: Dialect) -> SchemaIndex:
+    # Compiling the DDL resolves expressions, sort order and dialect options
+    # the same way the database will see them.
+    sql = str(SACreateIndex(index).compile(dialect=dialect))
+    parsed = parse_create_index(sql)
+    if parsed is None:
+        return SchemaIndex(
+            name=str(index.name),
+            columns=[col.name for col in index.columns],
+            unique=bool(index.unique),
+        )
+
+    return SchemaIndex(
+        name=str(index.name),
+        columns=[normalize_index_element(entry) for entry in parsed["columns"]],
+        unique=bool(index.unique),
+        where=normalize_index_predicate(parsed["where"]) if parsed["where"] else None,
+        include=parsed["include"],
+        using=normalize_index_method(parsed["using"]),
+    )
+
+
 def _extract_server_default(col: Column) -> str | None:
     sd = col.server_default
     if sd is None:
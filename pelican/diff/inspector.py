@@ -1,3 +1,5 @@
+from typing import Any
+
 from sqlalchemy import inspect
 from sqlalchemy.engine import Engine, Inspector
 
@@ -15,36 +17,50 @@ from .normalizer import (
     normalize_type,
     normalize_server_default,
     normalize_check_expression,
+    normalize_partition_by,
+    normalize_index_element,
+    normalize_index_predicate,
+    normalize_index_method,
 )
 
-_EXCLUDED_TABLES = {"pelican_migration"}
+_EXCLUDED_TABLES = {"pelican_migration", "pelican_job"}
 
 
-def introspect_live_db(engine: Engine) -> SchemaState:
+def introspect_live_db(engine: Engine, schema: str | None = None) -> SchemaState:
+    """Read the current schema of the database, or of one `schema` in it."""
     sa_inspector = inspect(engine)
     dialect_name = engine.dialect.name
     dialect = inspector_for(dialect_name)
 
-    enums = dialect.get_enums(engine)
+    enums = dialect.get_enums(engine, schema)
+    partition_keys = dialect.get_partition_keys(engine, schema)
+    # Partitions are managed through their parent, not as tables of their own
+    excluded = _EXCLUDED_TABLES | dialect.get_partitions(engine, schema)
     tables = []
 
-    for table_name in sorted(sa_inspector.get_table_names()):
-        if table_name in _EXCLUDED_TABLES:
+    for table_name in sorted(sa_inspector.get_table_names(schema=schema)):
+        if table_name in excluded:
             continue
-        tables.append(_inspect_table(sa_inspector, dialect, table_name))
+        table = _inspect_table(sa_inspector, dialect, table_name, schema)
+        if table_name in partition_keys:
+            table.partition_by = normalize_partition_by(partition_keys[table_name])
+        tables.append(table)
 
     return SchemaState(dialect=dialect_name, tables=tables, enums=enums)
 
 
 def _inspect_table(
-    inspector: Inspector, dialect: DialectInspector, table_name: str
+    inspector: Inspector,
+    dialect: DialectInspector,
+    table_name: str,
+    schema: str | None = None,
 ) -> SchemaTable:
     pk_cols = set(
-        inspector.get_pk_constraint(table_name).get("constrained_columns", [])
+        inspector.get_pk_constraint(table_name, schema).get("constrained_columns", [])
     )
 
     columns = []
-    for position, col in enumerate(inspector.get_columns(table_name)):
+    for position, col in enumerate(inspector.get_columns(table_name, schema)):
         raw_type = str(col["type"])
         server_default = col.get("default")
 
@@ -62,14 +78,9 @@ def _inspect_table(
             )
         )
 
-    raw_indexes = dialect.filter_indexes(inspector.get_indexes(table_name))
     indexes = [
-        SchemaIndex(
-            name=idx["name"],
-            columns=list(idx["column_names"]),
-            unique=bool(idx["unique"]),
-        )
-        for idx in raw_indexes
+        _schema_index(idx)
+        for idx in dialect.get_indexes(inspector, table_name, schema)
         if idx.get("name")
     ]
 
@@ -78,7 +89,7 @@ def _inspect_table(
             name=cc.get("name"),
             expression=normalize_check_expression(cc["sqltext"]),
         )
-        for cc in inspector.get_check_constraints(table_name)
+        for cc in inspector.get_check_constraints(table_name, schema)
     ]
 
     foreign_keys = [
@@ -89,7 +100,7 @@ def _inspect_table(
             ref_columns=list(fk["referred_columns"]),
             on_delete=fk.get("options", {}).get("ondelete"),
         )
-        for fk in inspector.get_foreign_keys(table_name)
+        for fk in inspector.get_foreign_keys(table_name, schema)
     ]
 
     return SchemaTable(
@@ -99,3 +110,36 @@ def _inspect_table(
         check_constraints=check_constraints,
         foreign_keys=foreign_keys,
     )
+
+
+def _schema_index(idx: Any) -> SchemaIndex:
+    # Expression indexes list every entry in `expressions`, columns included
+    entries = idx.get("expressions") or idx["column_names"]
+    sorting = idx.get("column_sorting", {})
+    options = idx.get("dialect_options", {})
+    ops = options.get("postgresql_ops", {})
+    where = options.get("postgresql_where") or options.get("sqlite_where")
+    include = options.get("postgresql_include") or idx.get("include_columns") or []
+
+    columns = []
+    for entry in entries:
+        flags = sorting.get(entry, ())
+        nulls = (
+            "FIRST"
+            if "nulls_first" in flags
+            else "LAST" if "nulls_last" in flags else None
+        )
+        columns.append(
+            normalize_index_element(
+                entry, opclass=ops.get(entry), descending="desc" in flags, nulls=nulls
+            )
+        )
+
+    return SchemaIndex(
+        name=idx["name"],
+        columns=columns,
+        unique=bool(idx["unique"]),
+        where=normalize_index_predicate(str(where)) if where else None,
+        include=list(include),
+        using=normalize_index_method(options.get("postgresql_using")),
+    )
@@ -1,4 +1,7 @@
 import re
+from typing import Any
+
+from pelican.compilers.compiler import split_index_element
 
 _TYPE_ALIASES: list[tuple[str, str]] = [
     # Must come before shorter aliases that would partial-match
@@ -29,6 +32,7 @@ _TYPE_CAST = re.compile(r"::[a-z][a-z0-9 ]*", re.IGNORECASE)
 _WHITESPACE = re.compile(r"\s+")
 _QUOTED_IDENTIFIER = re.compile(r'"(\w+)"')
 _OUTER_PARENS = re.compile(r"^\((.+)\)$", re.DOTALL)
+_PARTITION_KEY = re.compile(r"^(\w+)\s*\((.*)\)$", re.DOTALL)
 
 
 def normalize_type(type_str: str) -> str:
@@ -65,3 +69,162 @@ def normalize_check_expression(expr: str) -> str:
     # Lowercase and collapse whitespace
     s = _WHITESPACE.sub(" ", s.lower()).strip()
     return s
+
+
+def normalize_partition_by(expr: str) -> str:
+    """Canonical `PARTITION BY` clause: `RANGE (created_at)`, `HASH (a, b)`."""
+    s = _WHITESPACE.sub(" ", expr.strip())
+    m = _PARTITION_KEY.match(s)
+    if not m:
+        return s.upper()
+    columns = [
+        _QUOTED_IDENTIFIER.sub(r"\1", column.strip())
+        for column in m.group(2).split(",")
+    ]
+    return f"{m.group(1).upper()} ({', '.join(columns)})"
+
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_EXPRESSION_CAST = re.compile(
+    r"::(?:character varying|double precision"
+    r"|time(?:stamp)? with(?:out)? time zone|\w+)(?:\[\])?",
+    re.IGNORECASE,
+)
+_REDUNDANT_PARENS = re.compile(r"(?<![\w$])\((\w+)\)")
+_CREATE_INDEX = re.compile(
+    r"^\s*CREATE\s+(?P<unique>UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?"
+    r"(?:IF\s+NOT\s+EXISTS\s+)?\S+\s+ON\s+(?:ONLY\s+)?\S+?"
+    r"(?:\s+USING\s+(?P<using>\w+))?\s*\(",
+    re.IGNORECASE,
+)
+_INCLUDE = re.compile(r"^\s*INCLUDE\s*\(", re.IGNORECASE)
+_WHERE = re.compile(r"\bWHERE\s+(.+)$", re.IGNORECASE | re.DOTALL)
+
+
+def normalize_index_element(
+    element: str,
+    *,
+    opclass: str | None = None,
+    descending: bool = False,
+    nulls: str | None = None,
+) -> str:
+    """Canonical index entry: `email`, `lower(email) DESC`, `tags jsonb_path_ops`.
+
+    Modifiers may be given in `element` itself or as arguments, as
+    reflection reports them. `NULLS` is only kept when it isn't the
+    default for the direction.
+    """
+    parsed = split_index_element(element)
+    expression = _normalize_expression(parsed.expression)
+    opclass = opclass or parsed.opclass
+    descending = descending or parsed.descending
+    nulls = (nulls or parsed.nulls or "").upper() or None
+
+    parts = [expression]
+    if opclass:
+        parts.append(opclass.lower())
+    if descending:
+        parts.append("DESC")
+    if nulls and nulls != ("FIRST" if descending else "LAST"):
+        parts.append(f"NULLS {nulls}")
+    return " ".join(parts)
+
+
+def normalize_index_predicate(expr: str) -> str:
+    """Canonical `WHERE` predicate of a partial index."""
+    return _normalize_expression(expr)
+
+
+def normalize_index_method(using: str | None) -> str | None:
+    """Lowercased access method; `btree`, the default, is `None`."""
+    if not using or using.lower() == "btree":
+        return None
+    return using.lower()
+
+
+def parse_create_index(sql: str) -> dict[str, Any] | None:
+    """Split a `CREATE INDEX` statement into its entries and options.
+
+    Returns `unique`, `columns`, `include`, `using` and `where`, or `None`
+    if `sql` isn't a `CREATE INDEX` statement.
+    """
+    match = _CREATE_INDEX.match(sql)
+    if match is None:
+        return None
+
+    columns, rest = _split_parenthesized(sql[match.end() :])
+    include: list[str] = []
+    include_match = _INCLUDE.match(rest)
+    if include_match:
+        include, rest = _split_parenthesized(rest[include_match.end() :])
+
+    where = _WHERE.search(rest)
+    return {
+        "unique": bool(match["unique"]),
+        "columns": columns,
+        "include": [_QUOTED_IDENTIFIER.sub(r"\1", name) for name in include],
+        "using": match["using"],
+        "where": where.group(1).strip().rstrip(";") if where else None,
+    }
+
+
+def _split_parenthesized(s: str) -> tuple[list[str], str]:
+    """Split `a, f(b, c)) rest` at top-level commas up to the closing paren."""
+    items: list[str] = []
+    depth = 0
+    start = 0
+    quote = None
+    for i, char in enumerate(s):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            if depth == 0:
+                items.append(s[start:i].strip())
+                return [item for item in items if item], s[i + 1 :]
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append(s[start:i].strip())
+            start = i + 1
+    raise ValueError(f"Unbalanced parentheses in '{s}'")
+
+
+def _normalize_expression(expr: str) -> str:
+    s = _strip_outer_parens(expr.strip())
+    s = _EXPRESSION_CAST.sub("", s)
+    s = _QUOTED_IDENTIFIER.sub(r"\1", s)
+    previous = None
+    while previous != s:
+        previous, s = s, _REDUNDANT_PARENS.sub(r"\1", s)
+    s = _strip_outer_parens(s)
+
+    # Lowercase and tidy whitespace, leaving string literals alone
+    parts = _STRING_LITERAL.split(s)
+    for i in range(0, len(parts), 2):
+        part = _WHITESPACE.sub(" ", parts[i])
+        part = re.sub(r"\(\s+", "(", part)
+        part = re.sub(r"\s+\)", ")", part)
+        part = re.sub(r"\s*,\s*", ", ", part)
+        parts[i] = part.lower()
+    s = "".join(parts).strip()
+
+    # Plain column names keep their case
+    stripped = _strip_outer_parens(expr.strip())
+    unquoted = _QUOTED_IDENTIFIER.sub(r"\1", stripped)
+    return unquoted if re.fullmatch(r"\w+", unquoted) else s
+
+
+def _strip_outer_parens(s: str) -> str:
+    while s.startswith("(") and s.endswith(")"):
+        depth = 0
+        for i, char in enumerate(s):
+            depth += char == "("
+            depth -= char == ")"
+            if depth == 0 and i < len(s) - 1:
+                return s
+        s = s[1:-1].strip()
+    return s
@@ -83,15 +83,40 @@ def render_column_call(col: SchemaColumn) -> str:
     return f"t.{method}({', '.join(args)})"
 
 
+def render_partition_by(partition_by: str) -> str:
+    """Turn a normalized `RANGE (a, b)` clause into `range_('a', 'b')`."""
+    strategy, _, rest = partition_by.partition(" ")
+    columns = [c.strip() for c in rest.strip().strip("()").split(",") if c.strip()]
+    return f"{strategy.lower()}_({', '.join(repr(c) for c in columns)})"
+
+
+def render_index_call(index: SchemaIndex) -> str:
+    """Render `t.index(...)` with only the options that differ from the default."""
+    parts = [repr(index.columns), f"name={index.name!r}"]
+    if index.unique:
+        parts.append("unique=True")
+    if index.where:
+        parts.append(f"where={index.where!r}")
+    if index.include:
+        parts.append(f"include={index.include!r}")
+    if index.using:
+        parts.append(f"using={index.using!r}")
+    return f"t.index({', '.join(parts)})"
+
+
 def _render_table_block(table: SchemaTable) -> list[str]:
-    lines = [f"with create_table({table.name!r}) as t:"]
+    partition_part = (
+        f", partition_by={render_partition_by(table.partition_by)}"
+        if table.partition_by
+        else ""
+    )
+    lines = [f"with create_table({table.name!r}{partition_part}) as t:"]
     for col in table.columns:
         if col.primary_key:
             continue
         lines.append(f"    {render_column_call(col)}")
     for idx in table.indexes:
-        unique_part = ", unique=True" if idx.unique else ""
-        lines.append(f"    t.index({idx.columns!r}, name={idx.name!r}{unique_part})")
+        lines.append(f"    {render_index_call(idx)}")
     return lines
 
 
@@ -252,10 +277,7 @@ class CreateIndex(DiffOperation):
         return f"~ {self.table_name}: add index {self.index.name}"
 
     def render_up(self) -> list[str]:
-        unique_part = ", unique=True" if self.index.unique else ""
-        return [
-            f"t.index({self.index.columns!r}, name={self.index.name!r}{unique_part})"
-        ]
+        return [render_index_call(self.index)]
 
     def render_down(self) -> list[str]:
         return [f"t.remove_index(name={self.index.name!r})"]
@@ -273,9 +295,33 @@ class DropIndex(DiffOperation):
         return [f"t.remove_index(name={self.index.name!r})"]
 
     def render_down(self) -> list[str]:
-        unique_part = ", unique=True" if self.index.unique else ""
+        return [render_index_call(self.index)]
+
+
+@dataclass
+class AlterPartitioning(DiffOperation):
+    table_name: str
+    old_partition_by: str | None
+    new_partition_by: str | None
+
+    def __str__(self) -> str:
+        return (
+            f"~ {self.table_name}: partition by {self.old_partition_by} → "
+            f"{self.new_partition_by} [WARNING: requires recreating the table]"
+        )
+
+    def render_up(self) -> list[str]:
+        return [
+            f"# WARNING: partitioning can't be altered in place "
+            f"({self.old_partition_by} → {self.new_partition_by}). "
+            "Recreate the table and copy its rows manually."
+        ]
+
+    def render_down(self) -> list[str]:
         return [
-            f"t.index({self.index.columns!r}, name={self.index.name!r}{unique_part})"
+            f"# WARNING: partitioning can't be altered in place "
+            f"({self.new_partition_by} → {self.old_partition_by}). "
+            "Recreate the table and copy its rows manually."
         ]
 
 
@@ -15,8 +15,11 @@ class SchemaColumn:
 @dataclass
 class SchemaIndex:
     name: str
-    columns: list[str]
+    columns: list[str]  # normalized entries, e.g. "lower(email) DESC"
     unique: bool
+    where: str | None = None  # normalized predicate of a partial index
+    include: list[str] = field(default_factory=list)
+    using: str | None = None  # access method other than btree
 
 
 @dataclass
@@ -41,6 +44,7 @@ class SchemaTable:
     indexes: list[SchemaIndex] = field(default_factory=list)
     check_constraints: list[SchemaCheckConstraint] = field(default_factory=list)
     foreign_keys: list[SchemaForeignKey] = field(default_factory=list)
+    partition_by: str | None = None  # normalized, e.g. "RANGE (created_at)"
 
 
 @dataclass
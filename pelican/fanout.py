@@ -0,0 +1,188 @@
+import threading
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Literal
+
+from ._context import use_context
+from ._types import MigrationBatchError, MigrationPhase
+from .registry import MigrationRegistry
+
+if TYPE_CHECKING:
+    from .throttle import Throttler
+
+TargetStatus = Literal["applied", "up-to-date", "failed", "skipped"]
+
+
+@dataclass
+class TargetResult:
+    """Outcome of migrating one target database."""
+
+    target: str
+    status: TargetStatus
+    applied: list[int] = field(default_factory=list)
+    elapsed: float = 0.0
+    failed_revision: int | None = None
+    error: BaseException | None = None
+
+
+def read_targets(path: str | Path) -> list[str]:
+    """Read database URLs from a file, one per line.
+
+    Blank lines and lines starting with `#` are ignored.
+    """
+    targets = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            targets.append(line)
+    return targets
+
+
+def display_target(url: str) -> str:
+    """The URL with its password masked, for reports and logs."""
+    from sqlalchemy.engine import make_url
+
+    return make_url(url).render_as_string(hide_password=True)
+
+
+def fan_out(
+    targets: Sequence[str],
+    registry: MigrationRegistry,
+    *,
+    jobs: int = 4,
+    canary: bool = False,
+    up_to: int | None = None,
+    phase: MigrationPhase | None = None,
+    engine_options: dict[str, Any] | None = None,
+    profiles: Mapping[str, Mapping[str, Any]] | None = None,
+    throttler: "Throttler | None" = None,
+    on_result: Callable[[TargetResult], None] | None = None,
+) -> list[TargetResult]:
+    """Apply pending migrations to many databases with at most `jobs` at a time.
+
+    Migration modules are imported once, up front; each target then gets its
+    own runner and `MetaData` on a worker thread. With `canary`, the first
+    target is migrated alone before the others start. With `phase`, only
+    that phase's migrations are applied. `profiles` are the tuning profiles
+    migrations may name, and `throttler` paces `bulk_insert` on every
+    target. After any failure no
+    new target is started and the remaining ones are reported as skipped.
+    Results are returned in target order.
+
+    ## Example
+
+    ```python
+    from pelican import loader, use_context
+    from pelican.fanout import fan_out, read_targets
+
+    with use_context():
+        registry = loader.load_migrations()
+        results = fan_out(read_targets("shards.txt"), registry, jobs=8, canary=True)
+    ```
+    """
+    for migration in registry:
+        migration.load()
+
+    return run_targets(
+        [display_target(url) for url in targets],
+        lambda index: _migrate_target(
+            targets[index],
+            registry,
+            up_to,
+            phase,
+            engine_options,
+            profiles,
+            throttler,
+        ),
+        jobs=jobs,
+        canary=canary,
+        on_result=on_result,
+    )
+
+
+def run_targets(
+    labels: Sequence[str],
+    migrate: Callable[[int], TargetResult],
+    *,
+    jobs: int = 4,
+    canary: bool = False,
+    on_result: Callable[[TargetResult], None] | None = None,
+) -> list[TargetResult]:
+    """Call `migrate(index)` for each target on a pool of `jobs` threads.
+
+    Handles canary ordering, stops starting targets after a failure and
+    reports results as they finish. Results are returned in target order.
+    """
+    stop = threading.Event()
+    report_lock = threading.Lock()
+    results: dict[int, TargetResult] = {}
+
+    def run(index: int) -> None:
+        if stop.is_set():
+            result = TargetResult(labels[index], "skipped")
+        else:
+            result = migrate(index)
+            if result.status == "failed":
+                stop.set()
+
+        results[index] = result
+        if on_result is not None:
+            with report_lock:
+                on_result(result)
+
+    remaining = list(range(len(labels)))
+    if canary and remaining:
+        run(remaining.pop(0))
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        for future in [executor.submit(run, index) for index in remaining]:
+            future.result()
+
+    return [results[index] for index in range(len(labels))]
+
+
+def _migrate_target(
+    url: str,
+    registry: MigrationRegistry,
+    up_to: int | None,
+    phase: MigrationPhase | None,
+    engine_options: dict[str, Any] | None,
+    profiles: Mapping[str, Mapping[str, Any]] | None,
+    throttler: "Throttler | None",
+) -> TargetResult:
+    from sqlalchemy import MetaData
+
+    result = TargetResult(display_target(url), "up-to-date")
+    start = perf_counter()
+
+    # Migrations add the tables they create to the runner's metadata, so
+    # targets must not share one.
+    with use_context(
+        database_url=url, metadata=MetaData(), engine_options=engine_options
+    ) as runner:
+        runner.profiles = dict(profiles or {})
+        runner.throttler = throttler
+        try:
+            with runner.connect():
+                pending = registry.pending(runner.get_applied_versions(), phase)
+                if up_to is not None:
+                    pending = [m for m in pending if m.revision <= up_to]
+
+                for migration in runner.upgrade_many(pending):
+                    result.applied.append(migration.revision)
+                    result.status = "applied"
+        except MigrationBatchError as e:
+            result.status = "failed"
+            result.failed_revision = e.migration.revision
+            result.error = e.__cause__
+        except Exception as e:
+            result.status = "failed"
+            result.error = e
+        finally:
+            runner.dispose()
+
+    result.elapsed = perf_counter() - start
+    return result
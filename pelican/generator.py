@@ -1,11 +1,13 @@
 from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .diff.codegen import render_up, render_down
-from .diff.operations import DiffOperation
 from .migration import Migration
 
+if TYPE_CHECKING:
+    from .diff.operations import DiffOperation
+
 _TEMPLATE_DIR: Path = Path(__file__).parent / "templates"
 _DEFAULT_MIGRATION_DIR: Path = Path("db/migrations/")
 
@@ -19,8 +21,10 @@ def _generate_revision() -> int:
 
 
 def _render_autogenerate_body(
-    ops: Sequence[DiffOperation], migration: Migration
+    ops: "Sequence[DiffOperation]", migration: Migration
 ) -> str:
+    from .diff.codegen import render_up, render_down
+
     template = _get_template("autogenerate")
     return template.format(
         revision=migration.revision,
@@ -32,7 +36,7 @@ def _render_autogenerate_body(
 
 def generate_migration(
     name: str,
-    ops: Sequence[DiffOperation] | None = None,
+    ops: "Sequence[DiffOperation] | None" = None,
     migration_dir: str | Path = _DEFAULT_MIGRATION_DIR,
 ) -> Path:
     migration = Migration(revision=_generate_revision(), name=name)
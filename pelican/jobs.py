@@ -0,0 +1,390 @@
+import json
+import os
+import socket
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Any, Literal
+
+from sqlalchemy import Table, Text, and_, insert, inspect, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel, Field
+
+from ._context import get_runner
+from .registry import MigrationRegistry
+from .runner import MigrationRunner
+from .throttle import Throttler
+
+JobStatus = Literal["pending", "running", "done", "failed"]
+
+
+class _BackgroundJob(SQLModel, table=True):
+    __tablename__ = "pelican_job"
+
+    id: int | None = Field(default=None, primary_key=True)
+    revision: int = Field(nullable=False)
+    name: str = Field(max_length=255, nullable=False)
+    args: str = Field(default="{}", sa_type=Text, nullable=False)
+    status: str = Field(default="pending", max_length=16, nullable=False, index=True)
+    checkpoint: str | None = Field(default=None, sa_type=Text)
+    attempts: int = Field(default=0, nullable=False)
+    max_attempts: int = Field(default=3, nullable=False)
+    last_error: str | None = Field(default=None, sa_type=Text)
+    locked_by: str | None = Field(default=None, max_length=255)
+    locked_at: datetime | None = None
+    run_after: datetime = Field(default_factory=datetime.now, nullable=False)
+    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
+    updated_at: datetime = Field(default_factory=datetime.now, nullable=False)
+
+
+_JOB_TABLE: Table = SQLModel.metadata.tables[_BackgroundJob.__tablename__]
+
+
+@dataclass(frozen=True)
+class Job:
+    """A background job as stored in `pelican_job`."""
+
+    id: int
+    revision: int
+    name: str
+    args: dict[str, Any]
+    status: JobStatus
+    checkpoint: Any
+    attempts: int
+    max_attempts: int
+    last_error: str | None
+    updated_at: datetime
+
+    @classmethod
+    def from_row(cls, row: Mapping[Any, Any]) -> "Job":
+        return cls(
+            id=row["id"],
+            revision=row["revision"],
+            name=row["name"],
+            args=json.loads(row["args"]),
+            status=row["status"],
+            checkpoint=(
+                None if row["checkpoint"] is None else json.loads(row["checkpoint"])
+            ),
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            last_error=row["last_error"],
+            updated_at=row["updated_at"],
+        )
+
+
+@dataclass(frozen=True)
+class RunWindow:
+    """A daily time range, in local time, during which jobs may run.
+
+    A window may wrap past midnight (`22:00-06:00`).
+    """
+
+    start: time
+    end: time
+
+    @classmethod
+    def parse(cls, value: str) -> "RunWindow":
+        try:
+            start, end = value.split("-")
+            return cls(
+                time.fromisoformat(start.strip()), time.fromisoformat(end.strip())
+            )
+        except ValueError:
+            raise ValueError(
+                f"Invalid run window '{value}'. Expected format: HH:MM-HH:MM"
+            )
+
+    def __contains__(self, moment: time) -> bool:
+        if self.start <= self.end:
+            return self.start <= moment < self.end
+        return moment >= self.start or moment < self.end
+
+
+def enqueue_job(
+    revision: int,
+    name: str,
+    args: Mapping[str, Any] | None = None,
+    *,
+    max_attempts: int = 3,
+) -> int:
+    """Add a job to `pelican_job` in the active runner's transaction.
+
+    Called from a migration's `up`, the job is only queued if the migration
+    commits. Returns the job's id.
+    """
+    runner = get_runner()
+    with runner.begin() as conn:
+        _ensure_job_table_exists(conn, runner)
+        job_id = conn.execute(
+            insert(_JOB_TABLE)
+            .values(
+                revision=revision,
+                name=name,
+                args=json.dumps(dict(args or {})),
+                max_attempts=max_attempts,
+            )
+            .returning(_JOB_TABLE.c.id)
+        ).scalar_one()
+    return int(job_id)
+
+
+def get_jobs(runner: MigrationRunner) -> list[Job]:
+    """Every queued job, oldest first. Never creates the jobs table."""
+    with runner.begin() as conn:
+        if not inspect(conn).has_table(_JOB_TABLE.name, runner.schema):
+            return []
+        rows = conn.execute(select(_JOB_TABLE).order_by(_JOB_TABLE.c.id))
+        return [Job.from_row(row) for row in rows.mappings()]
+
+
+class Worker:
+    """Claims queued jobs and runs them batch by batch.
+
+    A job function takes the connection, the last checkpoint (`None` on
+    the first batch) and the arguments it was enqueued with. It processes
+    one batch and returns the next checkpoint, or `None` once finished.
+    Each batch and its checkpoint commit together, so a restarted job
+    resumes from the last committed batch.
+
+    Jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so several
+    workers can share a queue. A running job whose worker hasn't
+    checkpointed within `lease` is considered abandoned and claimed again.
+    A failed batch is retried with exponential backoff until the job's
+    `max_attempts` is reached. Outside the `windows`, nothing is claimed
+    and a running job is handed back after its current batch.
+
+    With a `throttler`, the worker waits before each batch while the
+    database is under pressure, and a `batch_size` argument given to
+    `enqueue` is scaled down accordingly.
+
+    ## Example
+
+    ```python
+    from pelican import loader, use_context
+    from pelican.jobs import RunWindow, Worker
+
+    with use_context() as runner:
+        worker = Worker(runner, loader.load_migrations(), windows=[RunWindow.parse("22:00-06:00")])
+        worker.run()
+    ```
+    """
+
+    def __init__(
+        self,
+        runner: MigrationRunner,
+        registry: MigrationRegistry,
+        *,
+        worker_id: str | None = None,
+        windows: Iterable[RunWindow] = (),
+        poll_interval: float = 5.0,
+        lease: timedelta = timedelta(minutes=10),
+        retry_delay: timedelta = timedelta(seconds=30),
+        clock: Callable[[], datetime] = datetime.now,
+        throttler: Throttler | None = None,
+    ) -> None:
+        self.runner = runner
+        self.registry = registry
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.windows = list(windows)
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.throttler = throttler
+        self._stopping = threading.Event()
+
+    def stop(self) -> None:
+        """Finish the current batch, hand its job back and return from `run`."""
+        self._stopping.set()
+
+    def run(
+        self, *, once: bool = False, on_job: Callable[[Job], None] | None = None
+    ) -> int:
+        """Process jobs until stopped, or with `once` until none can run now.
+
+        `on_job` receives each job's state after the worker is done with it.
+        Returns how many jobs were finished.
+        """
+        with self.runner.begin() as conn:
+            _ensure_job_table_exists(conn, self.runner)
+
+        finished = 0
+        while not self._stopping.is_set():
+            job = self.claim() if self.in_window() else None
+            if job is None:
+                if once:
+                    break
+                self._stopping.wait(self.poll_interval)
+                continue
+
+            result = self.run_job(job)
+            if result.status == "done":
+                finished += 1
+            if on_job is not None:
+                on_job(result)
+
+        return finished
+
+    def in_window(self) -> bool:
+        if not self.windows:
+            return True
+        now = self.clock().time()
+        return any(now in window for window in self.windows)
+
+    def claim(self) -> Job | None:
+        """Lock the next runnable job for this worker, or return `None`."""
+        table = _JOB_TABLE
+        now = self.clock()
+
+        with self.runner.begin() as conn:
+            row = (
+                conn.execute(
+                    select(table)
+                    .where(
+                        or_(
+                            and_(
+                                table.c.status == "pending",
+                                table.c.run_after <= now,
+                            ),
+                            and_(
+                                table.c.status == "running",
+                                table.c.locked_at < now - self.lease,
+                            ),
+                        )
+                    )
+                    .order_by(table.c.id)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                .mappings()
+                .first()
+            )
+            if row is None:
+                return None
+
+            conn.execute(
+                update(table)
+                .where(table.c.id == row["id"])
+                .values(
+                    status="running",
+                    locked_by=self.worker_id,
+                    locked_at=now,
+                    updated_at=now,
+                )
+            )
+
+        return Job.from_row({**row, "status": "running", "updated_at": now})
+
+    def run_job(self, job: Job) -> Job:
+        """Run batches of a claimed job until it finishes, fails or must pause."""
+        migration = self.registry.get(job.revision)
+        func = migration.jobs.get(job.name) if migration is not None else None
+        if func is None:
+            return self._fail(
+                job,
+                f"Job '{job.name}' is not defined in migration {job.revision}",
+                retry=False,
+            )
+
+        checkpoint = job.checkpoint
+        while True:
+            if self._stopping.is_set() or not self.in_window():
+                return self._release(job)
+            if self.throttler is not None and not self.throttler.pause(
+                self.runner, wait=self._stopping.wait
+            ):
+                return self._release(job)
+
+            try:
+                with self.runner.begin() as conn:
+                    checkpoint = func(conn, checkpoint, **self._batch_args(job))
+                    self._save_checkpoint(conn, job, checkpoint)
+            except _LeaseLost:
+                return self._load(job.id)
+            except Exception as e:
+                return self._fail(job, f"{type(e).__name__}: {e}", retry=True)
+
+            if checkpoint is None:
+                return self._load(job.id)
+
+    def _batch_args(self, job: Job) -> dict[str, Any]:
+        args = dict(job.args)
+        if self.throttler is not None and isinstance(args.get("batch_size"), int):
+            args["batch_size"] = self.throttler.scaled(args["batch_size"])
+        return args
+
+    def _save_checkpoint(self, conn: Connection, job: Job, checkpoint: Any) -> None:
+        now = self.clock()
+        values: dict[str, Any] = {"locked_at": now, "updated_at": now}
+        if checkpoint is None:
+            values.update(status="done", locked_by=None, locked_at=None)
+        else:
+            values["checkpoint"] = json.dumps(checkpoint)
+
+        result = conn.execute(
+            update(_JOB_TABLE)
+            .where(_JOB_TABLE.c.id == job.id)
+            .where(_JOB_TABLE.c.locked_by == self.worker_id)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            # Another worker reclaimed the job; roll this batch back.
+            raise _LeaseLost()
+
+    def _release(self, job: Job) -> Job:
+        now = self.clock()
+        with self.runner.begin() as conn:
+            conn.execute(
+                update(_JOB_TABLE)
+                .where(_JOB_TABLE.c.id == job.id)
+                .where(_JOB_TABLE.c.locked_by == self.worker_id)
+                .values(
+                    status="pending", locked_by=None, locked_at=None, updated_at=now
+                )
+            )
+        return self._load(job.id)
+
+    def _fail(self, job: Job, error: str, *, retry: bool) -> Job:
+        now = self.clock()
+        attempts = job.attempts + 1
+        values: dict[str, Any] = {
+            "attempts": attempts,
+            "last_error": error,
+            "locked_by": None,
+            "locked_at": None,
+            "updated_at": now,
+        }
+        if retry and attempts < job.max_attempts:
+            values["status"] = "pending"
+            values["run_after"] = now + self.retry_delay * 2 ** (attempts - 1)
+        else:
+            values["status"] = "failed"
+
+        with self.runner.begin() as conn:
+            conn.execute(
+                update(_JOB_TABLE)
+                .where(_JOB_TABLE.c.id == job.id)
+                .where(_JOB_TABLE.c.locked_by == self.worker_id)
+                .values(**values)
+            )
+        return self._load(job.id)
+
+    def _load(self, job_id: int) -> Job:
+        with self.runner.begin() as conn:
+            row = (
+                conn.execute(select(_JOB_TABLE).where(_JOB_TABLE.c.id == job_id))
+                .mappings()
+                .one()
+            )
+        return Job.from_row(row)
+
+
+class _LeaseLost(Exception):
+    pass
+
+
+def _ensure_job_table_exists(conn: Connection, runner: MigrationRunner) -> None:
+    if not inspect(conn).has_table(_JOB_TABLE.name, runner.schema):
+        _JOB_TABLE.create(conn)
@@ -1,23 +1,46 @@
-import os
 import sys
 import importlib.util
 from pathlib import Path
 
 from ._context import get_registry
+from ._types import Migration, parse_file_name
+from .manifest import Manifest, scan_migration_files
 from .registry import MigrationRegistry
 
 
 def discover_migration_files(migrations_dir: Path) -> list[Path]:
-    """Return a sorted list of migration files in the specified directory."""
+    """Return a sorted list of migration files in the specified directory.
+
+    Subdirectories such as `db/migrations/2025/` are included; paths are
+    relative to `migrations_dir`.
+    """
     if not migrations_dir.exists():
         raise FileNotFoundError(f"Migrations directory not found: {migrations_dir}")
 
-    migrations = [Path(f) for f in os.listdir(migrations_dir) if f.endswith(".py")]
+    migrations = [
+        Path(entry.path).relative_to(migrations_dir)
+        for entry in scan_migration_files(migrations_dir)
+    ]
     migrations.sort(reverse=True)
 
     return migrations
 
 
+def get_head_revision(migrations_dir: str | Path = "db/migrations") -> int | None:
+    """Return the highest revision on disk, read from file names alone."""
+    migrations_path = Path(migrations_dir)
+    if not migrations_path.exists():
+        raise FileNotFoundError(f"Migrations directory not found: {migrations_path}")
+
+    return max(
+        (
+            parse_file_name(entry.name)[0]
+            for entry in scan_migration_files(migrations_path)
+        ),
+        default=None,
+    )
+
+
 def load_migration_file(file_path: Path) -> None:
     """Load a single migration file into the system."""
     module_name = file_path.stem
@@ -30,15 +53,34 @@ def load_migration_file(file_path: Path) -> None:
             spec.loader.exec_module(module)
 
 
-def load_migrations(migrations_dir: str | Path = "db/migrations") -> MigrationRegistry:
-    """Load and register all migration files from the specified directory."""
+def unload_migration_file(file_path: Path) -> None:
+    """Drop a migration module loaded by `load_migration_file` from `sys.modules`."""
+    sys.modules.pop(file_path.stem, None)
+
+
+def load_migrations(
+    migrations_dir: str | Path = "db/migrations",
+    manifest_path: str | Path | None = None,
+) -> MigrationRegistry:
+    """Register all migration files from the specified directory.
+
+    Revisions and names are read from the file names alone. A migration's
+    module is imported the first time its `up` or `down` function is needed.
+    With `manifest_path`, files are listed from a persistent `Manifest`
+    that is refreshed from stat checks instead of a full rescan.
+    """
     migrations_path = Path(migrations_dir)
-    files = discover_migration_files(migrations_path)
+
+    if manifest_path is not None:
+        manifest = Manifest.open(migrations_path, manifest_path)
+        files = [Path(entry.path) for entry in manifest]
+    else:
+        files = discover_migration_files(migrations_path)
 
     registry = get_registry()
     registry.clear()
 
     for file_path in files:
-        load_migration_file(migrations_path / file_path)
+        registry.register(Migration.from_path(migrations_path / file_path))
 
     return registry
@@ -0,0 +1,243 @@
+import ast
+import hashlib
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+from ._types import PHASES, MigrationPhase, parse_file_name
+
+DEFAULT_MANIFEST_PATH: Path = Path(".pelican/manifest")
+
+_FORMAT_VERSION = 3
+
+
+@dataclass
+class ManifestEntry:
+    path: str  # relative to the migrations directory, POSIX separators
+    revision: int
+    name: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    has_up: bool
+    has_down: bool
+    phase: MigrationPhase
+
+
+def scan_migration_files(migrations_dir: Path) -> Iterator[os.DirEntry[str]]:
+    """Yield every migration file under `migrations_dir`, including subdirectories."""
+    with os.scandir(migrations_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith((".", "_")):
+                    yield from scan_migration_files(Path(entry.path))
+            elif entry.name.endswith(".py") and not entry.name.startswith("_"):
+                yield entry
+
+
+class Manifest:
+    """Persistent index of the migration files in a directory.
+
+    Each entry records a file's revision, name, size, mtime, content hash,
+    whether it defines `up` and/or `down`, and its phase. `refresh` only
+    stats files; a file is re-read when its size or mtime changed, and
+    re-parsed only when its content hash changed too.
+    When the manifest can't be saved, e.g. on a read-only filesystem, it is
+    still used from memory.
+
+    ## Example
+
+    ```python
+    from pelican.manifest import Manifest
+
+    manifest = Manifest.open("db/migrations")
+    latest = max(entry.revision for entry in manifest)
+    ```
+    """
+
+    def __init__(
+        self,
+        migrations_dir: str | Path,
+        path: str | Path = DEFAULT_MANIFEST_PATH,
+    ) -> None:
+        self.migrations_dir = Path(migrations_dir)
+        self.path = Path(path)
+        self.entries: dict[str, ManifestEntry] = {}
+
+    @classmethod
+    def open(
+        cls,
+        migrations_dir: str | Path,
+        path: str | Path = DEFAULT_MANIFEST_PATH,
+    ) -> "Manifest":
+        """Load the manifest, bring it up to date and save it if anything changed."""
+        manifest = cls(migrations_dir, path)
+        manifest.read()
+
+        if manifest.refresh():
+            try:
+                manifest.write()
+            except OSError:
+                pass
+        return manifest
+
+    def read(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+
+        if (
+            data.get("version") != _FORMAT_VERSION
+            or data.get("migrations_dir") != self.migrations_dir.as_posix()
+        ):
+            return
+
+        self.entries = {
+            entry["path"]: ManifestEntry(**entry) for entry in data["entries"]
+        }
+
+    def write(self) -> None:
+        data = {
+            "version": _FORMAT_VERSION,
+            "migrations_dir": self.migrations_dir.as_posix(),
+            "entries": [asdict(entry) for entry in self],
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, indent=1))
+        os.replace(tmp_path, self.path)
+
+    def refresh(self) -> bool:
+        """Sync entries with the files on disk. Returns whether anything changed."""
+        if not self.migrations_dir.exists():
+            raise FileNotFoundError(
+                f"Migrations directory not found: {self.migrations_dir}"
+            )
+
+        changed = False
+        seen: set[str] = set()
+
+        for dir_entry in scan_migration_files(self.migrations_dir):
+            relative = Path(dir_entry.path).relative_to(self.migrations_dir)
+            key = relative.as_posix()
+            seen.add(key)
+
+            stat = dir_entry.stat()
+            entry = self.entries.get(key)
+            if (
+                entry is not None
+                and entry.mtime_ns == stat.st_mtime_ns
+                and entry.size == stat.st_size
+            ):
+                continue
+
+            self.entries[key] = _index_file(
+                Path(dir_entry.path), key, stat.st_mtime_ns, stat.st_size, entry
+            )
+            changed = True
+
+        for key in self.entries.keys() - seen:
+            del self.entries[key]
+            changed = True
+
+        return changed
+
+    def __iter__(self) -> Iterator[ManifestEntry]:
+        return iter(sorted(self.entries.values(), key=lambda e: e.revision))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _index_file(
+    file_path: Path,
+    key: str,
+    mtime_ns: int,
+    size: int,
+    previous: ManifestEntry | None,
+) -> ManifestEntry:
+    source = file_path.read_bytes()
+    digest = hashlib.sha256(source).hexdigest()
+
+    if previous is not None and previous.sha256 == digest:
+        has_up, has_down = previous.has_up, previous.has_down
+        phase = previous.phase
+    else:
+        has_up, has_down = _find_directions(source)
+        phase = find_phase(source)
+
+    revision, name = parse_file_name(file_path.name)
+    return ManifestEntry(
+        path=key,
+        revision=revision,
+        name=name,
+        mtime_ns=mtime_ns,
+        size=size,
+        sha256=digest,
+        has_up=has_up,
+        has_down=has_down,
+        phase=phase,
+    )
+
+
+def _find_directions(source: bytes) -> tuple[bool, bool]:
+    """Detect `@migration.up`/`@migration.down` decorators without importing the module."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return False, False
+
+    found: set[str] = set()
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if (name := _decorator_name(decorator)) is not None:
+                found.add(name)
+
+    return "up" in found, "down" in found
+
+
+def find_phase(source: bytes) -> MigrationPhase:
+    """Read the phase `@migration.up(phase=...)` declares, without importing.
+
+    Anything but a literal phase counts as `"pre"`, the phase that has to
+    run before the release.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return "pre"
+
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if (
+                not isinstance(decorator, ast.Call)
+                or _decorator_name(decorator) != "up"
+            ):
+                continue
+            for keyword in decorator.keywords:
+                value = keyword.value
+                if (
+                    keyword.arg == "phase"
+                    and isinstance(value, ast.Constant)
+                    and value.value in PHASES
+                ):
+                    return value.value
+    return "pre"
+
+
+def _decorator_name(decorator: ast.expr) -> str | None:
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute):
+        return decorator.attr
+    if isinstance(decorator, ast.Name):
+        return decorator.id
+    return None
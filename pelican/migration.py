@@ -1,7 +1,17 @@
 from pathlib import Path
-from typing import Any, Callable, TypeVar
-
-from ._types import Migration, MigrationError, DuplicateMigrationError
+from typing import Any, Callable, TypeVar, overload
+
+from ._types import (
+    Migration,
+    MigrationError,
+    DuplicateMigrationError,
+    MigrationBatchError,
+    LockContentionError,
+    IntegrityCheckError,
+    IndexBuildError,
+    MigrationPhase,
+    parse_file_name,
+)
 from .registry import MigrationRegistry
 from ._context import get_registry
 
@@ -11,13 +21,37 @@ __all__ = [
     "Migration",
     "MigrationError",
     "DuplicateMigrationError",
+    "MigrationBatchError",
+    "LockContentionError",
+    "IntegrityCheckError",
+    "IndexBuildError",
     "MigrationRegistry",
 ]
 
 
-def up(func: F) -> F:
+@overload
+def up(func: F) -> F: ...
+
+
+@overload
+def up(
+    *, phase: MigrationPhase = "pre", profile: str | None = None
+) -> Callable[[F], F]: ...
+
+
+def up(
+    func: F | None = None,
+    *,
+    phase: MigrationPhase = "pre",
+    profile: str | None = None,
+) -> F | Callable[[F], F]:
     """Decorator to register an 'up' migration.
 
+    Pass `phase="post"` for work the new release doesn't need before it
+    starts, such as index builds or backfills; `pelican up --phase post`
+    applies those after the deploy. `profile` names a tuning profile from
+    `[tool.pelican.profiles]` to apply while the migration runs.
+
     ## Example
 
     ```python
@@ -27,11 +61,22 @@ def up(func: F) -> F:
     @migration.up
     def upgrade() -> None:
         ...
+
+
+    @migration.up(phase="post", profile="bulk")
+    def build_indexes() -> None:
+        ...
     ```
     """
-    revision, name = _extract_migration_information(func)
-    get_registry().register_up(revision, name, func)
-    return func
+
+    def decorator(func: F) -> F:
+        revision, name = _extract_migration_information(func)
+        get_registry().register_up(revision, name, func, phase, profile)
+        return func
+
+    if func is None:
+        return decorator
+    return decorator(func)
 
 
 def down(func: F) -> F:
@@ -53,16 +98,82 @@ def down(func: F) -> F:
     return func
 
 
+def touches(*tables: str) -> Callable[[F], F]:
+    """Declare every table a migration's `up` reads or writes.
+
+    The parallel scheduler normally infers this from the `up` function's
+    source; declare it when that isn't possible, e.g. for raw SQL.
+
+    ## Example
+
+    ```python
+    from pelican import migration
+
+
+    @migration.touches("orders")
+    @migration.up
+    def upgrade() -> None:
+        get_runner().execute(["CREATE INDEX orders_total_idx ON orders (total)"])
+    ```
+    """
+
+    def decorator(func: F) -> F:
+        revision, name = _extract_migration_information(func)
+        get_registry().register_touches(revision, name, tables)
+        return func
+
+    return decorator
+
+
+def job(func: F) -> F:
+    """Decorator to register a background job that `enqueue` can queue.
+
+    The job runs later in `pelican worker`, one batch per call: it receives
+    a connection, the checkpoint returned by the previous batch (`None` at
+    first) and the arguments given to `enqueue`, and returns the next
+    checkpoint, or `None` when there is nothing left to do.
+
+    ## Example
+
+    ```python
+    from sqlalchemy import text
+    from pelican import migration
+
+
+    @migration.job
+    def backfill_emails(conn, checkpoint, batch_size=1000):
+        last_id = checkpoint or 0
+        ids = conn.execute(
+            text("UPDATE users SET email = lower(email) WHERE id IN "
+                 "(SELECT id FROM users WHERE id > :last ORDER BY id LIMIT :n) "
+                 "RETURNING id"),
+            {"last": last_id, "n": batch_size},
+        ).scalars().all()
+        return max(ids) if ids else None
+
+
+    @migration.up(phase="post")
+    def upgrade() -> None:
+        migration.enqueue(backfill_emails, batch_size=5000)
+    ```
+    """
+    revision, name = _extract_migration_information(func)
+    get_registry().register_job(revision, name, func)
+    return func
+
+
+def enqueue(job: Callable[..., Any], *, max_attempts: int = 3, **args: Any) -> int:
+    """Queue a `@migration.job` to run in `pelican worker` with `args`.
+
+    The job is queued in the migration's transaction, and `args` must be
+    JSON serializable. Returns the job's id.
+    """
+    from .jobs import enqueue_job
+
+    revision, _ = _extract_migration_information(job)
+    return enqueue_job(revision, job.__name__, args, max_attempts=max_attempts)
+
+
 def _extract_migration_information(func: F) -> tuple[int, str]:
     file_name = Path(func.__globals__.get("__file__", "")).name
-    base_name = Path(file_name).stem
-
-    try:
-        revision_str, name = base_name.split("_", 1)
-        revision = int(revision_str)
-    except ValueError:
-        raise ValueError(
-            f"Invalid migration file name '{file_name}'. "
-            "Expected format: <revision>_<name>.py"
-        )
-    return revision, name
+    return parse_file_name(file_name)
@@ -0,0 +1,129 @@
+from typing import TYPE_CHECKING, cast
+
+from sqlalchemy import ForeignKeyConstraint, MetaData, Table, inspect
+from sqlalchemy.schema import BLANK_SCHEMA
+from sqlalchemy.engine import Connection, Engine
+
+if TYPE_CHECKING:
+    from .schema.operations import Operation
+
+
+class ReflectionCache:
+    """Run-scoped cache of reflected tables, keyed by table name.
+
+    Each table is reflected at most once per run. After that, the cached
+    `Table` is kept current from the operations Pelican applies to it, so
+    later `change_table` blocks don't go back to the database catalog.
+    Dropping or renaming a column discards the table, which is reflected
+    again on next use.
+    Raw SQL can change anything, so `MigrationRunner.execute` clears the cache.
+
+    With `schema`, tables are reflected from that schema but cached without
+    it, matching the unqualified names migrations use under `search_path`.
+    """
+
+    def __init__(self, schema: str | None = None) -> None:
+        self.schema = schema
+        self.metadata = MetaData()
+        self._table_names: set[str] | None = None
+
+    def get_table(self, bind: Engine | Connection, table_name: str) -> Table:
+        table = self.metadata.tables.get(table_name)
+        if table is None:
+            if self.schema is None:
+                table = Table(table_name, self.metadata, autoload_with=bind)
+            else:
+                reflected = Table(
+                    table_name, MetaData(), schema=self.schema, autoload_with=bind
+                )
+                # None drops the schema; the stubs only admit a name or RETAIN_SCHEMA
+                table = reflected.to_metadata(
+                    self.metadata,
+                    schema=None,  # type: ignore[arg-type]
+                    referred_schema_fn=self._unqualify_referred_schema,
+                )
+        return table
+
+    def has_table(self, bind: Engine | Connection, table_name: str) -> bool:
+        if self._table_names is None:
+            self._table_names = set(inspect(bind).get_table_names(schema=self.schema))
+        return table_name in self._table_names
+
+    def get_dependencies(
+        self, bind: Engine | Connection, table_names: list[str]
+    ) -> dict[str, set[str]]:
+        """Map each table to the tables its foreign keys reference.
+
+        Cached tables answer from memory; the rest are looked up in one
+        multi-table reflection call. Every requested name is in the result,
+        so a table missing from the catalog maps to no dependencies.
+        """
+        dependencies: dict[str, set[str]] = {}
+        uncached = []
+
+        for name in table_names:
+            if (table := self.metadata.tables.get(name)) is not None:
+                dependencies[name] = {
+                    fk.target_fullname.rsplit(".", 2)[-2] for fk in table.foreign_keys
+                }
+            else:
+                uncached.append(name)
+
+        if uncached:
+            reflected = inspect(bind).get_multi_foreign_keys(
+                schema=self.schema, filter_names=uncached
+            )
+            for (_schema, name), fks in reflected.items():
+                dependencies[name] = {fk["referred_table"] for fk in fks}
+            for name in uncached:
+                dependencies.setdefault(name, set())
+
+        return dependencies
+
+    def _unqualify_referred_schema(
+        self,
+        table: Table,
+        to_schema: str | None,
+        constraint: ForeignKeyConstraint,
+        referred: str | None,
+    ) -> str | None:
+        if referred == self.schema:
+            return cast(str, BLANK_SCHEMA)
+        return referred
+
+    def add_table(self, table: Table) -> None:
+        """Record a table Pelican just created, without reflecting it back."""
+        self.discard(table.name)
+        table.to_metadata(self.metadata)
+
+        if self._table_names is not None:
+            self._table_names.add(table.name)
+
+    def add_table_name(self, table_name: str) -> None:
+        """Record a table created by raw DDL; it's reflected on first use."""
+        self.invalidate(table_name)
+
+        if self._table_names is not None:
+            self._table_names.add(table_name)
+
+    def discard(self, table_name: str) -> None:
+        """Forget a table Pelican just dropped."""
+        self.invalidate(table_name)
+
+        if self._table_names is not None:
+            self._table_names.discard(table_name)
+
+    def apply(self, operation: "Operation") -> None:
+        """Mirror an executed operation, or forget the table if it can't be."""
+        if operation.reflects_table:
+            self.invalidate(operation.table_name)
+        elif (table := self.metadata.tables.get(operation.table_name)) is not None:
+            operation.apply(table)
+
+    def invalidate(self, table_name: str | None = None) -> None:
+        """Drop one cached table, or everything when no name is given."""
+        if table_name is None:
+            self.metadata.clear()
+            self._table_names = None
+        elif (table := self.metadata.tables.get(table_name)) is not None:
+            self.metadata.remove(table)
@@ -1,47 +1,107 @@
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable
 from typing import Any, Callable, Iterator, TypeVar
 
-from ._types import Migration, DuplicateMigrationError
+from ._types import Migration, MigrationPhase, DuplicateMigrationError
 
 F = TypeVar("F", bound=Callable[..., Any])
 
 
 class MigrationRegistry:
+    """Migrations keyed by revision, with a sorted revision index.
+
+    The index is maintained on registration, so iteration, `len` and the
+    range queries never re-sort the whole history.
+    """
+
     def __init__(self) -> None:
         self._migrations: dict[int, Migration] = {}
+        self._revisions: list[int] = []
 
-    def register_up(self, revision: int, name: str, func: F) -> None:
-        migration = self._migrations.setdefault(
-            revision, Migration(revision=revision, name=name)
-        )
-
-        if migration.up:
+    def register(self, migration: Migration) -> None:
+        if migration.revision in self._migrations:
             raise DuplicateMigrationError(
-                f"'up' migration already registered for revision {revision}"
+                f"Migration already registered for revision {migration.revision}"
             )
-        migration.up = func
+        self._add(migration)
+
+    def register_up(
+        self,
+        revision: int,
+        name: str,
+        func: F,
+        phase: MigrationPhase = "pre",
+        profile: str | None = None,
+    ) -> None:
+        migration = self._get_or_create(revision, name)
+        migration.phase = phase
+        migration.profile = profile
+        migration.attach("up", func)
 
     def register_down(self, revision: int, name: str, func: F) -> None:
-        migration = self._migrations.setdefault(
-            revision, Migration(revision=revision, name=name)
-        )
+        self._get_or_create(revision, name).attach("down", func)
 
-        if migration.down:
-            raise DuplicateMigrationError(
-                f"'down' migration already registered for revision {revision}"
-            )
-        migration.down = func
+    def register_touches(self, revision: int, name: str, tables: Iterable[str]) -> None:
+        self._get_or_create(revision, name).touches = frozenset(tables)
+
+    def register_job(self, revision: int, name: str, func: F) -> None:
+        self._get_or_create(revision, name).jobs[func.__name__] = func
 
     def get_all(self) -> list[Migration]:
-        return sorted(self._migrations.values(), key=lambda m: m.revision)
+        return [self._migrations[revision] for revision in self._revisions]
 
     def get(self, revision: int) -> Migration | None:
         return self._migrations.get(revision)
 
+    def between(self, start: int, end: int) -> list[Migration]:
+        """Migrations with `start <= revision <= end`, in revision order."""
+        lo = bisect_left(self._revisions, start)
+        hi = bisect_right(self._revisions, end)
+        return [self._migrations[revision] for revision in self._revisions[lo:hi]]
+
+    def after(self, revision: int) -> list[Migration]:
+        """Migrations newer than `revision`, in revision order."""
+        lo = bisect_right(self._revisions, revision)
+        return [self._migrations[rev] for rev in self._revisions[lo:]]
+
+    def latest(self) -> Migration | None:
+        if not self._revisions:
+            return None
+        return self._migrations[self._revisions[-1]]
+
+    def pending(
+        self, applied: Iterable[int], phase: MigrationPhase | None = None
+    ) -> list[Migration]:
+        """Migrations not in `applied`, in revision order, optionally of one phase.
+
+        Filtering by phase imports the pending migration modules.
+        """
+        missing = self._migrations.keys() - set(applied)
+        pending = [self._migrations[revision] for revision in sorted(missing)]
+        if phase is not None:
+            pending = [m for m in pending if m.phase == phase]
+        return pending
+
     def clear(self) -> None:
         self._migrations.clear()
+        self._revisions.clear()
+
+    def _add(self, migration: Migration) -> None:
+        self._migrations[migration.revision] = migration
+        insort(self._revisions, migration.revision)
+
+    def _get_or_create(self, revision: int, name: str) -> Migration:
+        migration = self._migrations.get(revision)
+        if migration is None:
+            migration = Migration(revision=revision, name=name)
+            self._add(migration)
+        return migration
 
     def __len__(self) -> int:
-        return len(self.get_all())
+        return len(self._migrations)
 
     def __iter__(self) -> Iterator[Migration]:
-        return iter(self.get_all())
+        return (self._migrations[revision] for revision in self._revisions)
+
+    def __contains__(self, revision: object) -> bool:
+        return revision in self._migrations
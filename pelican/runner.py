@@ -1,19 +1,62 @@
+import time
 from os import environ
 from datetime import datetime
-from collections.abc import Iterator, Iterable
-from typing import TYPE_CHECKING
-
-from sqlalchemy import inspect, create_engine, MetaData
-from sqlalchemy.engine import Engine
+from collections.abc import Callable, Iterator, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import (
+    Column,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+)
+from sqlalchemy.engine import Engine, Connection, make_url
+from sqlalchemy.exc import DBAPIError, NoSuchTableError
 from sqlalchemy.sql import Executable, DDLElement
 from sqlalchemy.sql.elements import TextClause
-from sqlmodel import SQLModel, Session, Field, select
-
-from ._types import Migration
+from sqlalchemy.schema import CreateTable, CreateIndex, sort_tables
+from sqlmodel import SQLModel, Field, col, select
+
+from ._types import (
+    IndexBuildError,
+    LockContentionError,
+    Migration,
+    MigrationBatchError,
+)
 from .compilers import DialectCompiler, PostgreSQLCompiler, SQLiteCompiler
+from .reflection import ReflectionCache
 
 if TYPE_CHECKING:
-    from .schema.operations import Operation
+    from .schema.operations import CreateIndex as IndexOperation, Operation
+    from .throttle import Throttler
+    from .watchdog import LockWatchdog, Monitor
+
+
+SQLStatement = tuple[str, dict[str, Any]]
+
+
+# Statements to run outside a transaction, and the operation they came from
+_Deferred = tuple["Operation | None", list[SQLStatement]]
+
+
+class Recording(list[SQLStatement]):
+    """SQL collected by `MigrationRunner.recording`.
+
+    `replayable` is false once something ran outside a transaction
+    (`VACUUM`, `REINDEX CONCURRENTLY`), which `replay` can't reproduce.
+    """
+
+    replayable = True
 
 
 _DIALECT_COMPILERS: dict[str, type[DialectCompiler]] = {
@@ -23,7 +66,10 @@ _DIALECT_COMPILERS: dict[str, type[DialectCompiler]] = {
 
 
 def _build_compiler(engine: Engine) -> DialectCompiler:
-    dialect_name = engine.dialect.name
+    return _compiler_class(engine.dialect.name)(engine)
+
+
+def _compiler_class(dialect_name: str) -> type[DialectCompiler]:
     compiler_cls = _DIALECT_COMPILERS.get(dialect_name)
 
     if not compiler_cls:
@@ -32,7 +78,25 @@ def _build_compiler(engine: Engine) -> DialectCompiler:
             f"Supported dialects: {', '.join(_DIALECT_COMPILERS.keys())}"
         )
 
-    return compiler_cls(engine)
+    return compiler_cls
+
+
+def _dependents_first(dependencies: dict[str, set[str]]) -> list[str]:
+    visited: set[str] = set()
+    result: list[str] = []
+
+    def visit(name: str) -> None:
+        if name in visited or name not in dependencies:
+            return
+        visited.add(name)
+        for referenced in sorted(dependencies[name]):
+            visit(referenced)
+        result.append(name)
+
+    for name in sorted(dependencies):
+        visit(name)
+
+    return list(reversed(result))
 
 
 class _SchemaMigration(SQLModel, table=True):
@@ -40,20 +104,94 @@ class _SchemaMigration(SQLModel, table=True):
 
     version: int = Field(primary_key=True)
     applied_at: datetime = Field(default_factory=datetime.now, nullable=False)
+    phase: str = Field(
+        default="pre",
+        max_length=8,
+        nullable=False,
+        sa_column_kwargs={"server_default": "pre"},
+    )
+
+
+_VERSION_TABLE: Table = SQLModel.metadata.tables[_SchemaMigration.__tablename__]
 
 
 class MigrationRunner:
+    """Applies migrations and schema operations to one database.
+
+    The runner creates its own engine from `database_url` (with
+    `engine_options` passed to `create_engine`), or reuses an application's
+    `engine` or open `connection`. With a connection, everything runs on
+    it and joins any transaction already in progress. With `schema`, each
+    transaction resolves unqualified names in that schema, which also holds
+    its own version table.
+
+    With a `lock_watchdog`, every statement is watched for blocking other
+    sessions; a migration whose statement gets cancelled is retried from
+    the start in a new transaction.
+
+    With a `throttler`, `bulk_insert` pauses before each batch while the
+    database is under pressure and shrinks the batches it sends.
+
+    `profiles` are named session settings (e.g. `maintenance_work_mem`)
+    applied while a migration runs: the migration's own `profile`, or else
+    the runner's `profile`.
+
+    Tables changed through the schema DSL are collected in `touched_tables`
+    once their transaction commits; `maintain` refreshes their statistics.
+    Concurrent index builds run after their migration commits, on up to
+    `index_jobs` connections at once for indexes on different tables.
+    """
+
     def __init__(
         self,
         database_url: str | None = None,
         metadata: MetaData | None = None,
+        *,
+        engine: Engine | None = None,
+        connection: Connection | None = None,
+        engine_options: dict[str, Any] | None = None,
+        schema: str | None = None,
+        lock_watchdog: "LockWatchdog | None" = None,
+        throttler: "Throttler | None" = None,
+        profiles: Mapping[str, Mapping[str, Any]] | None = None,
+        profile: str | None = None,
+        index_jobs: int = 1,
     ) -> None:
+        self.schema = schema
+        self.index_jobs = index_jobs
+        self.lock_watchdog = lock_watchdog
+        self._lock_monitor: "Monitor | None" = None
+        self.throttler = throttler
+        self.profiles: dict[str, Mapping[str, Any]] = dict(profiles or {})
+        self.profile = profile
+        self.touched_tables: set[str] = set()
+        self._recording: Recording | None = None
+        self._deferred: list[_Deferred] | None = None
+        self._touching: set[str] = set()
+        self._held: list["Operation"] = []
+        self._holding_on: Connection | None = None
         self._database_url: str | None = None
         self._engine: Engine | None = None
         self._compiler: DialectCompiler | None = None
+        self._connection: Connection | None = None
+        self._external_connection: Connection | None = None
+        self._external_engine: Engine | None = None
+        self._version_table_ready = False
+        self.reflection = ReflectionCache(schema)
+        self.engine_options: dict[str, Any] = dict(engine_options or {})
 
         self.metadata: MetaData = metadata or SQLModel.metadata
-        if url := database_url or environ.get("DATABASE_URL"):
+
+        if connection is not None:
+            self._connection = self._external_connection = connection
+            engine = connection.engine
+
+        if engine is not None:
+            _compiler_class(engine.dialect.name)
+            self._external_engine = engine
+            self._database_url = engine.url.render_as_string(hide_password=False)
+            self._engine = engine
+        elif url := database_url or environ.get("DATABASE_URL"):
             self.database_url = url
 
     @property
@@ -64,9 +202,17 @@ class MigrationRunner:
 
     @database_url.setter
     def database_url(self, url: str) -> None:
+        # Fail fast on an unsupported dialect, but leave creating the engine
+        # (and importing its DBAPI driver) until something connects.
+        _compiler_class(make_url(url).get_backend_name())
+
         self._database_url = url
-        self._engine = create_engine(url)
-        self._compiler = _build_compiler(self._engine)
+        self._engine = self._external_engine = None
+        self._compiler = None
+        if self._connection is self._external_connection:
+            self._connection = self._external_connection = None
+        self._version_table_ready = False
+        self.reflection = ReflectionCache(self.schema)
 
     @property
     def has_database_url(self) -> bool:
@@ -75,86 +221,803 @@ class MigrationRunner:
 
     @property
     def engine(self) -> Engine:
+        """The runner's engine, created on first access."""
         if self._engine is None:
-            raise RuntimeError("Database engine not initialized.")
+            if self._database_url is None:
+                raise RuntimeError("Database engine not initialized.")
+            self._engine = create_engine(self._database_url, **self.engine_options)
         return self._engine
 
     @property
     def compiler(self) -> DialectCompiler:
         if self._compiler is None:
-            raise RuntimeError("Database compiler not initialized.")
+            if self._database_url is None:
+                raise RuntimeError("Database compiler not initialized.")
+            self._compiler = _build_compiler(self.engine)
         return self._compiler
 
-    def get_applied_versions(self) -> Iterator[int]:
-        self._ensure_version_table_exists()
+    def dispose(self) -> None:
+        """Close the pooled connections of an engine this runner created.
 
-        with Session(self.engine) as s:
-            for version in s.exec(select(_SchemaMigration.version)):
-                yield int(version)
+        An engine passed in by the application is left alone.
+        """
+        if self._engine is not None and self._external_engine is None:
+            self._engine.dispose()
 
-    def upgrade(self, migration: Migration) -> None:
-        if not migration.up:
+    def get_applied_versions(self) -> Iterator[int]:
+        with self.begin(recorded=True) as conn:
+            self._ensure_version_table_exists(conn)
+            versions = conn.execute(select(_SchemaMigration.version)).scalars().all()
+        return iter([int(version) for version in versions])
+
+    def get_head_version(self) -> int | None:
+        """Return the highest applied revision, or `None` if nothing is applied.
+
+        This is a single indexed `MAX(version)` query; unlike
+        `get_applied_versions` it never creates the version table.
+        """
+        with self.begin(recorded=True) as conn:
+            if not self._version_table_ready:
+                if not inspect(conn).has_table(_VERSION_TABLE.name, self.schema):
+                    return None
+                self._version_table_ready = True
+
+            head = conn.execute(select(func.max(_VERSION_TABLE.c.version))).scalar()
+        return None if head is None else int(head)
+
+    def upgrade(self, migration: Migration, *, release: bool = False) -> None:
+        """Apply `migration`.
+
+        With `release`, the migration's module and functions and any tables
+        it added to `metadata` or the reflection cache are dropped
+        afterwards, so memory stays flat when streaming through a long
+        history.
+        """
+        up = migration.up
+        if not up:
             raise ValueError("Migration has no upgrade function")
 
-        migration.up()
-        self._record_applied(migration.revision)
+        profile = migration.profile or self.profile
 
-    def downgrade(self, migration: Migration) -> None:
-        if not migration.down:
-            raise ValueError("Migration has no downgrade function")
+        def apply() -> None:
+            with self._migrating(profile) as conn:
+                up()
+                self._record_applied(conn, migration.revision, migration.phase)
 
-        migration.down()
-        self._record_unapplied(migration.revision)
+        with self._releasing(migration, release):
+            self._retrying_lock_contention(apply)
 
-    def execute(self, ddls: Iterable[str | Executable | TextClause]) -> None:
-        compiled_statements: list[tuple[str, dict]] = []
+    def downgrade(self, migration: Migration, *, release: bool = False) -> None:
+        down = migration.down
+        if not down:
+            raise ValueError("Migration has no downgrade function")
 
-        for ddl in ddls:
-            if isinstance(ddl, str):
-                compiled_statements.append((ddl, {}))
-            elif isinstance(ddl, (DDLElement, TextClause)):
-                compiled = ddl.compile(dialect=self.engine.dialect)
-                sql = compiled.string
-                params = compiled.params or {}
-                compiled_statements.append((sql, params))
-            else:
-                raise TypeError(f"Unsupported DDL type: {type(ddl)}")
+        def revert() -> None:
+            with self._migrating(self.profile) as conn:
+                down()
+                self._record_unapplied(conn, migration.revision)
+
+        with self._releasing(migration, release):
+            self._retrying_lock_contention(revert)
+
+    def upgrade_many(
+        self, migrations: Iterable[Migration], *, release: bool = False
+    ) -> Iterator[Migration]:
+        """Apply `migrations` in order on one connection, yielding each as it commits.
+
+        Every migration commits on its own, so when one fails the earlier
+        ones stay applied and `MigrationBatchError` reports how far it got.
+        Concurrent index builds that fail after their migration committed
+        don't stop the batch; they are raised together as `IndexBuildError`
+        once it is done.
+
+        ## Example
+
+        ```python
+        pending = registry.pending(runner.get_applied_versions())
+        for migration in runner.upgrade_many(pending):
+            print(f"Applied {migration.revision}")
+        ```
+        """
+        return self._run_batch(migrations, partial(self.upgrade, release=release))
+
+    def upgrade_parallel(
+        self, migrations: Iterable[Migration], *, jobs: int = 4
+    ) -> Iterator[Migration]:
+        """Like `upgrade_many`, but migrations touching disjoint tables run concurrently.
+
+        See `pelican.scheduler` for how the tables are worked out.
+        """
+        from .scheduler import upgrade_parallel
+
+        return upgrade_parallel(self, migrations, jobs=jobs)
+
+    def downgrade_many(
+        self, migrations: Iterable[Migration], *, release: bool = False
+    ) -> Iterator[Migration]:
+        """Roll back `migrations` in the given order; see `upgrade_many`."""
+        return self._run_batch(migrations, partial(self.downgrade, release=release))
+
+    @contextmanager
+    def connect(self) -> Iterator[Connection]:
+        """Hold one connection open, or reuse the one already held.
+
+        Everything run through the runner inside the block shares the
+        connection; each `begin` on it is still its own transaction.
+
+        ## Example
+
+        ```python
+        with runner.connect():
+            applied = set(runner.get_applied_versions())
+            runner.upgrade(migration)  # same connection, new transaction
+        ```
+        """
+        if self._connection is not None:
+            yield self._connection
+            return
 
         with self.engine.connect() as conn:
-            with conn.begin():
-                for sql, params in compiled_statements:
-                    conn.exec_driver_sql(sql, params)
+            self._connection = conn
+            try:
+                yield conn
+            finally:
+                self._connection = None
+
+    @contextmanager
+    def begin(self, *, recorded: bool = False) -> Iterator[Connection]:
+        """Open a connection and transaction, or join the one already in progress.
+
+        Operations that can't run in a transaction (`VACUUM`, `REINDEX
+        CONCURRENTLY`) are queued and run once the transaction commits;
+        ones held with `defer_operations` run just before it commits.
+
+        SQL run directly on the connection isn't recorded, so an active
+        `recording` is marked not replayable. Pass `recorded` when the block
+        only reads, or changes things through the runner, as the schema DSL
+        does.
+
+        ## Example
+
+        ```python
+        with runner.begin() as conn:
+            table.create(conn)
+            runner.execute_operations(operations)  # same transaction
+        ```
+        """
+        if not recorded and self._recording is not None:
+            self._recording.replayable = False
+
+        with self.connect() as conn:
+            if conn.in_transaction():
+                yield conn
+                return
+
+            self._deferred, self._touching = [], set()
+            try:
+                with conn.begin():
+                    if self.schema is not None:
+                        for sql, params in self._compile(
+                            self.compiler.use_schema(self.schema)
+                        ):
+                            conn.exec_driver_sql(sql, params)
+                    yield conn
+                    self._execute_held()
+                deferred, touched = self._deferred, self._touching
+            finally:
+                self._deferred, self._touching, self._held = None, set(), []
+
+            self.touched_tables |= touched
+            if deferred:
+                self._run_autocommit(conn, deferred)
+
+    def get_profile(self, name: str) -> Mapping[str, Any]:
+        try:
+            return self.profiles[name]
+        except KeyError:
+            raise ValueError(f"Unknown tuning profile '{name}'")
+
+    @contextmanager
+    def tuned(self, profile: str) -> Iterator[Connection]:
+        """Run the block in a transaction with a tuning profile applied.
+
+        The previous values are restored when the block ends.
+
+        ## Example
+
+        ```python
+        runner.profiles["bulk"] = {"maintenance_work_mem": "2GB"}
+        with runner.tuned("bulk"):
+            runner.execute(["CREATE INDEX orders_total_idx ON orders (total)"])
+        ```
+        """
+        with self.begin() as conn, self._tuning(conn, profile):
+            yield conn
+
+    def maintain(
+        self, tables: Iterable[str] | None = None, *, vacuum: bool = False
+    ) -> list[str]:
+        """Refresh planner statistics after migrations, outside any transaction.
+
+        Runs `ANALYZE` on `tables`, by default the `touched_tables` (which
+        are then cleared), skipping any that no longer exist. With `vacuum`,
+        runs `VACUUM (ANALYZE)` instead; SQLite vacuums the whole database
+        file and follows up with `PRAGMA optimize`. Returns the tables
+        maintained.
+
+        ## Example
+
+        ```python
+        for migration in runner.upgrade_many(pending):
+            ...
+        runner.maintain()
+        ```
+        """
+        names = sorted(self.touched_tables if tables is None else set(tables))
+        if tables is None:
+            self.touched_tables.clear()
+        if not names:
+            return []
+
+        with self.begin(recorded=True) as conn:
+            names = [name for name in names if self.reflection.has_table(conn, name)]
+        if names:
+            ddls = (
+                self.compiler.vacuum(names, analyze=True)
+                if vacuum
+                else self.compiler.analyze(names)
+            )
+            self._execute_outside_transaction([(None, self._compile(ddls))])
+        return names
+
+    @contextmanager
+    def recording(self) -> Iterator[Recording]:
+        """Collect the compiled SQL that runs through the runner inside the block.
+
+        Catalog queries and version bookkeeping aren't included, so the
+        result can be passed to `replay` to apply the same migration
+        elsewhere without importing, reflecting or compiling it again.
+        """
+        statements = Recording()
+        previous, self._recording = self._recording, statements
+        try:
+            yield statements
+        finally:
+            self._recording = previous
+
+    def replay(self, migration: Migration, statements: Iterable[SQLStatement]) -> None:
+        """Apply `migration` by running SQL recorded from it with `recording`.
+
+        Only valid for a database or schema in the same state as the one it
+        was recorded on, and for migrations whose SQL doesn't depend on data.
+        """
+
+        profile = migration.profile or self.profile
+
+        def apply() -> None:
+            with self._migrating(profile) as conn:
+                for sql, params in statements:
+                    self._run_statement(conn, sql, params)
+                self._record_applied(conn, migration.revision, migration.phase)
+
+        statements = list(statements)
+        self._retrying_lock_contention(apply)
+
+    def execute(self, ddls: Iterable[str | Executable | TextClause]) -> None:
+        """Execute raw SQL statements in a single transaction.
+
+        Arbitrary SQL can change any table, so this also clears the
+        reflection cache.
+        """
+        self.reflection.invalidate()
+        self._execute(ddls)
 
     def execute_operations(self, operations: Iterable["Operation"]) -> None:
+        operations = list(operations)
         compiled_ddls = []
 
         for operation in operations:
-            ddls = operation.compile(self.compiler)
-            compiled_ddls.extend(list(ddls))
+            if operation.transactional:
+                ddls = operation.compile(self.compiler)
+                compiled_ddls.extend(list(ddls))
 
-        self.execute(compiled_ddls)
+        self._execute(compiled_ddls)
 
-    def _ensure_version_table_exists(self) -> None:
-        inspector = inspect(self.engine)
-        if "pelican_migration" not in inspector.get_table_names():
-            _SchemaMigration.metadata.create_all(self.engine)
+        for operation in operations:
+            if operation.transactional:
+                self.reflection.apply(operation)
+        self._touch(op.table_name for op in operations if op.changes_table)
+
+        outside = [op for op in operations if not op.transactional]
+        if outside:
+            self._execute_outside_transaction(
+                [(op, self._compile(op.compile(self.compiler))) for op in outside]
+            )
 
-    def _record_applied(self, version: int) -> None:
-        self._ensure_version_table_exists()
+    def defer_operations(self, operations: Iterable["Operation"]) -> None:
+        """Hold `operations` back until the current transaction is about to commit.
+
+        Held operations then run in one `execute_operations` pass, after
+        everything else in the transaction (such as bulk loads). In a
+        transaction the runner joined rather than began, such as one open on
+        an application's connection, they run when that transaction commits
+        and are dropped if it rolls back. Outside a transaction they run
+        straight away.
+        """
+        if self._deferred is not None:
+            self._held.extend(operations)
+            return
+
+        conn = self._connection
+        if conn is None or not conn.in_transaction():
+            self.execute_operations(operations)
+            return
+
+        # Listeners can't be removed while they're being dispatched, so
+        # they stay on the connection and do nothing while nothing is held
+        if self._holding_on is not conn:
+            event.listen(conn, "commit", self._run_held_on_commit)
+            event.listen(conn, "rollback", self._drop_held)
+            self._holding_on = conn
+        self._held.extend(operations)
+
+    def _run_held_on_commit(self, conn: Connection) -> None:
+        # Still inside the caller's transaction, just before it commits
+        held, self._held = self._held, []
+        if held:
+            self.execute_operations(held)
+
+    def _drop_held(self, conn: Connection) -> None:
+        self._held = []
+
+    def bulk_insert(
+        self,
+        table_name: str,
+        rows: Iterable[Mapping[str, Any]],
+        *,
+        batch_size: int = 1000,
+    ) -> int:
+        """Insert `rows` into a table, `batch_size` rows per statement execution.
+
+        Returns how many rows were inserted. The rows are data rather than
+        schema, so a recording that includes them can't be replayed. With a
+        `throttler`, every batch after the first waits for its `pause` and is
+        sized by its `scaled`.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        count = 0
+        rows = iter(rows)
+        with self.begin(recorded=True) as conn:
+            statement = insert(self.reflection.get_table(conn, table_name))
+            if self._recording is not None:
+                self._recording.replayable = False
+
+            size = batch_size
+            # Peek at the next row so the throttler only pauses between batches
+            while (first := next(rows, None)) is not None:
+                if count and self.throttler is not None:
+                    self.throttler.pause(self)
+                    size = self.throttler.scaled(batch_size)
+                batch = [dict(first), *(dict(row) for row in islice(rows, size - 1))]
+                conn.execute(statement, batch)
+                count += len(batch)
+
+        self._touch([table_name])
+        return count
+
+    def create_tables(
+        self, tables: Iterable[Table], *, foreign_keys: bool = True
+    ) -> list[Table]:
+        """Create the tables that don't exist yet, parents before children.
+
+        Existence is answered by the reflection cache and everything is
+        emitted in one transaction. Returns the tables that were created.
+        Without `foreign_keys`, the tables are created without their foreign
+        key constraints, for the caller to add later.
+        """
+        with self.begin(recorded=True) as conn:
+            missing = [t for t in tables if not self.reflection.has_table(conn, t.name)]
+
+            for table in missing:
+                self._resolve_references(conn, table)
+
+            ddls: list[DDLElement] = []
+            for table in sort_tables(missing):
+                ddls.append(
+                    CreateTable(table)
+                    if foreign_keys
+                    else CreateTable(table, include_foreign_key_constraints=[])
+                )
+                ddls.extend(CreateIndex(index) for index in table.indexes)
+            self._execute(ddls)
+
+        for table in missing:
+            self.reflection.add_table(table)
+        self._touch(table.name for table in missing)
+        return missing
+
+    def drop_tables(self, table_names: Iterable[str], cascade: bool = False) -> None:
+        """Drop tables in one transaction, referencing tables first.
+
+        Raises `NoSuchTableError` before dropping anything if one of the
+        tables doesn't exist.
+        """
+        names = list(table_names)
+        if not names:
+            return
+
+        with self.begin(recorded=True) as conn:
+            missing = [n for n in names if not self.reflection.has_table(conn, n)]
+            if missing:
+                raise NoSuchTableError(", ".join(missing))
+            ordered = _dependents_first(self.reflection.get_dependencies(conn, names))
+            self._execute(self.compiler.drop_tables(ordered, cascade=cascade))
+
+        for name in names:
+            self.reflection.discard(name)
+            self.touched_tables.discard(name)
+            self._touching.discard(name)
+
+    def _run_batch(
+        self, migrations: Iterable[Migration], step: Callable[[Migration], None]
+    ) -> Iterator[Migration]:
+        completed: list[Migration] = []
+        index_failures: dict[str, BaseException] = {}
+        built: list[str] = []
+
+        with self.connect():
+            for migration in migrations:
+                try:
+                    step(migration)
+                except IndexBuildError as e:
+                    # The migration committed before its index builds ran
+                    index_failures.update(e.failures)
+                    built.extend(e.built)
+                except Exception as e:
+                    raise MigrationBatchError(
+                        migration, completed, index_failures
+                    ) from e
+                completed.append(migration)
+                yield migration
+
+        if index_failures:
+            raise IndexBuildError(index_failures, built)
+
+    @contextmanager
+    def _migrating(self, profile: str | None = None) -> Iterator[Connection]:
+        # The migration body and its version row commit or roll back together.
+        # A rollback may undo tables the cache already recorded, so drop it.
+        try:
+            with (
+                self.begin(recorded=True) as conn,
+                self._watching(conn),
+                self._tuning(conn, profile),
+            ):
+                yield conn
+                # Held index and foreign key builds benefit from the profile too
+                self._execute_held()
+        except BaseException:
+            self.reflection.invalidate()
+            raise
+
+    @contextmanager
+    def _watching(self, conn: Connection) -> Iterator[None]:
+        # One monitor connection and thread for the whole migration
+        if self.lock_watchdog is None or self._lock_monitor is not None:
+            yield
+            return
+
+        with self.lock_watchdog.monitoring(conn) as monitor:
+            self._lock_monitor = monitor
+            try:
+                yield
+            finally:
+                self._lock_monitor = None
+
+    @contextmanager
+    def _tuning(self, conn: Connection, profile: str | None) -> Iterator[None]:
+        if profile is None:
+            yield
+            return
+
+        settings = self.get_profile(profile)
+        compiler = self.compiler
+        previous = {
+            name: conn.execute(compiler.get_setting(name)).scalar() for name in settings
+        }
+
+        def apply(values: Mapping[str, Any]) -> None:
+            for name, value in values.items():
+                for sql, params in self._compile(compiler.set_setting(name, value)):
+                    conn.exec_driver_sql(sql, params)
+
+        apply(settings)
+        try:
+            yield
+        except BaseException:
+            if not compiler.settings_roll_back:
+                apply(previous)
+            raise
+        apply(previous)
+
+    @contextmanager
+    def _releasing(self, migration: Migration, release: bool) -> Iterator[None]:
+        if not release:
+            yield
+            return
+
+        known_tables = set(self.metadata.tables)
+        cached_tables = set(self.reflection.metadata.tables)
+        try:
+            yield
+        finally:
+            for key in set(self.metadata.tables) - known_tables:
+                self.metadata.remove(self.metadata.tables[key])
+            # Tables the migration created or first reflected are reflected
+            # again if a later migration needs them, so the cache stays flat.
+            for key in set(self.reflection.metadata.tables) - cached_tables:
+                self.reflection.invalidate(key)
+            migration.release()
+
+    def _resolve_references(self, conn: Connection, table: Table) -> None:
+        # Tables from earlier migrations may not be in metadata (another process,
+        # or released after streaming); pull the referenced ones from the cache.
+        for fk in table.foreign_keys:
+            ref_name = fk.target_fullname.rsplit(".", 2)[-2]
+            if ref_name in table.metadata.tables:
+                continue
+            if self.reflection.has_table(conn, ref_name):
+                self.reflection.get_table(conn, ref_name).to_metadata(table.metadata)
+
+    def _execute_held(self) -> None:
+        held, self._held = self._held, []
+        if held:
+            self.execute_operations(held)
+
+    def _execute(self, ddls: Iterable[str | Executable | TextClause]) -> None:
+        compiled_statements = self._compile(ddls)
+        if self._recording is not None:
+            self._recording.extend(compiled_statements)
+
+        with self.begin(recorded=True) as conn:
+            for sql, params in compiled_statements:
+                self._run_statement(conn, sql, params)
+
+    def _execute_outside_transaction(self, items: list["_Deferred"]) -> None:
+        if self._deferred is not None:
+            self._deferred.extend(items)
+            return
+
+        with self.connect() as conn:
+            if conn.in_transaction():
+                raise RuntimeError(
+                    "VACUUM, REINDEX CONCURRENTLY and concurrent index builds "
+                    "can't run inside a transaction the runner didn't start"
+                )
+            self._run_autocommit(conn, items)
+
+    def _run_autocommit(self, conn: Connection, items: list["_Deferred"]) -> None:
+        # Not watched: the migration has committed, so a lock-contention
+        # retry would apply it twice. None of these block writes anyway.
+        from .schema.operations import CreateIndex as IndexOperation
+
+        if self._recording is not None:
+            self._recording.replayable = False
+
+        with self._autocommit(conn):
+            builds: list[tuple[IndexOperation, list[SQLStatement]]] = []
+            for operation, statements in items:
+                if isinstance(operation, IndexOperation):
+                    builds.append((operation, statements))
+                    continue
+
+                self._build_indexes(conn, builds)
+                builds = []
+                for sql, params in statements:
+                    conn.exec_driver_sql(sql, params)
+                if operation is not None:
+                    self.reflection.apply(operation)
+            self._build_indexes(conn, builds)
 
-        with Session(self.engine) as session:
-            session.add(_SchemaMigration(version=version))
-            session.commit()
+    def _build_indexes(
+        self,
+        conn: Connection,
+        builds: list[tuple["IndexOperation", list[SQLStatement]]],
+    ) -> None:
+        if not builds:
+            return
+
+        failures: dict[str, BaseException] = {}
+        built: list["IndexOperation"] = []
+
+        def build_all(
+            connection: Connection,
+            entries: list[tuple["IndexOperation", list[SQLStatement]]],
+        ) -> None:
+            for operation, statements in entries:
+                try:
+                    for sql, params in statements:
+                        connection.exec_driver_sql(sql, params)
+                except DBAPIError as e:
+                    failures[operation.index_name] = e
+                    self._drop_invalid_index(connection, operation)
+                else:
+                    built.append(operation)
+
+        by_table: dict[str, list[tuple["IndexOperation", list[SQLStatement]]]] = {}
+        for build in builds:
+            by_table.setdefault(build[0].table_name, []).append(build)
+
+        # Builds on one table would queue behind each other's locks, so each
+        # table gets one connection. SQLite has a single writer.
+        jobs = min(self.index_jobs, len(by_table))
+        if jobs <= 1 or conn.dialect.name == "sqlite":
+            build_all(conn, builds)
+        else:
+
+            def build_table(
+                entries: list[tuple["IndexOperation", list[SQLStatement]]],
+            ) -> None:
+                with self.engine.connect() as worker, self._autocommit(worker):
+                    build_all(worker, entries)
+
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(build_table, by_table.values()))
+
+        for operation in built:
+            self.reflection.apply(operation)
+        if failures:
+            raise IndexBuildError(failures, [op.index_name for op in built])
+
+    def _drop_invalid_index(
+        self, conn: Connection, operation: "IndexOperation"
+    ) -> None:
+        # A failed concurrent build on PostgreSQL leaves an INVALID index
+        # behind, which would make the next attempt fail as a duplicate.
+        query = self.compiler.invalid_index(operation.index_name)
+        if query is None or conn.execute(query).first() is None:
+            return
+        for sql, params in self._compile(
+            self.compiler.drop_index(
+                operation.table_name, operation.index_name, concurrently=True
+            )
+        ):
+            conn.exec_driver_sql(sql, params)
+
+    @contextmanager
+    def _autocommit(self, conn: Connection) -> Iterator[None]:
+        schema = self.schema
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            # SET LOCAL means nothing outside a transaction; set it for the
+            # session and reset it before the connection goes back to the pool.
+            if schema is not None:
+                for sql, params in self._compile(
+                    self.compiler.use_session_schema(schema)
+                ):
+                    conn.exec_driver_sql(sql, params)
+            try:
+                yield
+            finally:
+                if schema is not None:
+                    for sql, params in self._compile(
+                        self.compiler.reset_session_schema()
+                    ):
+                        conn.exec_driver_sql(sql, params)
+        finally:
+            conn.commit()
+            conn.execution_options(isolation_level=conn.default_isolation_level)
+
+    def _touch(self, table_names: Iterable[str]) -> None:
+        # Inside a runner transaction, tables only count once it commits
+        target = self._touching if self._deferred is not None else self.touched_tables
+        target.update(table_names)
+
+    def _run_statement(
+        self, conn: Connection, sql: str, params: dict[str, Any]
+    ) -> None:
+        watchdog = self.lock_watchdog
+        if watchdog is None:
+            conn.exec_driver_sql(sql, params)
+            return
+
+        from .watchdog import is_cancellation
+
+        error: DBAPIError | None = None
+        with ExitStack() as stack:
+            monitor = self._lock_monitor
+            if monitor is None or monitor.conn is not conn:
+                monitor = stack.enter_context(watchdog.monitoring(conn))
+            with monitor.watch(sql) as watch:
+                try:
+                    conn.exec_driver_sql(sql, params)
+                except DBAPIError as e:
+                    error = e
+
+        # Only read the report once the watch has ended; until then a
+        # cancellation may not be recorded yet. A report whose statement
+        # finished anyway, or failed for another reason, is dropped.
+        if error is None:
+            return
+        if watch.report is None or not is_cancellation(error):
+            raise error
+        watchdog.record(watch.report)
+        raise LockContentionError(watch.report) from error
+
+    def _retrying_lock_contention(self, attempt: Callable[[], None]) -> None:
+        # A cancelled statement aborts the whole transaction, so the retry
+        # starts the migration over. Inside a caller's transaction there's
+        # nothing we can retry.
+        retry = 0
+        while True:
+            known_tables = set(self.metadata.tables)
+            try:
+                attempt()
+                return
+            except LockContentionError:
+                watchdog = self.lock_watchdog
+                if (
+                    watchdog is None
+                    or retry >= watchdog.retries
+                    or (
+                        self._connection is not None
+                        and self._connection.in_transaction()
+                    )
+                ):
+                    raise
+                for key in set(self.metadata.tables) - known_tables:
+                    self.metadata.remove(self.metadata.tables[key])
+                time.sleep(watchdog.delay(retry))
+                retry += 1
+
+    def _compile(
+        self, ddls: Iterable[str | Executable | TextClause]
+    ) -> list[SQLStatement]:
+        compiled_statements: list[SQLStatement] = []
 
-    def _record_unapplied(self, version: int) -> None:
-        self._ensure_version_table_exists()
+        for ddl in ddls:
+            if isinstance(ddl, str):
+                compiled_statements.append((ddl, {}))
+            elif isinstance(ddl, (DDLElement, TextClause)):
+                compiled = ddl.compile(dialect=self.engine.dialect)
+                sql = compiled.string
+                params = compiled.params or {}
+                compiled_statements.append((sql, params))
+            else:
+                raise TypeError(f"Unsupported DDL type: {type(ddl)}")
 
-        with Session(self.engine) as session:
-            statement = select(_SchemaMigration).where(
-                _SchemaMigration.version == version
+        return compiled_statements
+
+    def _ensure_version_table_exists(self, conn: Connection) -> None:
+        if self._version_table_ready:
+            return
+
+        inspector = inspect(conn)
+        if not inspector.has_table(_VERSION_TABLE.name, self.schema):
+            _VERSION_TABLE.create(conn)
+        elif "phase" not in {
+            c["name"] for c in inspector.get_columns(_VERSION_TABLE.name, self.schema)
+        }:
+            # Version tables created before migration phases existed
+            phase = Column("phase", String(8), nullable=False, server_default="pre")
+            for statement in self.compiler.add_column(_VERSION_TABLE.name, phase):
+                conn.execute(statement)
+        self._version_table_ready = True
+
+    def _record_applied(self, conn: Connection, version: int, phase: str) -> None:
+        self._ensure_version_table_exists(conn)
+        conn.execute(
+            insert(_VERSION_TABLE).values(
+                version=version, applied_at=datetime.now(), phase=phase
             )
-            results = session.exec(statement)
-            revision = results.one()
+        )
 
-            session.delete(revision)
-            session.commit()
+    def _record_unapplied(self, conn: Connection, version: int) -> None:
+        self._ensure_version_table_exists(conn)
+        result = conn.execute(
+            delete(_VERSION_TABLE).where(_VERSION_TABLE.c.version == version)
+        )
+        if result.rowcount == 0:
+            raise ValueError(f"Migration {version} is not applied")
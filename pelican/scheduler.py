@@ -0,0 +1,260 @@
+import ast
+import inspect
+import textwrap
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import inflection
+
+from ._context import use_context
+from ._types import IndexBuildError, Migration, MigrationBatchError
+
+if TYPE_CHECKING:
+    from .runner import MigrationRunner
+
+_TABLE_HELPERS = {"create_table", "change_table"}
+
+
+@dataclass(frozen=True)
+class Footprint:
+    """Tables a migration changes (`writes`) or only relies on (`reads`)."""
+
+    writes: frozenset[str]
+    reads: frozenset[str] = frozenset()
+
+    def conflicts_with(self, other: "Footprint") -> bool:
+        return bool(
+            self.writes & (other.writes | other.reads) or self.reads & other.writes
+        )
+
+
+def get_footprint(migration: Migration) -> Footprint | None:
+    """The tables `migration` touches, or `None` when they can't be known.
+
+    `@migration.touches` wins; otherwise the `up` function's source is read
+    for `create_table`, `change_table`, `drop_table(s)`, `references` and
+    `ForeignKey` calls with literal names. Anything else (raw SQL, helper functions,
+    computed names) makes the footprint unknown.
+    """
+    if migration.touches is not None:
+        return Footprint(writes=migration.touches)
+    if migration.up is None:
+        return None
+    return infer_footprint(migration.up)
+
+
+def infer_footprint(func: Callable[..., Any]) -> Footprint | None:
+    try:
+        source = textwrap.dedent(inspect.getsource(func))
+        function = ast.parse(source).body[0]
+    except (OSError, TypeError, SyntaxError, IndexError):
+        return None
+
+    if not isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return None
+
+    visitor = _FootprintVisitor()
+    for statement in function.body:
+        visitor.visit(statement)
+
+    if visitor.unknown:
+        return None
+    return Footprint(
+        frozenset(visitor.writes), frozenset(visitor.reads - visitor.writes)
+    )
+
+
+def build_graph(migrations: Iterable[Migration]) -> dict[int, set[int]]:
+    """Map each revision to the earlier revisions it must wait for.
+
+    Migrations wait for every earlier one they conflict with; a migration
+    with an unknown footprint waits for, and is waited on by, all others.
+    """
+    graph: dict[int, set[int]] = {}
+    seen: list[tuple[int, Footprint | None]] = []
+
+    for migration in migrations:
+        footprint = get_footprint(migration)
+        graph[migration.revision] = {
+            revision
+            for revision, earlier in seen
+            if footprint is None or earlier is None or footprint.conflicts_with(earlier)
+        }
+        seen.append((migration.revision, footprint))
+
+    return graph
+
+
+def upgrade_parallel(
+    runner: "MigrationRunner", migrations: Iterable[Migration], *, jobs: int = 4
+) -> Iterator[Migration]:
+    """Apply `migrations`, running those that don't conflict at the same time.
+
+    Each migration runs on its own connection from `runner`'s engine and
+    commits on its own. Conflicting migrations keep revision order. After a
+    failure nothing new is started; once running migrations finish,
+    `MigrationBatchError` is raised. Failed concurrent index builds are
+    raised as `IndexBuildError` at the end, as with `upgrade_many`. SQLite
+    has a single writer, so there migrations run one at a time on `runner`
+    itself.
+    """
+    from sqlalchemy import MetaData
+
+    if runner.engine.dialect.name == "sqlite":
+        yield from runner.upgrade_many(migrations)
+        return
+
+    migrations = list(migrations)
+    for migration in migrations:
+        migration.load()
+
+    graph = build_graph(migrations)
+    by_revision = {m.revision: m for m in migrations}
+    waiting = [m.revision for m in migrations]
+    done: set[int] = set()
+    completed: list[Migration] = []
+    failure: tuple[Migration, BaseException] | None = None
+    index_failures: dict[str, BaseException] = {}
+    built: list[str] = []
+
+    def apply(migration: Migration) -> None:
+        with use_context(
+            engine=runner.engine, schema=runner.schema, metadata=MetaData()
+        ) as worker:
+            worker.profiles = runner.profiles
+            worker.profile = runner.profile
+            worker.lock_watchdog = runner.lock_watchdog
+            worker.throttler = runner.throttler
+            worker.index_jobs = runner.index_jobs
+            worker.upgrade(migration)
+        runner.touched_tables.update(worker.touched_tables)
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        running: dict[Future[None], Migration] = {}
+
+        while waiting or running:
+            if failure is None:
+                for revision in [r for r in waiting if graph[r] <= done]:
+                    if len(running) >= jobs:
+                        break
+                    waiting.remove(revision)
+                    migration = by_revision[revision]
+                    running[executor.submit(apply, migration)] = migration
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                migration = running.pop(future)
+                error = future.exception()
+                if isinstance(error, IndexBuildError):
+                    # The migration committed before its index builds ran
+                    index_failures.update(error.failures)
+                    built.extend(error.built)
+                elif error is not None:
+                    failure = failure or (migration, error)
+                    continue
+                done.add(migration.revision)
+                completed.append(migration)
+                yield migration
+
+    if failure is not None:
+        migration, error = failure
+        raise MigrationBatchError(migration, completed, index_failures) from error
+    if index_failures:
+        raise IndexBuildError(index_failures, built)
+
+
+class _FootprintVisitor(ast.NodeVisitor):
+    def __init__(self) -> None:
+        self.writes: set[str] = set()
+        self.reads: set[str] = set()
+        self.builders: set[str] = set()
+        self.unknown = False
+
+    def visit_With(self, node: ast.With) -> None:
+        for item in node.items:
+            call = item.context_expr
+            table = None
+            if isinstance(call, ast.Call) and _callee(call) in _TABLE_HELPERS:
+                table = _literal(call.args[0] if call.args else None)
+
+            if table is None:
+                self.unknown = True
+                continue
+
+            self.writes.add(table)
+            if isinstance(item.optional_vars, ast.Name):
+                self.builders.add(item.optional_vars.id)
+
+        for statement in node.body:
+            self.visit(statement)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and func.value.id in self.builders
+        ):
+            # Builder methods only change their own table; of their arguments
+            # only foreign keys point at another one.
+            if func.attr == "references":
+                model = _literal(node.args[0] if node.args else None)
+                if model is None:
+                    self.unknown = True
+                else:
+                    self.reads.add(inflection.pluralize(model))
+            self._visit_foreign_keys(node)
+            return
+
+        callee = _callee(node)
+        if callee == "drop_table":
+            table = _literal(node.args[0] if node.args else None)
+            if table is None:
+                self.unknown = True
+            else:
+                self.writes.add(table)
+        elif callee == "drop_tables" and node.args:
+            names = node.args[0]
+            tables = (
+                [_literal(e) for e in names.elts]
+                if isinstance(names, (ast.List, ast.Tuple))
+                else [None]
+            )
+            if None in tables:
+                self.unknown = True
+            else:
+                self.writes.update(t for t in tables if t is not None)
+        else:
+            self.unknown = True
+
+    def _visit_foreign_keys(self, node: ast.Call) -> None:
+        arguments = [*node.args, *(keyword.value for keyword in node.keywords)]
+        for argument in arguments:
+            for child in ast.walk(argument):
+                if not (isinstance(child, ast.Call) and _callee(child) == "ForeignKey"):
+                    continue
+                # ForeignKey('users.id') or ForeignKey('public.users.id')
+                target = _literal(child.args[0] if child.args else None)
+                if target is None or target.count(".") < 1:
+                    self.unknown = True
+                else:
+                    self.reads.add(target.split(".")[-2])
+
+
+def _callee(node: ast.Call) -> str | None:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+def _literal(node: ast.expr | None) -> str | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
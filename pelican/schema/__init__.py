@@ -1,7 +1,39 @@
-from .helpers import create_table, change_table, drop_table
+from .helpers import (
+    create_table,
+    change_table,
+    drop_table,
+    create_tables,
+    drop_tables,
+    vacuum,
+    reindex,
+    bulk_insert,
+)
+from .partitions import (
+    range_,
+    list_,
+    hash_,
+    create_partition,
+    attach_partition,
+    detach_partition,
+    create_future_partitions,
+    drop_expired_partitions,
+)
 
 __all__ = [
     "create_table",
     "change_table",
     "drop_table",
+    "create_tables",
+    "drop_tables",
+    "vacuum",
+    "reindex",
+    "bulk_insert",
+    "range_",
+    "list_",
+    "hash_",
+    "create_partition",
+    "attach_partition",
+    "detach_partition",
+    "create_future_partitions",
+    "drop_expired_partitions",
 ]
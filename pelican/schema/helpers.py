@@ -1,4 +1,5 @@
-from typing import TypeVar, Any, Iterator
+import re
+from typing import TypeVar, Any, Iterable, Iterator, Mapping
 from contextlib import contextmanager
 from sqlalchemy.sql import func
 from sqlalchemy import (
@@ -13,19 +14,27 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     MetaData,
+    PrimaryKeyConstraint,
 )
 import inflection
 
 from pelican._context import get_runner
+from pelican.compilers import DialectCompiler
+from pelican.compilers.compiler import split_index_element
 from pelican.schema.operations import (
     Operation,
     AddColumn,
+    AddForeignKey,
     DropColumn,
     RenameColumn,
     AlterColumn,
     CreateIndex,
     RemoveIndex,
+    Reindex,
+    Vacuum,
+    ValidateForeignKey,
 )
+from pelican.schema.partitions import PartitionBy
 
 _T = TypeVar("_T", bound=Any)
 
@@ -112,16 +121,47 @@ class TableBuilder:
         )
 
     def index(
-        self, column_names: list[str], *, name: str | None = None, unique: bool = False
+        self,
+        column_names: list[str],
+        *,
+        name: str | None = None,
+        unique: bool = False,
+        concurrently: bool = False,
+        where: str | None = None,
+        include: list[str] | None = None,
+        using: str | None = None,
     ) -> None:
+        """Add an index.
+
+        Each entry is a column name or an SQL expression like
+        `lower(email)`, optionally followed by an operator class such as
+        `text_pattern_ops`, `ASC`/`DESC` and `NULLS FIRST`/`NULLS LAST`.
+        `where` makes it a partial index. On PostgreSQL, `include` adds
+        covering columns and `using` picks the access method (`gin`,
+        `gist`, `brin`, `hash`).
+
+        With `concurrently`, the index is built after the migration commits
+        without blocking writes on PostgreSQL; such builds on different
+        tables run in parallel up to the runner's `index_jobs`.
+        """
         if not column_names:
             raise ValueError("At least one column name is required for an index")
 
         if name is None:
-            name = f"{self.table_name}_{'_'.join(column_names)}_idx"
+            name = _index_name(self.table_name, column_names)
 
         self.operations.append(
-            CreateIndex(self.table_name, name, column_names, unique=unique)
+            CreateIndex(
+                self.table_name,
+                name,
+                column_names,
+                unique=unique,
+                concurrently=concurrently,
+                where=where,
+                include=include,
+                using=using,
+                table_columns=frozenset(column.name for column in self.table.c),
+            )
         )
 
     def remove_index(
@@ -133,15 +173,40 @@ class TableBuilder:
         if not name:
             if not column_names:
                 raise ValueError("At least one column name is required for an index")
-            name = f"{self.table_name}_{'_'.join(column_names)}_idx"
+            name = _index_name(self.table_name, column_names)
 
         self.operations.append(RemoveIndex(self.table_name, name))
 
 
+def _index_name(table_name: str, column_names: list[str]) -> str:
+    # `lower(email) DESC` names the index after `lower_email`
+    parts = [
+        re.sub(r"\W+", "_", split_index_element(name).expression).strip("_")
+        for name in column_names
+    ]
+    return f"{table_name}_{'_'.join(parts)}_idx"
+
+
 @contextmanager
-def create_table(table_name: str, primary_key: bool = True) -> Iterator[TableBuilder]:
+def create_table(
+    table_name: str,
+    primary_key: bool = True,
+    *,
+    defer_indexes: bool = False,
+    partition_by: PartitionBy | None = None,
+) -> Iterator[TableBuilder]:
     """Create a new table
 
+    With `partition_by` (`range_`, `list_` or `hash_`), the table is a
+    PostgreSQL partitioned table; add partitions with `create_partition`.
+    The partition columns join the primary key, as PostgreSQL requires.
+
+    With `defer_indexes`, the table is created without the indexes added
+    with `t.index` and, on PostgreSQL, without its foreign keys. They are
+    built in one pass when the migration is about to commit, after any rows
+    loaded into the table. Foreign keys are added `NOT VALID` and then
+    validated, so the rows are checked once in bulk instead of one by one.
+
     ## Example
 
     ```python
@@ -161,11 +226,73 @@ def create_table(table_name: str, primary_key: bool = True) -> Iterator[TableBui
     builder = TableBuilder(table_name, runner.metadata, primary_key=primary_key)
     yield builder
 
-    with runner.engine.connect() as conn:
-        with conn.begin():
-            builder.table.create(conn, checkfirst=True)
+    if partition_by is not None:
+        _partition(builder.table, partition_by, runner.compiler)
 
-    runner.execute_operations(builder.operations)
+    with runner.begin(recorded=True):
+        if not defer_indexes:
+            runner.create_tables([builder.table])
+            runner.execute_operations(builder.operations)
+            return
+
+        defer_foreign_keys = runner.compiler.alter_foreign_keys
+        created = runner.create_tables(
+            [builder.table], foreign_keys=not defer_foreign_keys
+        )
+        held = list(builder.operations)
+        if created and defer_foreign_keys:
+            held.extend(_foreign_key_operations(builder.table))
+        runner.defer_operations(held)
+
+
+def _partition(
+    table: Table, partition_by: PartitionBy, compiler: DialectCompiler
+) -> None:
+    clause = compiler.partition_clause(
+        partition_by.strategy, list(partition_by.columns)
+    )
+
+    missing = [name for name in partition_by.columns if name not in table.c]
+    if missing:
+        raise ValueError(
+            f"Cannot partition '{table.name}' by missing column(s): {', '.join(missing)}"
+        )
+
+    primary_key = list(table.primary_key.columns)
+    if primary_key:
+        extra = [table.c[name] for name in partition_by.columns]
+        extra = [column for column in extra if column not in primary_key]
+        for column in extra:
+            column.primary_key = True
+        table.append_constraint(PrimaryKeyConstraint(*primary_key, *extra))
+
+    table.dialect_options["postgresql"]["partition_by"] = clause
+
+
+def _foreign_key_operations(table: Table) -> list[Operation]:
+    additions: list[Operation] = []
+    validations: list[Operation] = []
+
+    for fk in sorted(table.foreign_key_constraints, key=lambda c: list(c.column_keys)):
+        # PostgreSQL's own name for an unnamed constraint
+        name = (
+            fk.name
+            if isinstance(fk.name, str)
+            else f"{table.name}_{'_'.join(fk.column_keys)}_fkey"
+        )
+        additions.append(
+            AddForeignKey(
+                table.name,
+                name,
+                list(fk.column_keys),
+                fk.referred_table.name,
+                [element.column.name for element in fk.elements],
+                on_delete=fk.ondelete,
+                validate=False,
+            )
+        )
+        validations.append(ValidateForeignKey(table.name, name))
+    return additions + validations
 
 
 @contextmanager
@@ -188,14 +315,18 @@ def change_table(table_name: str) -> Iterator[TableBuilder]:
     ```
     """
     runner = get_runner()
-    table = Table(
-        table_name, runner.metadata, autoload_with=runner.engine, extend_existing=True
-    )
 
-    builder = TableBuilder(table_name, runner.metadata, table=table)
-    yield builder
+    with runner.begin(recorded=True) as conn:
+        table = runner.reflection.get_table(conn, table_name)
+        builder = TableBuilder(table_name, table.metadata, table=table)
 
-    runner.execute_operations(builder.operations)
+        try:
+            yield builder
+            runner.execute_operations(builder.operations)
+        except BaseException:
+            # The builder mutates the cached table as columns are declared
+            runner.reflection.invalidate(table_name)
+            raise
 
 
 def drop_table(table_name: str) -> None:
@@ -212,9 +343,119 @@ def drop_table(table_name: str) -> None:
         drop_table('spaceships')
     ```
     """
+    get_runner().drop_tables([table_name])
+
+
+def create_tables(tables: Iterable[Table]) -> None:
+    """Create several tables at once, ordered by their foreign keys
+
+    Tables that already exist are skipped, and all DDL runs in one transaction.
+
+    ## Example
+
+    ```python
+    from pelican import create_tables
+    from myapp.models import Base
+
+
+    @migration.up()
+    def upgrade():
+        create_tables(Base.metadata.sorted_tables)
+    ```
+    """
+    get_runner().create_tables(tables)
+
+
+def drop_tables(table_names: Iterable[str], cascade: bool = False) -> None:
+    """Drop several tables at once, referencing tables first
+
+    On PostgreSQL this is a single `DROP TABLE a, b, c` statement.
+
+    ## Example
+
+    ```python
+    from pelican import drop_tables
+
+
+    @migration.down()
+    def downgrade():
+        drop_tables(['comments', 'posts', 'users'], cascade=True)
+    ```
+    """
+    get_runner().drop_tables(table_names, cascade=cascade)
+
+
+def vacuum(table_name: str, *, analyze: bool = False) -> None:
+    """Reclaim the space taken by a table's dead rows
+
+    `VACUUM` can't run in a transaction, so inside a migration it runs
+    right after the migration commits. SQLite vacuums the whole database.
+
+    ## Example
+
+    ```python
+    from pelican import vacuum
+
+
+    @migration.up()
+    def upgrade():
+        get_runner().execute(["DELETE FROM events WHERE archived"])
+        vacuum('events', analyze=True)
+    ```
+    """
+    get_runner().execute_operations([Vacuum(table_name, analyze=analyze)])
+
+
+def reindex(table_or_index: str, *, concurrently: bool = True) -> None:
+    """Rebuild all indexes of a table, or a single index
+
+    On PostgreSQL `REINDEX ... CONCURRENTLY` doesn't block writes, but it
+    can't run in a transaction either, so inside a migration it runs
+    right after the migration commits. Pass `concurrently=False` to
+    reindex within the migration's transaction instead.
+
+    ## Example
+
+    ```python
+    from pelican import reindex
+
+
+    @migration.up()
+    def upgrade():
+        reindex('spaceships')
+        reindex('spaceships_name_idx')
+    ```
+    """
     runner = get_runner()
 
-    with runner.engine.connect() as conn:
-        with conn.begin():
-            table = Table(table_name, runner.metadata, autoload_with=runner.engine)
-            table.drop(conn)
+    with runner.begin(recorded=True) as conn:
+        is_table = runner.reflection.has_table(conn, table_or_index)
+        runner.execute_operations(
+            [Reindex(table_or_index, index=not is_table, concurrently=concurrently)]
+        )
+
+
+def bulk_insert(
+    table_name: str, rows: Iterable[Mapping[str, Any]], *, batch_size: int = 1000
+) -> int:
+    """Insert rows into a table in batches, returning how many were inserted
+
+    Pairs with `create_table(..., defer_indexes=True)`, which holds the
+    table's indexes and foreign keys back until the rows are in.
+
+    ## Example
+
+    ```python
+    from pelican import bulk_insert, create_table
+
+
+    @migration.up()
+    def upgrade():
+        with create_table('planets', defer_indexes=True) as t:
+            t.string('name')
+            t.references('system')
+            t.index(['name'])
+        bulk_insert('planets', [{'name': 'Mars', 'system_id': 1}])
+    ```
+    """
+    return get_runner().bulk_insert(table_name, rows, batch_size=batch_size)
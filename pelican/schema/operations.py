@@ -1,9 +1,9 @@
-from typing import Any, Iterable
+from typing import Any, ClassVar, Iterable
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from sqlalchemy.types import TypeEngine
 from sqlalchemy.sql import Executable
-from sqlalchemy import Column
+from sqlalchemy import Column, ForeignKeyConstraint, Index, Table
 from pelican.compilers import DialectCompiler
 
 
@@ -11,10 +11,24 @@ from pelican.compilers import DialectCompiler
 class Operation(ABC):
     table_name: str
 
+    # Maintenance leaves the table's contents alone, so it isn't "touched"
+    changes_table: ClassVar[bool] = True
+    # `Table` has no public way to remove a column, so the cache reflects
+    # the table again instead of mirroring the operation
+    reflects_table: ClassVar[bool] = False
+
+    @property
+    def transactional(self) -> bool:
+        """Whether this can run inside the migration's transaction."""
+        return True
+
     @abstractmethod
     def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
         pass
 
+    def apply(self, table: Table) -> None:
+        """Mirror this operation onto a cached `Table` once it has been executed."""
+
 
 @dataclass
 class AddColumn(Operation):
@@ -23,11 +37,17 @@ class AddColumn(Operation):
     def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
         return compiler.add_column(self.table_name, self.column)
 
+    def apply(self, table: Table) -> None:
+        if self.column.table is not table:
+            table.append_column(self.column._copy(), replace_existing=True)
+
 
 @dataclass
 class DropColumn(Operation):
     column_name: str
 
+    reflects_table: ClassVar[bool] = True
+
     def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
         return compiler.drop_column(self.table_name, self.column_name)
 
@@ -37,6 +57,8 @@ class RenameColumn(Operation):
     old_name: str
     new_name: str
 
+    reflects_table: ClassVar[bool] = True
+
     def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
         return compiler.rename_column(self.table_name, self.old_name, self.new_name)
 
@@ -59,18 +81,58 @@ class AlterColumn(Operation):
             server_default=self.server_default,
         )
 
+    def apply(self, table: Table) -> None:
+        column = table.c.get(self.column_name)
+        if column is None:
+            return
+
+        if self.new_type is not None:
+            column.type = self.new_type
+        if self.nullable is not None:
+            column.nullable = self.nullable
+
 
 @dataclass
 class CreateIndex(Operation):
     index_name: str
     column_names: list[str]
     unique: bool
+    concurrently: bool = False
+    where: str | None = None
+    include: list[str] | None = None
+    using: str | None = None
+    # Entries matching these are columns even when they aren't bare identifiers
+    table_columns: frozenset[str] = field(default=frozenset(), compare=False)
+
+    @property
+    def transactional(self) -> bool:
+        return not self.concurrently
 
     def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
         return compiler.create_index(
-            self.table_name, self.index_name, self.column_names, self.unique
+            self.table_name,
+            self.index_name,
+            self.column_names,
+            self.unique,
+            concurrently=self.concurrently,
+            where=self.where,
+            include=self.include,
+            using=self.using,
+            table_columns=self.table_columns,
         )
 
+    def apply(self, table: Table) -> None:
+        if any(index.name == self.index_name for index in table.indexes):
+            return
+        # Only plain column indexes are mirrored; the cache has no use for the rest
+        if self.where or self.include or self.using:
+            return
+        if not all(name in table.c for name in self.column_names):
+            return
+
+        columns = [table.c[name] for name in self.column_names]
+        Index(self.index_name, *columns, unique=self.unique)
+
 
 @dataclass
 class RemoveIndex(Operation):
@@ -78,3 +140,142 @@ class RemoveIndex(Operation):
 
     def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
         return compiler.drop_index(self.table_name, self.index_name)
+
+    def apply(self, table: Table) -> None:
+        for index in [i for i in table.indexes if i.name == self.index_name]:
+            table.indexes.discard(index)
+
+
+@dataclass
+class AddForeignKey(Operation):
+    """Add a foreign key; with `validate=False` it's `NOT VALID` until validated."""
+
+    constraint_name: str
+    column_names: list[str]
+    referred_table: str
+    referred_columns: list[str]
+    on_delete: str | None = None
+    validate: bool = True
+
+    def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
+        return compiler.add_foreign_key(
+            self.table_name,
+            self.constraint_name,
+            self.column_names,
+            self.referred_table,
+            self.referred_columns,
+            on_delete=self.on_delete,
+            validate=self.validate,
+        )
+
+    def apply(self, table: Table) -> None:
+        if any(
+            fk.column_keys == self.column_names for fk in table.foreign_key_constraints
+        ):
+            return
+        if not all(name in table.c for name in self.column_names):
+            return
+
+        table.append_constraint(
+            ForeignKeyConstraint(
+                self.column_names,
+                [f"{self.referred_table}.{name}" for name in self.referred_columns],
+                name=self.constraint_name,
+                ondelete=self.on_delete,
+            )
+        )
+
+
+@dataclass
+class ValidateForeignKey(Operation):
+    constraint_name: str
+
+    changes_table: ClassVar[bool] = False
+
+    def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
+        return compiler.validate_foreign_key(self.table_name, self.constraint_name)
+
+
+@dataclass
+class CreatePartition(Operation):
+    """Create `partition_name` as a partition of `table_name`, with its `bounds` spec."""
+
+    partition_name: str
+    bounds: str
+
+    # The new partition starts out empty
+    changes_table: ClassVar[bool] = False
+
+    def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
+        return compiler.create_partition(
+            self.table_name, self.partition_name, self.bounds
+        )
+
+
+@dataclass
+class AttachPartition(Operation):
+    partition_name: str
+    bounds: str
+
+    def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
+        return compiler.attach_partition(
+            self.table_name, self.partition_name, self.bounds
+        )
+
+
+@dataclass
+class DetachPartition(Operation):
+    """Detach a partition, then with `drop` drop it.
+
+    With `concurrently`, queries on the parent table aren't blocked, but
+    the detach can't run in a transaction.
+    """
+
+    partition_name: str
+    concurrently: bool = True
+    drop: bool = False
+
+    @property
+    def transactional(self) -> bool:
+        return not self.concurrently
+
+    def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
+        return [
+            *compiler.detach_partition(
+                self.table_name, self.partition_name, concurrently=self.concurrently
+            ),
+            *(compiler.drop_tables([self.partition_name]) if self.drop else []),
+        ]
+
+
+@dataclass
+class Vacuum(Operation):
+    analyze: bool = False
+
+    changes_table: ClassVar[bool] = False
+
+    @property
+    def transactional(self) -> bool:
+        return False
+
+    def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
+        return compiler.vacuum([self.table_name], analyze=self.analyze)
+
+
+@dataclass
+class Reindex(Operation):
+    """Rebuild the indexes of `table_name`, or with `index` the index of that name."""
+
+    index: bool = False
+    concurrently: bool = True
+
+    changes_table: ClassVar[bool] = False
+
+    @property
+    def transactional(self) -> bool:
+        return not self.concurrently
+
+    def compile(self, compiler: DialectCompiler) -> Iterable[Executable]:
+        return compiler.reindex(
+            self.table_name, index=self.index, concurrently=self.concurrently
+        )
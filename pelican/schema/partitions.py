@@ -0,0 +1,322 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Literal
+
+from pelican._context import get_runner
+from pelican.schema.operations import (
+    AttachPartition,
+    CreatePartition,
+    DetachPartition,
+)
+
+PartitionStrategy = Literal["range", "list", "hash"]
+PartitionInterval = Literal["day", "week", "month", "year"]
+
+_SUFFIX_FORMATS: dict[PartitionInterval, str] = {
+    "day": "%Y%m%d",
+    "week": "%Y%m%d",
+    "month": "%Y%m",
+    "year": "%Y",
+}
+
+_UPPER_BOUND = re.compile(r"\bTO \((.+)\)\s*$")
+
+
+@dataclass(frozen=True)
+class PartitionBy:
+    """How `create_table` splits a table; see `range_`, `list_` and `hash_`."""
+
+    strategy: PartitionStrategy
+    columns: tuple[str, ...]
+
+
+def _partition_by(strategy: PartitionStrategy, columns: tuple[str, ...]) -> PartitionBy:
+    if not columns:
+        raise ValueError("At least one column name is required to partition by")
+    return PartitionBy(strategy, columns)
+
+
+def range_(*columns: str) -> PartitionBy:
+    """Partition by ranges of the columns' values, such as a month of `created_at`."""
+    return _partition_by("range", columns)
+
+
+def list_(*columns: str) -> PartitionBy:
+    """Partition by explicit lists of the column's values."""
+    return _partition_by("list", columns)
+
+
+def hash_(*columns: str) -> PartitionBy:
+    """Spread rows evenly over partitions by a hash of the columns."""
+    return _partition_by("hash", columns)
+
+
+def create_partition(
+    table_name: str,
+    partition_name: str,
+    *,
+    from_: Any = None,
+    to: Any = None,
+    values: Any = None,
+    modulus: int | None = None,
+    remainder: int | None = None,
+    default: bool = False,
+) -> None:
+    """Create a partition of a partitioned table
+
+    Give the bounds of a range partition (`from_` inclusive, `to`
+    exclusive), the `values` of a list partition, the `modulus` and
+    `remainder` of a hash partition, or `default` for the partition that
+    takes every row no other partition does. Multi-column bounds are tuples.
+
+    ## Example
+
+    ```python
+    from pelican import create_partition
+
+
+    @migration.up()
+    def upgrade():
+        create_partition('events', 'events_p202501', from_='2025-01-01', to='2025-02-01')
+        create_partition('accounts', 'accounts_eu', values=['de', 'fr'])
+        create_partition('sessions', 'sessions_p0', modulus=4, remainder=0)
+    ```
+    """
+    runner = get_runner()
+    bounds = _bounds(from_, to, values, modulus, remainder, default)
+    runner.execute_operations([CreatePartition(table_name, partition_name, bounds)])
+    runner.reflection.add_table_name(partition_name)
+
+
+def attach_partition(
+    table_name: str,
+    partition_name: str,
+    *,
+    from_: Any = None,
+    to: Any = None,
+    values: Any = None,
+    modulus: int | None = None,
+    remainder: int | None = None,
+    default: bool = False,
+) -> None:
+    """Attach an existing table as a partition, with bounds as in `create_partition`
+
+    PostgreSQL scans the table to check its rows fit the bounds, unless a
+    `CHECK` constraint on the table already proves they do.
+
+    ## Example
+
+    ```python
+    from pelican import attach_partition
+
+
+    @migration.up()
+    def upgrade():
+        attach_partition('events', 'events_archive', from_='2020-01-01', to='2025-01-01')
+    ```
+    """
+    runner = get_runner()
+    bounds = _bounds(from_, to, values, modulus, remainder, default)
+    runner.execute_operations([AttachPartition(table_name, partition_name, bounds)])
+
+
+def detach_partition(
+    table_name: str,
+    partition_name: str,
+    *,
+    concurrently: bool = True,
+    drop: bool = False,
+) -> None:
+    """Detach a partition, keeping it as a table of its own unless `drop` is set
+
+    `DETACH PARTITION ... CONCURRENTLY` doesn't block queries on the parent
+    table, but can't run in a transaction, so inside a migration it runs
+    right after the migration commits. PostgreSQL refuses it while the
+    table has a default partition; pass `concurrently=False` then.
+
+    ## Example
+
+    ```python
+    from pelican import detach_partition
+
+
+    @migration.up()
+    def upgrade():
+        detach_partition('events', 'events_p202301', drop=True)
+    ```
+    """
+    runner = get_runner()
+    runner.execute_operations(
+        [
+            DetachPartition(
+                table_name, partition_name, concurrently=concurrently, drop=drop
+            )
+        ]
+    )
+    if drop:
+        runner.reflection.discard(partition_name)
+
+
+def create_future_partitions(
+    table_name: str,
+    *,
+    interval: PartitionInterval = "month",
+    count: int = 3,
+    start: date | None = None,
+) -> list[str]:
+    """Create the next `count` range partitions of a table partitioned by time
+
+    Partitions cover one `interval` each (weeks start on Monday), starting
+    with the one containing `start`, today by default. They are named
+    after the table and the start of their range, like `events_p202501`.
+    Partitions that already exist are skipped, so this can run on a
+    schedule. Returns the partitions created.
+
+    ## Example
+
+    ```python
+    from pelican import create_future_partitions, use_context
+
+    with use_context() as runner:
+        create_future_partitions('events', interval='month', count=3)
+    ```
+    """
+    if interval not in _SUFFIX_FORMATS:
+        raise ValueError(
+            f"Invalid partition interval '{interval}'. "
+            f"Expected one of: {', '.join(_SUFFIX_FORMATS)}"
+        )
+
+    runner = get_runner()
+    with runner.begin(recorded=True) as conn:
+        existing = {
+            row.name
+            for row in conn.execute(runner.compiler.list_partitions(table_name))
+        }
+
+        operations = []
+        period = _period_start(start or date.today(), interval)
+        for _ in range(count):
+            end = _next_period(period, interval)
+            name = f"{table_name}_p{period.strftime(_SUFFIX_FORMATS[interval])}"
+            if name not in existing:
+                bounds = runner.compiler.partition_bounds(from_=[period], to=[end])
+                operations.append(CreatePartition(table_name, name, bounds))
+            period = end
+
+        runner.execute_operations(operations)
+
+    for operation in operations:
+        runner.reflection.add_table_name(operation.partition_name)
+    return [operation.partition_name for operation in operations]
+
+
+def drop_expired_partitions(
+    table_name: str, *, before: date | datetime, concurrently: bool = True
+) -> list[str]:
+    """Detach and drop the range partitions that end on or before `before`
+
+    Partitions without a date or timestamp upper bound are left alone.
+    Each is detached as in `detach_partition`, then dropped. Returns the
+    partitions dropped.
+
+    ## Example
+
+    ```python
+    from datetime import date, timedelta
+
+    from pelican import drop_expired_partitions, use_context
+
+    with use_context() as runner:
+        drop_expired_partitions('events', before=date.today() - timedelta(days=365))
+    ```
+    """
+    runner = get_runner()
+    with runner.begin(recorded=True) as conn:
+        rows = list(conn.execute(runner.compiler.list_partitions(table_name)))
+
+    cutoff = _naive(
+        before if isinstance(before, datetime) else datetime.combine(before, time())
+    )
+    expired = [
+        row.name
+        for row in rows
+        if (upper := _upper_bound(row.bounds)) is not None and upper <= cutoff
+    ]
+
+    runner.execute_operations(
+        [
+            DetachPartition(table_name, name, concurrently=concurrently, drop=True)
+            for name in expired
+        ]
+    )
+    for name in expired:
+        runner.reflection.discard(name)
+    return expired
+
+
+def _bounds(
+    from_: Any,
+    to: Any,
+    values: Any,
+    modulus: int | None,
+    remainder: int | None,
+    default: bool,
+) -> str:
+    return get_runner().compiler.partition_bounds(
+        from_=_as_list(from_),
+        to=_as_list(to),
+        values=_as_list(values),
+        modulus=modulus,
+        remainder=remainder,
+        default=default,
+    )
+
+
+def _as_list(value: Any) -> list[Any] | None:
+    if value is None:
+        return None
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _period_start(day: date, interval: PartitionInterval) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    if interval == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def _next_period(start: date, interval: PartitionInterval) -> date:
+    if interval == "day":
+        return start + timedelta(days=1)
+    if interval == "week":
+        return start + timedelta(weeks=1)
+    if interval == "month":
+        return start.replace(
+            year=start.year + start.month // 12, month=start.month % 12 + 1
+        )
+    return start.replace(year=start.year + 1)
+
+
+def _upper_bound(bounds: str | None) -> datetime | None:
+    # PostgreSQL renders range bounds as FOR VALUES FROM ('...') TO ('...')
+    match = _UPPER_BOUND.search(bounds or "")
+    if match is None:
+        return None
+
+    first = match.group(1).split(",")[0].strip()
+    try:
+        return _naive(datetime.fromisoformat(first.strip("'")))
+    except ValueError:
+        # MAXVALUE, or not a date at all
+        return None
+
+
+def _naive(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,183 @@
+import os
+import sqlite3
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import MetaData, event
+from sqlalchemy.engine import URL
+
+from ._context import use_context
+from ._types import (
+    IndexBuildError,
+    IntegrityCheckError,
+    Migration,
+    MigrationBatchError,
+)
+from .runner import MigrationRunner
+
+_RELAXED_PRAGMAS = (
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA foreign_keys = OFF",
+)
+
+
+def sqlite_path(url: URL) -> Path:
+    """The file behind a SQLite URL; `ValueError` for anything else."""
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        raise ValueError("Fast swap needs a SQLite database file")
+    return Path(url.database)
+
+
+def fast_swap(
+    runner: MigrationRunner,
+    migrations: Sequence[Migration],
+    *,
+    release: bool = False,
+) -> Iterator[Migration]:
+    """Apply migrations to a copy of a SQLite database, then swap it in.
+
+    The database is copied with the online backup API while holding its
+    write lock, so writers wait (or get `SQLITE_BUSY`) until the swap and
+    readers carry on with the old file. The copy is migrated with
+    `journal_mode`, `synchronous` and `foreign_keys` off, checked with
+    `PRAGMA integrity_check` and `PRAGMA foreign_key_check`, synced to disk
+    and moved over the original with `os.replace`. Migrations are yielded
+    as they are applied to the copy; the original only changes once the
+    last one is done and the checks pass.
+
+    If a migration or one of its index builds fails, `MigrationBatchError`
+    is raised with no completed migrations. If a check fails,
+    `IntegrityCheckError` is raised. Either way the copy is deleted. WAL
+    databases are refused: their `-wal` and `-shm` files would be shared
+    with connections still open on the old file.
+
+    ## Example
+
+    ```python
+    from pelican import loader, use_context
+    from pelican.swap import fast_swap
+
+    with use_context(database_url="sqlite:///edge.db") as runner:
+        registry = loader.load_migrations()
+        pending = registry.pending(runner.get_applied_versions())
+        for migration in fast_swap(runner, pending):
+            print(f"Applied {migration.revision}")
+    ```
+    """
+    path = sqlite_path(runner.engine.url)
+    # Lazy migrations must be imported while their registry is active; the
+    # copy gets a context of its own.
+    for migration in migrations:
+        migration.load()
+
+    copy = path.with_name(f"{path.name}.pelican-swap")
+    _remove(copy)
+
+    lock = sqlite3.connect(path, isolation_level=None, timeout=30)
+    try:
+        journal_mode = lock.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode.lower() == "wal":
+            raise ValueError(
+                f"Fast swap doesn't support WAL databases; {path} is in WAL mode"
+            )
+        lock.execute("BEGIN IMMEDIATE")
+
+        # The lock's own connection can't be the backup source, but holding
+        # it keeps other writers out while a second one reads.
+        source, target = sqlite3.connect(path), sqlite3.connect(copy)
+        try:
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+
+        try:
+            yield from _migrate_copy(runner, copy, migrations, release)
+            _check(copy)
+            _sync(copy)
+        except BaseException:
+            _remove(copy)
+            raise
+
+        os.replace(copy, path)
+        _sync(path.parent)
+    finally:
+        lock.close()
+
+    # Pooled connections still point at the old file.
+    runner.dispose()
+    runner.reflection.invalidate()
+
+
+def _migrate_copy(
+    runner: MigrationRunner,
+    copy: Path,
+    migrations: Sequence[Migration],
+    release: bool,
+) -> Iterator[Migration]:
+    with use_context(
+        database_url=f"sqlite:///{copy}",
+        metadata=MetaData(),
+        engine_options=runner.engine_options,
+    ) as copy_runner:
+        copy_runner.profiles = runner.profiles
+        copy_runner.profile = runner.profile
+        copy_runner.throttler = runner.throttler
+        event.listen(copy_runner.engine, "connect", _relax_durability)
+        try:
+            applied: list[Migration] = []
+            for migration in copy_runner.upgrade_many(migrations, release=release):
+                applied.append(migration)
+                yield migration
+            runner.touched_tables.update(copy_runner.touched_tables)
+        except MigrationBatchError as e:
+            # Nothing reached the original database.
+            raise MigrationBatchError(e.migration, []) from e.__cause__
+        except IndexBuildError as e:
+            # The copy is discarded, so its migrations don't count as applied
+            raise MigrationBatchError(applied[-1], []) from e
+        finally:
+            copy_runner.dispose()
+
+
+def _relax_durability(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in _RELAXED_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _check(copy: Path) -> None:
+    conn = sqlite3.connect(copy)
+    try:
+        problems = [
+            row[0] for row in conn.execute("PRAGMA integrity_check") if row[0] != "ok"
+        ]
+        problems += [
+            f"row {rowid} in {table} references missing row in {parent}"
+            for table, rowid, parent, _ in conn.execute("PRAGMA foreign_key_check")
+        ]
+    finally:
+        conn.close()
+
+    if problems:
+        raise IntegrityCheckError(problems)
+
+
+def _sync(path: Path) -> None:
+    # The copy was written with synchronous=OFF; flush it before the swap.
+    # Directories can't be opened for syncing on Windows.
+    if path.is_dir() and os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _remove(copy: Path) -> None:
+    for leftover in (copy, copy.with_name(f"{copy.name}-journal")):
+        leftover.unlink(missing_ok=True)
@@ -0,0 +1,160 @@
+from collections.abc import Callable, Mapping, Sequence
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from ._context import use_context
+from ._types import MigrationPhase
+from .fanout import TargetResult, run_targets
+from .registry import MigrationRegistry
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, Engine
+
+    from .runner import SQLStatement
+    from .throttle import Throttler
+
+
+def discover_schemas(bind: "Engine | Connection", pattern: str = "%") -> list[str]:
+    """Return the schemas whose names match the SQL `LIKE` pattern.
+
+    PostgreSQL's own schemas (`pg_*`, `information_schema`) are never included.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.engine import Engine
+
+    query = text(r"""
+        SELECT nspname FROM pg_catalog.pg_namespace
+        WHERE nspname LIKE :pattern
+          AND nspname NOT LIKE 'pg\_%'
+          AND nspname <> 'information_schema'
+        ORDER BY nspname
+        """)
+
+    if isinstance(bind, Engine):
+        with bind.connect() as conn:
+            return list(conn.execute(query, {"pattern": pattern}).scalars())
+    return list(bind.execute(query, {"pattern": pattern}).scalars())
+
+
+def migrate_schemas(
+    schemas: Sequence[str],
+    registry: MigrationRegistry,
+    *,
+    engine: "Engine",
+    jobs: int = 4,
+    up_to: int | None = None,
+    phase: MigrationPhase | None = None,
+    profiles: Mapping[str, Mapping[str, Any]] | None = None,
+    throttler: "Throttler | None" = None,
+    on_result: Callable[[TargetResult], None] | None = None,
+) -> list[TargetResult]:
+    """Apply pending migrations to every schema, each with its own version table.
+
+    The first schema is migrated normally while its SQL is recorded. The
+    others then run on `engine`'s pool, up to `jobs` at a time. A schema
+    with the same pending migrations replays the recorded SQL under its own
+    `search_path`, without importing, reflecting or compiling anything.
+    Schemas in any other state are migrated normally. Keep `jobs` within
+    the engine's pool size. `throttler` paces `bulk_insert` in every schema.
+
+    ## Example
+
+    ```python
+    from pelican import loader, use_context
+    from pelican.tenants import discover_schemas, migrate_schemas
+
+    with use_context() as runner:
+        registry = loader.load_migrations()
+        schemas = discover_schemas(runner.engine, "tenant_%")
+        migrate_schemas(schemas, registry, engine=runner.engine, jobs=8)
+    ```
+    """
+    for migration in registry:
+        migration.load()
+
+    plan = _Plan()
+
+    return run_targets(
+        schemas,
+        lambda index: _migrate_schema(
+            engine,
+            schemas[index],
+            registry,
+            up_to,
+            phase,
+            profiles,
+            throttler,
+            plan,
+            leader=index == 0,
+        ),
+        jobs=jobs,
+        canary=True,
+        on_result=on_result,
+    )
+
+
+class _Plan:
+    """SQL recorded from the leading schema, keyed by revision."""
+
+    def __init__(self) -> None:
+        self.pending: list[int] | None = None
+        self.statements: dict[int, list["SQLStatement"]] = {}
+
+
+def _migrate_schema(
+    engine: "Engine",
+    schema: str,
+    registry: MigrationRegistry,
+    up_to: int | None,
+    phase: MigrationPhase | None,
+    profiles: Mapping[str, Mapping[str, Any]] | None,
+    throttler: "Throttler | None",
+    plan: _Plan,
+    leader: bool,
+) -> TargetResult:
+    from sqlalchemy import MetaData
+
+    result = TargetResult(schema, "up-to-date")
+    start = perf_counter()
+
+    with use_context(engine=engine, schema=schema, metadata=MetaData()) as runner:
+        runner.profiles = dict(profiles or {})
+        runner.throttler = throttler
+        try:
+            with runner.connect():
+                pending = registry.pending(runner.get_applied_versions(), phase)
+                if up_to is not None:
+                    pending = [m for m in pending if m.revision <= up_to]
+
+                revisions = [m.revision for m in pending]
+                if leader:
+                    plan.pending = revisions
+                replay = not leader and revisions == plan.pending
+
+                for migration in pending:
+                    result.failed_revision = migration.revision
+                    # Queued jobs are rows, not recorded SQL, so run those for real,
+                    # like anything that had to run outside the transaction.
+                    if (
+                        replay
+                        and not migration.jobs
+                        and migration.revision in plan.statements
+                    ):
+                        runner.replay(migration, plan.statements[migration.revision])
+                    elif leader:
+                        with runner.recording() as statements:
+                            runner.upgrade(migration)
+                        if statements.replayable:
+                            plan.statements[migration.revision] = statements
+                    else:
+                        runner.upgrade(migration)
+
+                    result.applied.append(migration.revision)
+                    result.status = "applied"
+                result.failed_revision = None
+        except Exception as e:
+            result.status = "failed"
+            result.error = e
+
+    result.elapsed = perf_counter() - start
+    return result
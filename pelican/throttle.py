@@ -0,0 +1,239 @@
+import os
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection
+
+    from .runner import MigrationRunner
+
+
+class Signal(Protocol):
+    """A database health metric sampled between batches.
+
+    `sample` returns `None` when the metric isn't available, e.g. on
+    another dialect or without the privileges to read it.
+    """
+
+    name: str
+
+    def sample(self, conn: "Connection") -> float | None: ...
+
+
+class _DialectSignal:
+    name = ""
+    dialect = ""
+    query = ""
+
+    def sample(self, conn: "Connection") -> float | None:
+        if conn.dialect.name != self.dialect:
+            return None
+        value = conn.exec_driver_sql(self.query).scalar()
+        return None if value is None else float(value)
+
+
+class ActiveSessions(_DialectSignal):
+    """Other sessions currently running a query (`pg_stat_activity`)."""
+
+    name = "active_sessions"
+    dialect = "postgresql"
+    query = (
+        "SELECT count(*) FROM pg_stat_activity "
+        "WHERE state = 'active' AND pid <> pg_backend_pid()"
+    )
+
+
+class LockWaits(_DialectSignal):
+    """Sessions waiting on a heavyweight lock (`pg_stat_activity`)."""
+
+    name = "lock_waits"
+    dialect = "postgresql"
+    query = "SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock'"
+
+
+class ReplicationLag(_DialectSignal):
+    """Worst replay lag across replicas in seconds (`pg_stat_replication`)."""
+
+    name = "replication_lag"
+    dialect = "postgresql"
+    query = (
+        "SELECT COALESCE(EXTRACT(EPOCH FROM max(replay_lag)), 0) "
+        "FROM pg_stat_replication"
+    )
+
+
+class WalRate(_DialectSignal):
+    """WAL bytes written per second since the previous sample.
+
+    The first sample only records a starting point.
+    """
+
+    name = "wal_rate"
+    dialect = "postgresql"
+    query = "SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')"
+
+    def __init__(self) -> None:
+        self._previous: tuple[float, float] | None = None
+
+    def sample(self, conn: "Connection") -> float | None:
+        position = super().sample(conn)
+        if position is None:
+            return None
+
+        now = time.monotonic()
+        previous, self._previous = self._previous, (position, now)
+        if previous is None or now <= previous[1]:
+            return None
+        return (position - previous[0]) / (now - previous[1])
+
+
+class SQLiteWalSize:
+    """Size in bytes of the SQLite write-ahead log not yet checkpointed."""
+
+    name = "sqlite_wal_size"
+
+    def sample(self, conn: "Connection") -> float | None:
+        if conn.dialect.name != "sqlite":
+            return None
+        for _, schema, path in conn.exec_driver_sql("PRAGMA database_list"):
+            if schema == "main" and path:
+                wal = f"{path}-wal"
+                return float(os.path.getsize(wal)) if os.path.exists(wal) else 0.0
+        return None
+
+
+class SQLiteBusy:
+    """1 when a passive WAL checkpoint is blocked by other connections."""
+
+    name = "sqlite_busy"
+
+    def sample(self, conn: "Connection") -> float | None:
+        if conn.dialect.name != "sqlite":
+            return None
+        row = conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)").first()
+        return None if row is None else float(row[0])
+
+
+SIGNALS: dict[str, Callable[[], Signal]] = {
+    signal.name: signal
+    for signal in (
+        ActiveSessions,
+        LockWaits,
+        ReplicationLag,
+        WalRate,
+        SQLiteWalSize,
+        SQLiteBusy,
+    )
+}
+
+
+class Throttler:
+    """Holds batched work back while database health signals exceed their limits.
+
+    Call `pause` between batches. While any signal is over its limit it
+    waits, doubling the delay up to `max_delay`, and halves `scale` down to
+    `min_scale`. Each pause that finds the database healthy straight away
+    doubles `scale` back towards 1. Use `scaled` to size the next batch.
+
+    ## Example
+
+    ```python
+    from pelican.throttle import ReplicationLag, Throttler
+
+    throttler = Throttler([(ReplicationLag(), 5.0)])
+    while rows_left:
+        throttler.pause(runner)
+        backfill(batch_size=throttler.scaled(10_000))
+    ```
+    """
+
+    def __init__(
+        self,
+        limits: Iterable[tuple[Signal, float]],
+        *,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        min_scale: float = 0.1,
+        on_pause: Callable[[list[str], float], None] | None = None,
+    ) -> None:
+        self.limits = list(limits)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_scale = min_scale
+        self.on_pause = on_pause
+        self.scale = 1.0
+        self._delay = 0.0
+
+    @classmethod
+    def from_limits(cls, limits: Mapping[str, float], **kwargs: Any) -> "Throttler":
+        """Build a throttler from signal names, as in `[tool.pelican.throttle]`."""
+        unknown = set(limits) - SIGNALS.keys()
+        if unknown:
+            raise ValueError(
+                f"Unknown throttle signal(s): {', '.join(sorted(unknown))}. "
+                f"Expected one of: {', '.join(SIGNALS)}"
+            )
+        return cls(
+            [(SIGNALS[name](), float(limit)) for name, limit in limits.items()],
+            **kwargs,
+        )
+
+    def check(self, runner: "MigrationRunner") -> list[str]:
+        """Sample every signal and describe the ones over their limit.
+
+        Samples are taken on a connection of their own, outside any
+        transaction the runner has open, so a failing one can't abort the
+        work being throttled.
+        """
+        from sqlalchemy.exc import SQLAlchemyError
+
+        if not self.limits:
+            return []
+
+        exceeded = []
+        with runner.engine.connect() as conn:
+            for signal, limit in self.limits:
+                try:
+                    # Each sample gets its own transaction, so a failing one
+                    # (e.g. missing privileges) can't poison the others.
+                    with conn.begin():
+                        value = signal.sample(conn)
+                except (SQLAlchemyError, OSError):
+                    continue
+
+                if value is not None and value > limit:
+                    exceeded.append(f"{signal.name} {value:g} > {limit:g}")
+        return exceeded
+
+    def pause(
+        self,
+        runner: "MigrationRunner",
+        *,
+        wait: Callable[[float], Any] = time.sleep,
+    ) -> bool:
+        """Block until every signal is within its limit.
+
+        `wait` does the sleeping; if it returns a true value (like
+        `threading.Event.wait` once set) the pause is abandoned and `False`
+        is returned.
+        """
+        exceeded = self.check(runner)
+        if not exceeded:
+            self.scale = min(1.0, self.scale * 2)
+            return True
+
+        while exceeded:
+            self.scale = max(self.min_scale, self.scale / 2)
+            self._delay = min(self.max_delay, self._delay * 2 or self.base_delay)
+            if self.on_pause is not None:
+                self.on_pause(exceeded, self._delay)
+            if wait(self._delay):
+                return False
+            exceeded = self.check(runner)
+
+        self._delay = 0.0
+        return True
+
+    def scaled(self, batch_size: int) -> int:
+        return max(1, int(batch_size * self.scale))
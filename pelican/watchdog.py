@@ -0,0 +1,227 @@
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+_BLOCKED_QUERY = text("""
+    SELECT pid, state, left(query, 200) AS query,
+           extract(epoch FROM now() - query_start) * 1000
+             AS waiting_ms
+    FROM pg_stat_activity
+    WHERE :pid = ANY(pg_blocking_pids(pid))
+    ORDER BY pid
+    """)
+
+# SQLSTATE of a statement interrupted by pg_cancel_backend
+_QUERY_CANCELED = "57014"
+
+
+@dataclass(frozen=True)
+class BlockedSession:
+    pid: int
+    state: str | None
+    query: str
+    waiting_ms: float
+
+
+@dataclass
+class BlockingReport:
+    """A migration statement the watchdog cancelled, and who it was blocking."""
+
+    statement: str
+    pid: int
+    blocking_ms: float
+    blocked: list[BlockedSession] = field(default_factory=list)
+
+
+class Watch:
+    """One watched statement; `report` is set if the watchdog cancelled it."""
+
+    def __init__(self) -> None:
+        self.report: BlockingReport | None = None
+
+
+class LockWatchdog:
+    """Cancels migration statements that hold up other sessions on PostgreSQL.
+
+    While a migration runs, one thread on a separate connection polls
+    `pg_blocking_pids` for sessions queued behind its current statement.
+    Once more than `max_blocked` sessions are waiting, or any has waited
+    for longer than `max_blocking_ms`, the statement is cancelled with
+    `pg_cancel_backend`, and a `BlockingReport` is recorded if that
+    interrupted it. The runner then retries the whole
+    migration up to `retries` times, waiting `base_delay` seconds before
+    the first retry and twice as long before each next one, up to
+    `max_delay`. Other dialects aren't watched.
+
+    ## Example
+
+    ```python
+    from pelican import use_context
+    from pelican.watchdog import LockWatchdog
+
+    with use_context() as runner:
+        runner.lock_watchdog = LockWatchdog(max_blocked=5, max_blocking_ms=2000)
+        runner.upgrade(migration)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        max_blocked: int | None = None,
+        max_blocking_ms: float | None = None,
+        poll_interval: float = 0.05,
+        retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        on_report: Callable[[BlockingReport], None] | None = None,
+    ) -> None:
+        if max_blocked is None and max_blocking_ms is None:
+            raise ValueError("Set max_blocked, max_blocking_ms or both")
+
+        self.max_blocked = max_blocked
+        self.max_blocking_ms = max_blocking_ms
+        self.poll_interval = poll_interval
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_report = on_report
+        self.reports: list[BlockingReport] = []
+
+    def delay(self, retry: int) -> float:
+        """Seconds to wait before retry number `retry` (starting at 0)."""
+        return min(self.max_delay, self.base_delay * 2.0**retry)
+
+    def exceeded(self, blocked: list[BlockedSession]) -> bool:
+        if self.max_blocked is not None and len(blocked) > self.max_blocked:
+            return True
+        return self.max_blocking_ms is not None and any(
+            session.waiting_ms > self.max_blocking_ms for session in blocked
+        )
+
+    def record(self, report: BlockingReport) -> None:
+        """Keep a report whose cancellation interrupted its statement."""
+        self.reports.append(report)
+        if self.on_report is not None:
+            self.on_report(report)
+
+    @contextmanager
+    def monitoring(self, conn: Connection) -> Iterator["Monitor"]:
+        """Watch statements run on `conn`, sharing one monitor connection."""
+        monitor = Monitor(self, conn)
+        monitor.start()
+        try:
+            yield monitor
+        finally:
+            monitor.close()
+
+    @contextmanager
+    def watch(self, conn: Connection, statement: str) -> Iterator[Watch]:
+        """Watch `conn` while the block runs `statement` on it."""
+        with self.monitoring(conn) as monitor, monitor.watch(statement) as watch:
+            yield watch
+
+
+class Monitor:
+    """Polls for sessions blocked by whichever statement `conn` is running.
+
+    One monitor connection and thread serve every statement passed to
+    `watch` until `close`, so a migration doesn't open one per statement.
+    A statement is only cancelled while it is still being watched, and
+    its report is dropped if `pg_cancel_backend` found nothing to cancel.
+    """
+
+    def __init__(
+        self, watchdog: LockWatchdog, conn: Connection, pid: int | None = None
+    ) -> None:
+        self.watchdog = watchdog
+        self.conn = conn
+        self.pid = pid or 0
+        self._current: tuple[str, Watch, float] | None = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.conn.dialect.name != "postgresql":
+            return
+
+        if not self.pid:
+            if "pelican_backend_pid" not in self.conn.info:
+                self.conn.info["pelican_backend_pid"] = int(
+                    self.conn.exec_driver_sql("SELECT pg_backend_pid()").scalar_one()
+                )
+            self.pid = self.conn.info["pelican_backend_pid"]
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"pelican-lock-watchdog-{self.pid}", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @contextmanager
+    def watch(self, statement: str) -> Iterator[Watch]:
+        watch = Watch()
+        with self._lock:
+            self._current = (statement, watch, time.monotonic())
+        try:
+            yield watch
+        finally:
+            with self._lock:
+                self._current = None
+
+    def _run(self) -> None:
+        # Autocommit, so every poll sees a fresh pg_stat_activity snapshot.
+        with self.conn.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as monitor:
+            while not self._closed.wait(self.watchdog.poll_interval):
+                self._poll(monitor)
+
+    def _poll(self, monitor: Connection) -> None:
+        target = self._current
+        if target is None or target[1].report is not None:
+            return
+
+        statement, watch, started = target
+        blocked = [
+            BlockedSession(row.pid, row.state, row.query, float(row.waiting_ms or 0))
+            for row in monitor.execute(_BLOCKED_QUERY, {"pid": self.pid})
+        ]
+        if not self.watchdog.exceeded(blocked):
+            return
+
+        # Holding the lock keeps the statement from finishing its watch, and
+        # the next one from starting, while the cancel goes out.
+        with self._lock:
+            if self._current is not target:
+                return
+            # Report first: the cancelled statement's error may reach the
+            # runner before pg_cancel_backend returns here.
+            watch.report = BlockingReport(
+                statement=statement,
+                pid=self.pid,
+                blocking_ms=(time.monotonic() - started) * 1000,
+                blocked=blocked,
+            )
+            cancelled = monitor.execute(
+                text("SELECT pg_cancel_backend(:pid)"), {"pid": self.pid}
+            ).scalar()
+            if not cancelled:
+                watch.report = None
+
+
+def is_cancellation(error: DBAPIError) -> bool:
+    """Whether `error` is a statement interrupted by `pg_cancel_backend`."""
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return code == _QUERY_CANCELED
@@ -1,5 +1,9 @@
+from typing import Any, cast
+from unittest.mock import MagicMock
+
 import pytest
 from sqlalchemy import Integer, String, Text
+from sqlalchemy.exc import CompileError
 
 from pelican.compilers.postgresql import PostgreSQLCompiler
 from pelican.runner import _DIALECT_COMPILERS
@@ -63,3 +67,253 @@ def test_alter_column__with_no_changes__expect_error(
 ) -> None:
     with pytest.raises(ValueError, match="requires at least one change"):
         pg_compiler.alter_column("users", "name")
+
+
+def test_create_index__expect_sql_without_reflection(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(pg_compiler.create_index("users", "users_email_idx", ["email"]))
+    assert len(ddls) == 1
+    assert ddls[0].statement == "CREATE INDEX users_email_idx ON users (email)"
+    assert not cast(MagicMock, pg_compiler.engine).method_calls
+
+
+def test_create_index__with_reserved_names__expect_quoted_identifiers(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(
+        pg_compiler.create_index("order", "order_user_idx", ["user", "Total"], True)
+    )
+    assert ddls[0].statement == (
+        'CREATE UNIQUE INDEX order_user_idx ON "order" ("user", "Total")'
+    )
+
+
+def test_create_index__with_table_columns__expect_odd_names_quoted(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(
+        pg_compiler.create_index(
+            "people",
+            "people_name_idx",
+            ["first name", "é-mail DESC", "lower(email)"],
+            table_columns={"first name", "é-mail", "email"},
+        )
+    )
+    assert ddls[0].statement == (
+        "CREATE INDEX people_name_idx ON people "
+        '("first name", "é-mail" DESC, (lower(email)))'
+    )
+
+
+def test_create_index__with_index_options__expect_full_definition(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(
+        pg_compiler.create_index(
+            "users",
+            "users_name_idx",
+            ["name text_pattern_ops DESC NULLS LAST", "lower(email)"],
+            include=["id"],
+            where="deleted_at IS NULL AND name LIKE 'a%'",
+        )
+    )
+    assert ddls[0].statement == (
+        "CREATE INDEX users_name_idx ON users "
+        "(name text_pattern_ops DESC NULLS LAST, (lower(email))) INCLUDE (id) "
+        "WHERE deleted_at IS NULL AND name LIKE 'a%%'"
+    )
+
+
+def test_create_index__with_using__expect_access_method(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(
+        pg_compiler.create_index(
+            "events", "events_payload_idx", ["payload jsonb_path_ops"], using="gin"
+        )
+    )
+    assert ddls[0].statement == (
+        "CREATE INDEX events_payload_idx ON events USING gin (payload jsonb_path_ops)"
+    )
+
+
+def test_create_index__with_invalid_using__expect_value_error(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    with pytest.raises(ValueError):
+        pg_compiler.create_index("events", "events_idx", ["id"], using="gin; DROP")
+
+
+def test_drop_index__expect_drop_sql(pg_compiler: PostgreSQLCompiler) -> None:
+    ddls = list(pg_compiler.drop_index("users", "users_email_idx"))
+    assert ddls[0].statement == "DROP INDEX users_email_idx"
+
+
+def test_drop_tables__expect_single_statement(pg_compiler: PostgreSQLCompiler) -> None:
+    ddls = list(pg_compiler.drop_tables(["comments", "posts", "user"], cascade=True))
+    assert len(ddls) == 1
+    assert ddls[0].statement == 'DROP TABLE comments, posts, "user" CASCADE'
+
+
+def test_use_schema__expect_transaction_scoped_search_path(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(pg_compiler.use_schema("Tenant 1"))
+
+    assert [cast(MagicMock, ddl).statement for ddl in ddls] == [
+        'SET LOCAL search_path TO "Tenant 1"'
+    ]
+
+
+def test_set_setting__expect_transaction_scoped_set(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(pg_compiler.set_setting("maintenance_work_mem", "1GB"))
+
+    assert [cast(MagicMock, ddl).statement for ddl in ddls] == [
+        "SET LOCAL maintenance_work_mem TO '1GB'"
+    ]
+
+
+def test_set_setting__with_invalid_name__expect_error(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    with pytest.raises(ValueError, match="Invalid setting name"):
+        pg_compiler.set_setting("work_mem; DROP TABLE users", "1GB")
+
+
+def test_analyze__expect_single_statement(pg_compiler: PostgreSQLCompiler) -> None:
+    ddls = list(pg_compiler.analyze(["users", "order"]))
+    assert [cast(MagicMock, d).statement for d in ddls] == ['ANALYZE users, "order"']
+
+
+def test_vacuum__with_analyze__expect_vacuum_analyze(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(pg_compiler.vacuum(["users"], analyze=True))
+    assert [cast(MagicMock, d).statement for d in ddls] == ["VACUUM (ANALYZE) users"]
+
+
+def test_reindex__with_index_concurrently__expect_reindex_index_concurrently(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(pg_compiler.reindex("users_email_idx", index=True, concurrently=True))
+    assert [cast(MagicMock, d).statement for d in ddls] == [
+        "REINDEX INDEX CONCURRENTLY users_email_idx"
+    ]
+
+
+def test_create_index__with_concurrently__expect_concurrent_build(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(
+        pg_compiler.create_index("users", "users_email_idx", ["email"], True, True)
+    )
+    assert [cast(MagicMock, d).statement for d in ddls] == [
+        "CREATE UNIQUE INDEX CONCURRENTLY users_email_idx ON users (email)"
+    ]
+
+
+def test_add_foreign_key__without_validate__expect_not_valid(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(
+        pg_compiler.add_foreign_key(
+            "posts",
+            "posts_user_id_fkey",
+            ["user_id"],
+            "users",
+            ["id"],
+            on_delete="CASCADE",
+            validate=False,
+        )
+    )
+    assert [cast(MagicMock, d).statement for d in ddls] == [
+        "ALTER TABLE posts ADD CONSTRAINT posts_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE NOT VALID"
+    ]
+
+
+def test_add_foreign_key__with_invalid_on_delete__expect_compile_error(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    with pytest.raises(CompileError):
+        pg_compiler.add_foreign_key(
+            "posts", "fk", ["user_id"], "users", ["id"], on_delete="CASCADE; --"
+        )
+
+
+def test_validate_foreign_key__expect_validate_constraint(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(pg_compiler.validate_foreign_key("posts", "posts_user_id_fkey"))
+    assert [cast(MagicMock, d).statement for d in ddls] == [
+        "ALTER TABLE posts VALIDATE CONSTRAINT posts_user_id_fkey"
+    ]
+
+
+def test_partition_clause__expect_strategy_and_columns(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    assert (
+        pg_compiler.partition_clause("hash", ["tenant_id", "id"])
+        == "HASH (tenant_id, id)"
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected",
+    [
+        (
+            {"from_": ["2025-01-01"], "to": ["2025-02-01"]},
+            "FOR VALUES FROM ('2025-01-01') TO ('2025-02-01')",
+        ),
+        ({"values": ["de", "fr"]}, "FOR VALUES IN ('de', 'fr')"),
+        (
+            {"modulus": 4, "remainder": 1},
+            "FOR VALUES WITH (MODULUS 4, REMAINDER 1)",
+        ),
+        ({"default": True}, "DEFAULT"),
+    ],
+)
+def test_partition_bounds__expect_bound_spec(
+    pg_compiler: PostgreSQLCompiler, kwargs: dict[str, Any], expected: str
+) -> None:
+    assert pg_compiler.partition_bounds(**kwargs) == expected
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"from_": ["2025-01-01"]},
+        {"values": ["de"], "default": True},
+        {"modulus": 4},
+    ],
+)
+def test_partition_bounds__with_invalid_combination__expect_value_error(
+    pg_compiler: PostgreSQLCompiler, kwargs: dict[str, Any]
+) -> None:
+    with pytest.raises(ValueError):
+        pg_compiler.partition_bounds(**kwargs)
+
+
+def test_create_partition__expect_partition_of(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(pg_compiler.create_partition("events", "events_p202501", "DEFAULT"))
+    assert [cast(MagicMock, d).statement for d in ddls] == [
+        "CREATE TABLE events_p202501 PARTITION OF events DEFAULT"
+    ]
+
+
+def test_detach_partition__with_concurrently__expect_concurrent_detach(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    ddls = list(
+        pg_compiler.detach_partition("events", "events_p202501", concurrently=True)
+    )
+    assert [cast(MagicMock, d).statement for d in ddls] == [
+        "ALTER TABLE events DETACH PARTITION events_p202501 CONCURRENTLY"
+    ]
@@ -28,3 +28,99 @@ def test_alter_column__with_nullable__expect_not_implemented(
 ) -> None:
     with pytest.raises(NotImplementedError):
         sqlite_compiler.alter_column("users", "email", nullable=False)
+
+
+def test_drop_tables__expect_statement_per_table(
+    sqlite_compiler: SQLiteCompiler,
+) -> None:
+    ddls = list(sqlite_compiler.drop_tables(["comments", "posts"], cascade=True))
+    assert [d.statement for d in ddls] == [
+        "DROP TABLE comments",
+        "DROP TABLE posts",
+    ]
+
+
+def test_use_schema__expect_not_implemented(sqlite_compiler: SQLiteCompiler) -> None:
+    with pytest.raises(NotImplementedError):
+        sqlite_compiler.use_schema("tenant_1")
+
+
+def test_set_setting__expect_pragma(sqlite_compiler: SQLiteCompiler) -> None:
+    ddls = list(sqlite_compiler.set_setting("synchronous", False))
+    assert [d.statement for d in ddls] == ["PRAGMA synchronous = off"]
+
+
+def test_analyze__expect_table_statements_then_optimize(
+    sqlite_compiler: SQLiteCompiler,
+) -> None:
+    ddls = list(sqlite_compiler.analyze(["users", "posts"]))
+    assert [d.statement for d in ddls] == [
+        "ANALYZE users",
+        "ANALYZE posts",
+        "PRAGMA optimize",
+    ]
+
+
+def test_vacuum__expect_whole_database(sqlite_compiler: SQLiteCompiler) -> None:
+    ddls = list(sqlite_compiler.vacuum(["users"]))
+    assert [d.statement for d in ddls] == ["VACUUM"]
+
+
+def test_create_index__with_concurrently__expect_plain_build(
+    sqlite_compiler: SQLiteCompiler,
+) -> None:
+    ddls = list(
+        sqlite_compiler.create_index(
+            "users", "users_email_idx", ["email"], concurrently=True
+        )
+    )
+    assert [d.statement for d in ddls] == [
+        "CREATE INDEX users_email_idx ON users (email)"
+    ]
+
+
+def test_create_index__with_expression_and_where__expect_partial_index(
+    sqlite_compiler: SQLiteCompiler,
+) -> None:
+    ddls = list(
+        sqlite_compiler.create_index(
+            "users",
+            "users_lower_email_idx",
+            ["lower(email)", "created_at DESC"],
+            where="email IS NOT NULL",
+        )
+    )
+    assert [d.statement for d in ddls] == [
+        "CREATE INDEX users_lower_email_idx ON users ((lower(email)), created_at DESC) "
+        "WHERE email IS NOT NULL"
+    ]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"include": ["id"]},
+        {"using": "gin"},
+        {"column_names": ["email text_pattern_ops"]},
+    ],
+)
+def test_create_index__with_postgresql_options__expect_not_implemented(
+    sqlite_compiler: SQLiteCompiler, options: dict
+) -> None:
+    kwargs = {"column_names": ["email"], **options}
+    with pytest.raises(NotImplementedError):
+        sqlite_compiler.create_index("users", "users_email_idx", **kwargs)
+
+
+def test_add_foreign_key__expect_not_implemented(
+    sqlite_compiler: SQLiteCompiler,
+) -> None:
+    with pytest.raises(NotImplementedError):
+        sqlite_compiler.add_foreign_key("posts", "fk", ["user_id"], "users", ["id"])
+
+
+def test_partition_clause__expect_not_implemented(
+    sqlite_compiler: SQLiteCompiler,
+) -> None:
+    with pytest.raises(NotImplementedError, match="partitioning"):
+        sqlite_compiler.partition_clause("range", ["created_at"])
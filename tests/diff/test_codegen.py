@@ -21,6 +21,7 @@ from pelican.diff.operations import (
     AddEnumValue,
     RemoveEnumValue,
     CreateEnum,
+    AlterPartitioning,
 )
 from collections.abc import Sequence
 
@@ -175,6 +176,22 @@ def test_render_migration__with_create_index__expect_remove_index_in_down() -> N
     assert "t.remove_index(name='users_email_idx')" in down
 
 
+def test_render_migration__with_index_options__expect_options_in_up() -> None:
+    idx = SchemaIndex(
+        "users_tags_idx",
+        ["tags jsonb_path_ops"],
+        unique=False,
+        where="deleted_at is null",
+        include=["email"],
+        using="gin",
+    )
+    up = _up([CreateIndex("users", idx)])
+    assert (
+        "t.index(['tags jsonb_path_ops'], name='users_tags_idx', "
+        "where='deleted_at is null', include=['email'], using='gin')"
+    ) in up
+
+
 def test_render_migration__with_add_enum_value__expect_comment_in_up() -> None:
     ops = [AddEnumValue("status", "banned")]
     up = _up(ops)
@@ -219,3 +236,19 @@ def test_render_down__with_fk_tables__expect_referencing_table_dropped_first() -
     ops = [CreateTable(posts), CreateTable(users)]
     down = _down(ops)
     assert down.index("drop_table('posts')") < down.index("drop_table('users')")
+
+
+def test_render_migration__with_partitioned_table__expect_partition_by() -> None:
+    table = SchemaTable(
+        "events",
+        columns=[_col("created_at", "TIMESTAMP", nullable=False)],
+        partition_by="RANGE (created_at)",
+    )
+    up = _up([CreateTable(table)])
+    assert "create_table('events', partition_by=range_('created_at'))" in up
+
+
+def test_render_migration__with_alter_partitioning__expect_warning_in_up() -> None:
+    up = _up([AlterPartitioning("events", None, "HASH (id)")])
+    assert "with change_table('events') as t:" in up
+    assert "# WARNING: partitioning can't be altered in place" in up
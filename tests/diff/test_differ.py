@@ -24,6 +24,7 @@ from pelican.diff.operations import (
     DropEnum,
     AddEnumValue,
     RemoveEnumValue,
+    AlterPartitioning,
 )
 from pelican.diff.differ import diff
 
@@ -258,3 +259,43 @@ def test_diff__with_removed_enum_value__expect_remove_enum_value() -> None:
     assert any(
         isinstance(o, RemoveEnumValue) and o.value == "banned" for o in result.ops
     )
+
+
+def test_diff__with_same_partitioning__expect_no_ops() -> None:
+    table = SchemaTable(
+        "events", [_col("created_at")], partition_by="RANGE (created_at)"
+    )
+    assert not diff(_state(table), _state(table))
+
+
+def test_diff__with_changed_partitioning__expect_alter_partitioning() -> None:
+    current = _state(_table("events", _col("created_at")))
+    desired = _state(
+        SchemaTable("events", [_col("created_at")], partition_by="RANGE (created_at)")
+    )
+    result = diff(current, desired)
+    assert result.ops == [AlterPartitioning("events", None, "RANGE (created_at)")]
+
+
+def test_diff__with_changed_index_definition__expect_rebuild() -> None:
+    before = SchemaIndex("users_email_idx", ["email"], unique=False)
+    after = SchemaIndex(
+        "users_email_idx", ["lower(email)"], unique=False, where="email is not null"
+    )
+    current = _state(SchemaTable("users", columns=[_col("email")], indexes=[before]))
+    desired = _state(SchemaTable("users", columns=[_col("email")], indexes=[after]))
+
+    result = diff(current, desired)
+
+    index_ops = [o for o in result.ops if isinstance(o, (DropIndex, CreateIndex))]
+    assert [(type(o), o.index) for o in index_ops] == [
+        (DropIndex, before),
+        (CreateIndex, after),
+    ]
+
+
+def test_diff__with_same_index_definition__expect_no_ops() -> None:
+    idx = SchemaIndex("users_email_idx", ["email"], unique=True)
+    current = _state(SchemaTable("users", columns=[_col("email")], indexes=[idx]))
+    desired = _state(SchemaTable("users", columns=[_col("email")], indexes=[idx]))
+    assert not diff(current, desired).ops
@@ -11,8 +11,10 @@ from sqlalchemy import (
     CheckConstraint,
     Index,
     create_engine,
+    func,
     text,
 )
+from sqlalchemy.dialects import postgresql as postgresql_dialect
 from sqlalchemy.dialects import sqlite as sqlite_dialect
 
 from pelican.diff.extractor import extract_from_metadata
@@ -159,3 +161,73 @@ def test_extract_from_metadata__expect_column_positions() -> None:
     state = extract_from_metadata(metadata, _DIALECT)
     users = next(t for t in state.tables if t.name == "users")
     assert [c.position for c in users.columns] == [0, 1, 2]
+
+
+def test_extract__with_partitioned_table__expect_normalized_partition_by() -> None:
+    metadata = MetaData()
+    Table(
+        "events",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("created_at", Integer, primary_key=True),
+        postgresql_partition_by="range(created_at)",
+    )
+    state = extract_from_metadata(metadata, postgresql_dialect.dialect())
+    assert state.tables[0].partition_by == "RANGE (created_at)"
+
+
+def test_extract__with_sqlite__expect_no_partition_by(
+    simple_metadata: MetaData,
+) -> None:
+    state = extract_from_metadata(simple_metadata, _DIALECT)
+    assert all(table.partition_by is None for table in state.tables)
+
+
+def test_extract__with_postgresql_index_options__expect_definition() -> None:
+    metadata = MetaData()
+    users = Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("email", String(255)),
+        Column("name", String(255)),
+        Column("tags", Text),
+    )
+    Index(
+        "users_name_idx",
+        users.c.name,
+        postgresql_ops={"name": "text_pattern_ops"},
+        postgresql_include=["email"],
+        postgresql_where=text("email IS NOT NULL"),
+    )
+    Index("users_tags_idx", users.c.tags, postgresql_using="gin")
+
+    state = extract_from_metadata(metadata, postgresql_dialect.dialect())
+
+    name_idx, tags_idx = state.tables[0].indexes
+    assert name_idx.columns == ["name text_pattern_ops"]
+    assert name_idx.include == ["email"]
+    assert name_idx.where == "email is not null"
+    assert name_idx.using is None
+    assert tags_idx.using == "gin"
+
+
+def test_extract__with_sqlite_expression_index__expect_normalized_entry() -> None:
+    metadata = MetaData()
+    users = Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("email", String(255)),
+    )
+    Index(
+        "users_lower_email_idx",
+        func.lower(users.c.email),
+        sqlite_where=text("email IS NOT NULL"),
+    )
+
+    state = extract_from_metadata(metadata, _DIALECT)
+
+    (idx,) = state.tables[0].indexes
+    assert idx.columns == ["lower(email)"]
+    assert idx.where == "email is not null"
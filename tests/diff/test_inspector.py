@@ -2,6 +2,8 @@ import pytest
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
+from pelican.diff import inspector
+from pelican.diff.dialects import SQLiteInspector
 from pelican.diff.inspector import introspect_live_db
 from pelican.diff.schema import SchemaState
 
@@ -99,3 +101,51 @@ def test_introspect_live_db__expect_column_positions(engine: Engine) -> None:
     users = next(t for t in state.tables if t.name == "users")
     positions = [c.position for c in users.columns]
     assert positions == list(range(len(users.columns)))
+
+
+def test_introspect_live_db__with_schema__expect_tables_from_that_schema(
+    engine: Engine,
+) -> None:
+    state = introspect_live_db(engine, schema="main")
+
+    assert {t.name for t in state.tables} == {"users", "posts"}
+    posts = next(t for t in state.tables if t.name == "posts")
+    assert posts.foreign_keys[0].ref_table == "users"
+
+
+class _PartitionedInspector(SQLiteInspector):
+    def get_partition_keys(
+        self, engine: Engine, schema: str | None = None
+    ) -> dict[str, str]:
+        return {"users": 'RANGE ("id")'}
+
+    def get_partitions(self, engine: Engine, schema: str | None = None) -> set[str]:
+        return {"posts"}
+
+
+def test_introspect_live_db__with_partitions__expect_parent_only(
+    engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(inspector, "inspector_for", lambda _: _PartitionedInspector())
+
+    state = introspect_live_db(engine)
+
+    assert [(t.name, t.partition_by) for t in state.tables] == [("users", "RANGE (id)")]
+
+
+def test_introspect_live_db__with_expression_partial_index__expect_definition(
+    engine: Engine,
+) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE INDEX users_lower_email_idx ON users ((lower("email")) DESC)
+            WHERE email IS NOT NULL
+        """))
+
+    state = introspect_live_db(engine)
+
+    users = next(t for t in state.tables if t.name == "users")
+    idx = next(i for i in users.indexes if i.name == "users_lower_email_idx")
+    assert idx.columns == ["lower(email) DESC"]
+    assert idx.where == "email is not null"
+    assert not idx.unique
@@ -3,6 +3,11 @@ from pelican.diff.normalizer import (
     normalize_type,
     normalize_check_expression,
     normalize_server_default,
+    normalize_partition_by,
+    normalize_index_element,
+    normalize_index_predicate,
+    normalize_index_method,
+    parse_create_index,
 )
 
 
@@ -89,3 +94,87 @@ def test_normalize_check_expression__with_expr__expect_canonical(
     raw: str, expected: str
 ) -> None:
     assert normalize_check_expression(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("RANGE (created_at)", "RANGE (created_at)"),
+        ("range(created_at)", "RANGE (created_at)"),
+        ('HASH ("tenant_id",  id)', "HASH (tenant_id, id)"),
+        ("LIST (region)", "LIST (region)"),
+    ],
+)
+def test_normalize_partition_by__with_clause__expect_canonical(
+    raw: str, expected: str
+) -> None:
+    assert normalize_partition_by(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("email", "email"),
+        ('"createdAt"', "createdAt"),
+        ("lower((email)::text)", "lower(email)"),
+        ("(LOWER( email ))", "lower(email)"),
+        ("created_at desc", "created_at DESC"),
+        ("created_at DESC NULLS FIRST", "created_at DESC"),
+        ("created_at NULLS LAST", "created_at"),
+        ("created_at NULLS FIRST", "created_at NULLS FIRST"),
+        ("name Text_Pattern_Ops", "name text_pattern_ops"),
+        ("coalesce(region,'EU')", "coalesce(region, 'EU')"),
+    ],
+)
+def test_normalize_index_element__with_entry__expect_canonical(
+    raw: str, expected: str
+) -> None:
+    assert normalize_index_element(raw) == expected
+
+
+def test_normalize_index_element__with_reflected_modifiers__expect_merged() -> None:
+    result = normalize_index_element(
+        "name", opclass="text_pattern_ops", descending=True, nulls="last"
+    )
+    assert result == "name text_pattern_ops DESC NULLS LAST"
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("(deleted_at IS NULL)", "deleted_at is null"),
+        ("((status)::text = 'Active'::text)", "status = 'Active'"),
+        ("status = 'Active'", "status = 'Active'"),
+    ],
+)
+def test_normalize_index_predicate__with_expr__expect_canonical(
+    raw: str, expected: str
+) -> None:
+    assert normalize_index_predicate(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected", [(None, None), ("btree", None), ("GIN", "gin")]
+)
+def test_normalize_index_method__with_method__expect_canonical(
+    raw: str | None, expected: str | None
+) -> None:
+    assert normalize_index_method(raw) == expected
+
+
+def test_parse_create_index__with_options__expect_parts() -> None:
+    parsed = parse_create_index(
+        "CREATE UNIQUE INDEX ix ON public.users USING gin "
+        '(tags jsonb_path_ops, (lower(a)) DESC) INCLUDE ("b", c) WHERE (x IS NOT NULL)'
+    )
+    assert parsed == {
+        "unique": True,
+        "columns": ["tags jsonb_path_ops", "(lower(a)) DESC"],
+        "include": ["b", "c"],
+        "using": "gin",
+        "where": "(x IS NOT NULL)",
+    }
+
+
+def test_parse_create_index__with_other_statement__expect_none() -> None:
+    assert parse_create_index("CREATE TABLE users (id INTEGER)") is None
@@ -3,6 +3,7 @@ from typing import Generator
 import pytest
 from sqlalchemy import MetaData
 
+from pelican._types import Migration
 from pelican.runner import MigrationRunner
 from pelican._context import use_context
 
@@ -11,3 +12,10 @@ from pelican._context import use_context
 def db_runner() -> Generator[MigrationRunner, None, None]:
     with use_context(database_url="sqlite:///:memory:", metadata=MetaData()) as active:
         yield active
+
+
+def make_migration(revision: int, up: object) -> Migration:
+    """Build an in-memory migration whose `up` is the given function."""
+    migration = Migration(name=f"step_{revision}", revision=revision)
+    migration.up = up  # type: ignore[assignment]
+    return migration
@@ -0,0 +1,260 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Connection
+
+from pelican import bulk_insert, create_table, use_context
+from pelican.runner import MigrationRunner
+from pelican.schema.operations import AddForeignKey, CreateIndex, ValidateForeignKey
+from pelican.throttle import Throttler
+from tests.runner.conftest import make_migration
+
+
+def _statements(runner: MigrationRunner) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def record(*args: object) -> None:
+        statements.append(str(args[2]).split(" (")[0].strip())
+
+    event.listen(runner.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(runner.engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def statements(db_runner: MigrationRunner) -> Iterator[list[str]]:
+    yield from _statements(db_runner)
+
+
+def test_create_table__with_defer_indexes__expect_index_built_after_load(
+    db_runner: MigrationRunner, statements: list[str]
+) -> None:
+    def up() -> None:
+        with create_table("planets", defer_indexes=True) as t:
+            t.string("name")
+            t.index(["name"])
+        bulk_insert("planets", [{"name": "Mars"}, {"name": "Venus"}])
+
+    db_runner.upgrade(make_migration(1, up))
+
+    insert_at = next(i for i, s in enumerate(statements) if s.startswith("INSERT"))
+    index_at = statements.index("CREATE INDEX planets_name_idx ON planets")
+    assert insert_at < index_at
+    with db_runner.begin() as conn:
+        indexes = inspect(conn).get_indexes("planets")
+        count = conn.execute(text("SELECT count(*) FROM planets")).scalar()
+    assert [i["name"] for i in indexes] == ["planets_name_idx"]
+    assert count == 2
+
+
+class _Pressure:
+    name = "lock_waits"
+
+    def __init__(self, values: list[float]) -> None:
+        self._values = iter(values)
+
+    def sample(self, conn: Connection) -> float | None:
+        return next(self._values, 0.0)
+
+
+class _MissingView:
+    name = "replication_lag"
+
+    def sample(self, conn: Connection) -> float | None:
+        return conn.exec_driver_sql("SELECT lag FROM pg_stat_replication").scalar()
+
+
+@pytest.fixture
+def file_runner(tmp_path: Path) -> Iterator[MigrationRunner]:
+    # An in-memory database shares one DBAPI connection, so the throttler's
+    # own connection would commit the insert's transaction
+    with use_context(database_url=f"sqlite:///{tmp_path / 'db.sqlite'}") as runner:
+        yield runner
+
+
+def _insert_planets(count: int, batch_size: int) -> None:
+    with create_table("planets") as t:
+        t.string("name")
+    bulk_insert(
+        "planets", [{"name": f"p{i}"} for i in range(count)], batch_size=batch_size
+    )
+
+
+def _planet_count(runner: MigrationRunner) -> int:
+    with runner.begin() as conn:
+        return int(conn.execute(text("SELECT count(*) FROM planets")).scalar_one())
+
+
+def test_bulk_insert__with_throttler__expect_paused_between_smaller_batches(
+    file_runner: MigrationRunner,
+) -> None:
+    paused: list[list[str]] = []
+    file_runner.throttler = Throttler(
+        [(_Pressure([3, 0]), 1.0)],
+        base_delay=0.0,
+        on_pause=lambda exceeded, delay: paused.append(exceeded),
+    )
+
+    for statements in _statements(file_runner):
+        file_runner.upgrade(make_migration(1, lambda: _insert_planets(5, 2)))
+
+    assert paused == [["lock_waits 3 > 1"]]
+    inserts = [s for s in statements if s.startswith("INSERT INTO planets")]
+    assert len(inserts) == 3
+    assert _planet_count(file_runner) == 5
+
+
+def test_bulk_insert__with_single_batch__expect_no_pause(
+    file_runner: MigrationRunner,
+) -> None:
+    file_runner.throttler = Throttler([(_Pressure([3]), 1.0)])
+
+    file_runner.upgrade(make_migration(1, lambda: _insert_planets(4, 4)))
+
+    assert file_runner.throttler.scale == 1.0
+    assert _planet_count(file_runner) == 4
+
+
+def test_bulk_insert__with_failing_sample__expect_rows_inserted(
+    file_runner: MigrationRunner,
+) -> None:
+    file_runner.throttler = Throttler([(_MissingView(), 1.0)])
+
+    file_runner.upgrade(make_migration(1, lambda: _insert_planets(5, 2)))
+
+    assert _planet_count(file_runner) == 5
+
+
+def test_create_table__with_defer_indexes_and_failure__expect_nothing_held(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        with create_table("planets", defer_indexes=True) as t:
+            t.string("name")
+            t.index(["name"])
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        db_runner.upgrade(make_migration(1, up))
+
+    assert db_runner._held == []
+
+
+def test_create_table__with_alterable_foreign_keys__expect_added_not_valid(
+    db_runner: MigrationRunner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    held: list[object] = []
+    monkeypatch.setattr(db_runner.compiler, "alter_foreign_keys", True)
+    monkeypatch.setattr(db_runner, "defer_operations", held.extend)
+
+    with create_table("systems") as t:
+        t.string("name")
+    with create_table("planets", defer_indexes=True) as t:
+        t.references("system")
+        t.index(["system_id"])
+
+    with db_runner.begin() as conn:
+        assert inspect(conn).get_foreign_keys("planets") == []
+    assert held == [
+        CreateIndex("planets", "planets_system_id_idx", ["system_id"], unique=False),
+        AddForeignKey(
+            "planets",
+            "planets_system_id_fkey",
+            ["system_id"],
+            "systems",
+            ["id"],
+            on_delete="CASCADE",
+            validate=False,
+        ),
+        ValidateForeignKey("planets", "planets_system_id_fkey"),
+    ]
+
+
+def test_create_table__with_defer_indexes_on_sqlite__expect_inline_foreign_keys(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("systems") as t:
+        t.string("name")
+    with create_table("planets", defer_indexes=True) as t:
+        t.references("system")
+
+    with db_runner.begin() as conn:
+        foreign_keys = inspect(conn).get_foreign_keys("planets")
+    assert [fk["referred_table"] for fk in foreign_keys] == ["systems"]
+
+
+def test_bulk_insert__expect_rows_inserted_in_batches(
+    db_runner: MigrationRunner, statements: list[str]
+) -> None:
+    with create_table("planets") as t:
+        t.string("name")
+    statements.clear()
+
+    count = bulk_insert("planets", ({"name": f"p{i}"} for i in range(5)), batch_size=2)
+
+    assert count == 5
+    assert sum(s.startswith("INSERT") for s in statements) == 3
+    assert db_runner.touched_tables == {"planets"}
+
+
+def test_bulk_insert__with_recording__expect_not_replayable(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("planets") as t:
+        t.string("name")
+
+    with db_runner.recording() as recorded:
+        bulk_insert("planets", [{"name": "Mars"}])
+
+    assert not recorded.replayable
+
+
+def test_bulk_insert__with_zero_batch_size__expect_value_error(
+    db_runner: MigrationRunner,
+) -> None:
+    with pytest.raises(ValueError, match="batch_size"):
+        bulk_insert("planets", [], batch_size=0)
+
+
+def _planet_index_names(conn: Connection) -> list[str | None]:
+    return [index["name"] for index in inspect(conn).get_indexes("planets")]
+
+
+def _load_planets() -> None:
+    with create_table("planets", defer_indexes=True) as t:
+        t.string("name")
+        t.index(["name"])
+    bulk_insert("planets", [{"name": "Mars"}])
+
+
+def test_create_table__with_defer_indexes_in_joined_transaction__expect_built_on_commit(
+    tmp_path: Path,
+) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+
+    with engine.connect() as conn:
+        with use_context(connection=conn):
+            with conn.begin():
+                _load_planets()
+                assert _planet_index_names(conn) == []
+            assert _planet_index_names(conn) == ["planets_name_idx"]
+    engine.dispose()
+
+
+def test_create_table__with_defer_indexes_in_rolled_back_transaction__expect_dropped(
+    tmp_path: Path,
+) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+
+    with engine.connect() as conn:
+        with use_context(connection=conn) as runner:
+            transaction = conn.begin()
+            _load_planets()
+            transaction.rollback()
+
+            assert runner._held == []
+            with conn.begin():
+                conn.exec_driver_sql("CREATE TABLE moons (id INTEGER)")
+    engine.dispose()
@@ -0,0 +1,128 @@
+from pathlib import Path
+
+import pytest
+
+from pelican import is_up_to_date
+from pelican._types import Migration
+from pelican.check import SchemaStatus, get_schema_status
+from pelican.runner import MigrationRunner
+
+
+@pytest.fixture
+def migrations_dir(tmp_path: Path) -> Path:
+    (tmp_path / "1_create_users.py").write_text("raise RuntimeError")
+    (tmp_path / "2_add_email.py").write_text("raise RuntimeError")
+    return tmp_path
+
+
+def _apply(runner: MigrationRunner, revision: int) -> None:
+    migration = Migration(name=f"step_{revision}", revision=revision)
+    migration.up = lambda: None
+    runner.upgrade(migration)
+
+
+def test_get_head_version__without_version_table__expect_none_and_no_table(
+    db_runner: MigrationRunner,
+) -> None:
+    assert db_runner.get_head_version() is None
+    assert not db_runner.reflection.has_table(db_runner.engine, "pelican_migration")
+
+
+def test_get_head_version__expect_highest_applied(db_runner: MigrationRunner) -> None:
+    for revision in [3, 10, 7]:
+        _apply(db_runner, revision)
+
+    assert db_runner.get_head_version() == 10
+
+
+def test_is_up_to_date__with_pending_file__expect_false(
+    db_runner: MigrationRunner, migrations_dir: Path
+) -> None:
+    _apply(db_runner, 1)
+
+    assert not is_up_to_date(migrations_dir)
+    assert get_schema_status(migrations_dir) == SchemaStatus(2, 1)
+
+
+def test_is_up_to_date__with_head_applied__expect_true(
+    db_runner: MigrationRunner, migrations_dir: Path
+) -> None:
+    _apply(db_runner, 1)
+    _apply(db_runner, 2)
+
+    assert is_up_to_date(migrations_dir)
+
+
+def test_get_schema_status__with_database_ahead__expect_ahead(
+    db_runner: MigrationRunner, migrations_dir: Path
+) -> None:
+    _apply(db_runner, 5)
+
+    status = get_schema_status(migrations_dir)
+
+    assert status.is_ahead
+    assert not status.is_pending
+
+
+def test_get_schema_status__with_missing_directory__expect_no_disk_revision(
+    db_runner: MigrationRunner, tmp_path: Path
+) -> None:
+    assert get_schema_status(tmp_path / "missing") == SchemaStatus(None, None)
+
+
+def _write_post_deploy(migrations_dir: Path, revision: int) -> None:
+    (migrations_dir / f"{revision}_backfill.py").write_text(
+        "from pelican import migration\n\n\n"
+        '@migration.up(phase="post")\n'
+        "def upgrade() -> None:\n"
+        "    raise RuntimeError\n"
+    )
+
+
+def test_is_up_to_date__with_pre_phase_and_pending_post_deploy__expect_true(
+    db_runner: MigrationRunner, migrations_dir: Path
+) -> None:
+    _write_post_deploy(migrations_dir, 3)
+    _apply(db_runner, 1)
+    _apply(db_runner, 2)
+
+    assert is_up_to_date(migrations_dir, phase="pre")
+    assert not is_up_to_date(migrations_dir)
+    assert get_schema_status(migrations_dir, phase="pre") == SchemaStatus(3, 2, 0)
+
+
+def test_is_up_to_date__with_pre_phase_and_pending_pre_deploy__expect_false(
+    db_runner: MigrationRunner, migrations_dir: Path
+) -> None:
+    _write_post_deploy(migrations_dir, 2)
+    (migrations_dir / "3_add_name.py").write_text("raise RuntimeError")
+    _apply(db_runner, 1)
+
+    status = get_schema_status(migrations_dir, phase="pre")
+
+    assert status.is_pending
+    assert status.required_revision == 3
+
+
+def test_is_up_to_date__with_pre_phase_and_post_deploy_applied__expect_true(
+    db_runner: MigrationRunner, migrations_dir: Path
+) -> None:
+    _write_post_deploy(migrations_dir, 3)
+    for revision in [1, 2, 3]:
+        _apply(db_runner, revision)
+
+    assert is_up_to_date(migrations_dir, phase="pre")
+
+
+def test_get_schema_status__with_manifest__expect_phase_from_manifest(
+    db_runner: MigrationRunner, migrations_dir: Path, tmp_path: Path
+) -> None:
+    _write_post_deploy(migrations_dir, 3)
+    _apply(db_runner, 1)
+    _apply(db_runner, 2)
+    manifest_path = tmp_path / ".pelican" / "manifest"
+
+    status = get_schema_status(migrations_dir, phase="pre", manifest_path=manifest_path)
+
+    assert status == SchemaStatus(3, 2, 0)
+    assert manifest_path.exists()
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import inspect
+
+from pelican import change_table, create_table
+from pelican.diff.inspector import introspect_live_db
+from pelican.diff.operations import render_index_call
+from pelican.runner import MigrationRunner
+from tests.runner.conftest import make_migration
+
+
+def _indexes(db_runner: MigrationRunner, table_name: str) -> dict:
+    state = introspect_live_db(db_runner.engine)
+    table = next(t for t in state.tables if t.name == table_name)
+    return {idx.name: idx for idx in table.indexes}
+
+
+def test_index__with_expression_and_where__expect_partial_index_introspected(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        with create_table("users") as t:
+            t.string("email", nullable=True)
+            t.index(["lower(email)"], where="email IS NOT NULL", unique=True)
+
+    db_runner.upgrade(make_migration(1, up))
+
+    idx = _indexes(db_runner, "users")["users_lower_email_idx"]
+    assert idx.columns == ["lower(email)"]
+    assert idx.where == "email is not null"
+    assert idx.unique
+    assert render_index_call(idx) == (
+        "t.index(['lower(email)'], name='users_lower_email_idx', unique=True, "
+        "where='email is not null')"
+    )
+
+
+def test_index__with_descending_column__expect_order_introspected(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        with create_table("events") as t:
+            t.string("kind")
+            t.datetime("created_at")
+            t.index(["kind", "created_at DESC"])
+
+    db_runner.upgrade(make_migration(1, up))
+
+    idx = _indexes(db_runner, "events")["events_kind_created_at_idx"]
+    assert idx.columns == ["kind", "created_at DESC"]
+
+
+def test_remove_index__with_expression__expect_default_name_dropped(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        with create_table("users") as t:
+            t.string("email")
+            t.index(["lower(email)"])
+
+    def remove() -> None:
+        with change_table("users") as t:
+            t.remove_index(["lower(email)"])
+
+    db_runner.upgrade(make_migration(1, up))
+    db_runner.upgrade(make_migration(2, remove))
+
+    assert _indexes(db_runner, "users") == {}
+
+
+def test_index__with_include_on_sqlite__expect_not_implemented(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        with create_table("users") as t:
+            t.string("email")
+            t.index(["email"], include=["id"])
+
+    with pytest.raises(NotImplementedError):
+        db_runner.upgrade(make_migration(1, up))
+
+
+def test_index__with_quoted_column_name__expect_column_indexed(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        with create_table("people") as t:
+            t.string("first name")
+            t.index(["first name"], name="people_first_name_idx")
+
+    db_runner.upgrade(make_migration(1, up))
+
+    indexes = inspect(db_runner.engine).get_indexes("people")
+    assert [(i["name"], i["column_names"]) for i in indexes] == [
+        ("people_first_name_idx", ["first name"])
+    ]
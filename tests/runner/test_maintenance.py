@@ -0,0 +1,180 @@
+import pytest
+from sqlalchemy import inspect
+
+from pelican import (
+    change_table,
+    create_table,
+    drop_table,
+    get_runner,
+    reindex,
+    vacuum,
+)
+from pelican._types import IndexBuildError
+from pelican.runner import MigrationRunner
+from tests.runner.conftest import make_migration
+
+
+def _create_users() -> None:
+    with create_table("users") as t:
+        t.string("email")
+
+
+def test_upgrade__expect_changed_tables_touched(db_runner: MigrationRunner) -> None:
+    def up() -> None:
+        _create_users()
+        with create_table("scratch") as t:
+            t.string("note")
+        with change_table("users") as t:
+            t.index(["email"])
+        drop_table("scratch")
+
+    db_runner.upgrade(make_migration(1, up))
+
+    assert db_runner.touched_tables == {"users"}
+
+
+def test_upgrade__with_failure__expect_nothing_touched(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        _create_users()
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        db_runner.upgrade(make_migration(1, up))
+
+    assert db_runner.touched_tables == set()
+
+
+def test_upgrade__with_vacuum__expect_run_after_commit(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        _create_users()
+        get_runner().execute(["INSERT INTO users (email) VALUES ('a@b.c')"])
+        vacuum("users", analyze=True)
+
+    db_runner.upgrade(make_migration(1, up))
+
+    assert list(db_runner.get_applied_versions()) == [1]
+    with db_runner.begin() as conn:
+        stats = conn.exec_driver_sql("SELECT tbl FROM sqlite_stat1").scalars().all()
+    assert "users" in stats
+
+
+def test_upgrade__with_reindex__expect_applied(db_runner: MigrationRunner) -> None:
+    def up() -> None:
+        _create_users()
+        with change_table("users") as t:
+            t.index(["email"])
+        reindex("users")
+        reindex("users_email_idx", concurrently=False)
+
+    db_runner.upgrade(make_migration(1, up))
+
+    assert list(db_runner.get_applied_versions()) == [1]
+
+
+def test_maintain__expect_touched_tables_analyzed_and_cleared(
+    db_runner: MigrationRunner,
+) -> None:
+    db_runner.upgrade(make_migration(1, _create_users))
+    get_runner().execute(["INSERT INTO users (email) VALUES ('a@b.c')"])
+
+    maintained = db_runner.maintain()
+
+    assert maintained == ["users"]
+    assert db_runner.touched_tables == set()
+    with db_runner.begin() as conn:
+        stats = conn.exec_driver_sql("SELECT tbl FROM sqlite_stat1").scalars().all()
+    assert "users" in stats
+
+
+def test_maintain__with_nothing_touched__expect_no_op(
+    db_runner: MigrationRunner,
+) -> None:
+    assert db_runner.maintain(vacuum=True) == []
+
+
+def test_recording__with_vacuum__expect_not_replayable(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        _create_users()
+        vacuum("users")
+
+    with db_runner.recording() as statements:
+        db_runner.upgrade(make_migration(1, up))
+
+    assert not statements.replayable
+
+
+def _create_posts() -> None:
+    with create_table("posts") as t:
+        t.string("title")
+
+
+def test_upgrade__with_concurrent_indexes__expect_built_after_commit(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        _create_users()
+        _create_posts()
+        with change_table("users") as t:
+            t.index(["email"], concurrently=True)
+        with change_table("posts") as t:
+            t.index(["title"], concurrently=True)
+
+    db_runner.upgrade(make_migration(1, up))
+
+    with db_runner.begin() as conn:
+        indexes = {
+            table: [i["name"] for i in inspect(conn).get_indexes(table)]
+            for table in ("users", "posts")
+        }
+        cached = db_runner.reflection.get_table(conn, "users")
+    assert indexes == {"users": ["users_email_idx"], "posts": ["posts_title_idx"]}
+    assert [i.name for i in cached.indexes] == ["users_email_idx"]
+
+
+def test_upgrade__with_failing_concurrent_index__expect_failure_per_index(
+    db_runner: MigrationRunner,
+) -> None:
+    def up() -> None:
+        _create_users()
+        _create_posts()
+        with change_table("users") as t:
+            t.index(["missing"], concurrently=True)
+        with change_table("posts") as t:
+            t.index(["title"], concurrently=True)
+
+    with pytest.raises(IndexBuildError) as exc_info:
+        db_runner.upgrade(make_migration(1, up))
+
+    assert list(exc_info.value.failures) == ["users_missing_idx"]
+    assert exc_info.value.built == ["posts_title_idx"]
+    # The migration itself had already committed.
+    assert list(db_runner.get_applied_versions()) == [1]
+
+
+def test_upgrade_many__with_failing_concurrent_index__expect_batch_completed(
+    db_runner: MigrationRunner,
+) -> None:
+    def first() -> None:
+        _create_users()
+        with change_table("users") as t:
+            t.index(["missing"], concurrently=True)
+
+    def second() -> None:
+        _create_posts()
+
+    applied = []
+    with pytest.raises(IndexBuildError) as exc_info:
+        for migration in db_runner.upgrade_many(
+            [make_migration(1, first), make_migration(2, second)]
+        ):
+            applied.append(migration.revision)
+
+    assert applied == [1, 2]
+    assert list(exc_info.value.failures) == ["users_missing_idx"]
+    assert list(db_runner.get_applied_versions()) == [1, 2]
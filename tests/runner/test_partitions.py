@@ -0,0 +1,183 @@
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, text
+from sqlalchemy.dialects.postgresql import dialect as pg_dialect
+from sqlalchemy.schema import CreateTable
+
+from pelican import (
+    create_future_partitions,
+    create_table,
+    detach_partition,
+    drop_expired_partitions,
+    range_,
+)
+from pelican.compilers.postgresql import PostgreSQLCompiler
+from pelican.runner import MigrationRunner
+from pelican.schema.helpers import _partition
+from pelican.schema.operations import CreatePartition, DetachPartition, Operation
+
+
+@pytest.fixture
+def pg_compiler() -> PostgreSQLCompiler:
+    engine = MagicMock()
+    engine.dialect = pg_dialect()
+    return PostgreSQLCompiler(engine)
+
+
+@pytest.fixture
+def executed(
+    db_runner: MigrationRunner,
+    pg_compiler: PostgreSQLCompiler,
+    monkeypatch: pytest.MonkeyPatch,
+) -> list[Operation]:
+    """Compile with PostgreSQL, capturing operations instead of running them."""
+    operations: list[Operation] = []
+    monkeypatch.setattr(db_runner, "_compiler", pg_compiler)
+    monkeypatch.setattr(db_runner, "execute_operations", operations.extend)
+    return operations
+
+
+def _partitions(compiler: PostgreSQLCompiler, rows: list[tuple[str, str]]) -> None:
+    query = " UNION ALL ".join(
+        f"SELECT '{name}' AS name, '{bounds.replace(chr(39), chr(39) * 2)}' AS bounds"
+        for name, bounds in rows
+    )
+    compiler.list_partitions = lambda table_name: text(  # type: ignore[method-assign]
+        query or "SELECT NULL AS name, NULL AS bounds WHERE 0"
+    )
+
+
+def test_range__without_columns__expect_value_error() -> None:
+    with pytest.raises(ValueError, match="At least one column"):
+        range_()
+
+
+def test_create_table__with_partition_by_on_sqlite__expect_not_implemented(
+    db_runner: MigrationRunner,
+) -> None:
+    with pytest.raises(NotImplementedError, match="partitioning"):
+        with create_table("events", partition_by=range_("created_at")) as t:
+            t.datetime("created_at")
+
+
+def test_partition__expect_partition_key_in_primary_key(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    table = Table(
+        "events",
+        MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("created_at", DateTime, nullable=False),
+    )
+
+    _partition(table, range_("created_at"), pg_compiler)
+
+    ddl = str(CreateTable(table).compile(dialect=pg_dialect()))
+    assert "PRIMARY KEY (id, created_at)" in ddl
+    assert ddl.rstrip().endswith("PARTITION BY RANGE (created_at)")
+
+
+def test_partition__with_missing_column__expect_value_error(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    table = Table("events", MetaData(), Column("id", Integer, primary_key=True))
+
+    with pytest.raises(ValueError, match="missing column"):
+        _partition(table, range_("created_at"), pg_compiler)
+
+
+def test_create_future_partitions__expect_missing_months_created(
+    db_runner: MigrationRunner,
+    pg_compiler: PostgreSQLCompiler,
+    executed: list[Operation],
+) -> None:
+    _partitions(pg_compiler, [("events_p202511", "FOR VALUES FROM ('2025-11-01')")])
+
+    created = create_future_partitions("events", count=3, start=date(2025, 11, 15))
+
+    assert created == ["events_p202512", "events_p202601"]
+    assert executed == [
+        CreatePartition(
+            "events",
+            "events_p202512",
+            "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        ),
+        CreatePartition(
+            "events",
+            "events_p202601",
+            "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+        ),
+    ]
+
+
+def test_create_future_partitions__with_weeks__expect_monday_starts(
+    db_runner: MigrationRunner,
+    pg_compiler: PostgreSQLCompiler,
+    executed: list[Operation],
+) -> None:
+    _partitions(pg_compiler, [])
+
+    created = create_future_partitions(
+        "events", interval="week", count=2, start=date(2025, 1, 1)
+    )
+
+    assert created == ["events_p20241230", "events_p20250106"]
+
+
+def test_create_future_partitions__with_invalid_interval__expect_value_error(
+    db_runner: MigrationRunner,
+) -> None:
+    with pytest.raises(ValueError, match="Invalid partition interval"):
+        create_future_partitions("events", interval="hour")  # type: ignore[arg-type]
+
+
+def test_drop_expired_partitions__expect_only_ended_partitions_dropped(
+    db_runner: MigrationRunner,
+    pg_compiler: PostgreSQLCompiler,
+    executed: list[Operation],
+) -> None:
+    _partitions(
+        pg_compiler,
+        [
+            ("events_p202401", "FOR VALUES FROM ('2024-01-01') TO ('2024-02-01')"),
+            (
+                "events_p202402",
+                "FOR VALUES FROM ('2024-02-01 00:00:00+00') "
+                "TO ('2024-03-01 00:00:00+00')",
+            ),
+            ("events_p202403", "FOR VALUES FROM ('2024-03-01') TO ('2024-04-01')"),
+            ("events_future", "FOR VALUES FROM ('2024-04-01') TO (MAXVALUE)"),
+            ("events_default", "DEFAULT"),
+        ],
+    )
+
+    dropped = drop_expired_partitions("events", before=datetime(2024, 3, 1))
+
+    assert dropped == ["events_p202401", "events_p202402"]
+    assert executed == [
+        DetachPartition("events", "events_p202401", concurrently=True, drop=True),
+        DetachPartition("events", "events_p202402", concurrently=True, drop=True),
+    ]
+
+
+def test_detach_partition__with_drop__expect_detach_then_drop(
+    pg_compiler: PostgreSQLCompiler,
+) -> None:
+    operation = DetachPartition("events", "events_p202401", drop=True)
+
+    statements = [ddl.statement for ddl in operation.compile(pg_compiler)]  # type: ignore[attr-defined]
+
+    assert not operation.transactional
+    assert statements == [
+        "ALTER TABLE events DETACH PARTITION events_p202401 CONCURRENTLY",
+        "DROP TABLE events_p202401",
+    ]
+
+
+def test_detach_partition__on_sqlite__expect_not_implemented(
+    db_runner: MigrationRunner,
+) -> None:
+    with pytest.raises(NotImplementedError, match="partitioning"):
+        detach_partition("events", "events_p202401", concurrently=False)
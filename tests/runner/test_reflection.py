@@ -0,0 +1,123 @@
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import event
+
+from pelican import create_table, change_table
+from pelican.reflection import ReflectionCache
+from pelican.runner import MigrationRunner
+
+
+@pytest.fixture
+def statements(db_runner: MigrationRunner) -> Iterator[list[str]]:
+    captured: list[str] = []
+
+    def capture(conn, cursor, statement, *args) -> None:  # type: ignore[no-untyped-def]
+        captured.append(statement)
+
+    event.listen(db_runner.engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(db_runner.engine, "before_cursor_execute", capture)
+
+
+def _reflections(statements: list[str], table: str) -> int:
+    return sum(1 for s in statements if f'table_xinfo("{table}")' in s)
+
+
+def test_change_table__after_create_table__expect_no_reflection(
+    db_runner: MigrationRunner, statements: list[str]
+) -> None:
+    with create_table("crew") as t:
+        t.string("name")
+
+    with change_table("crew") as t:
+        t.string("rank")
+
+    with change_table("crew") as t:
+        t.integer("age")
+
+    assert _reflections(statements, "crew") == 0
+    assert {"name", "rank", "age"} <= set(
+        db_runner.reflection.metadata.tables["crew"].c.keys()
+    )
+
+
+def test_change_table__with_rename_and_drop__expect_table_reflected_again(
+    db_runner: MigrationRunner, statements: list[str]
+) -> None:
+    with create_table("ships") as t:
+        t.string("name")
+        t.string("color")
+        t.index(["name"])
+
+    with change_table("ships") as t:
+        t.rename("name", "title")
+        t.drop("color")
+        t.remove_index(name="ships_name_idx")
+
+    assert "ships" not in db_runner.reflection.metadata.tables
+
+    with change_table("ships") as t:
+        t.string("hull")
+
+    cached = db_runner.reflection.metadata.tables["ships"]
+    assert set(cached.c.keys()) == {"id", "title", "hull"}
+    assert not cached.indexes
+    assert _reflections(statements, "ships") == 1
+
+
+def test_create_table__expect_existence_probed_once(
+    db_runner: MigrationRunner, statements: list[str]
+) -> None:
+    for name in ["alpha", "beta", "gamma"]:
+        with create_table(name) as t:
+            t.string("value")
+
+    assert sum(1 for s in statements if "sqlite_master" in s) == 1
+
+
+def test_execute__expect_cache_invalidated(
+    db_runner: MigrationRunner, statements: list[str]
+) -> None:
+    with create_table("docks") as t:
+        t.string("name")
+
+    db_runner.execute(["ALTER TABLE docks ADD COLUMN berth INTEGER"])
+
+    with change_table("docks") as t:
+        t.string("harbor")
+
+    assert _reflections(statements, "docks") == 1
+    assert "berth" in db_runner.reflection.metadata.tables["docks"].c
+
+
+def test_change_table__with_failure__expect_table_evicted(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("probes") as t:
+        t.string("kind")
+
+    with pytest.raises(NotImplementedError):
+        with change_table("probes") as t:
+            t.string("status")
+            t.alter("kind", nullable=True)
+
+    assert "probes" not in db_runner.reflection.metadata.tables
+
+
+def test_get_table__with_schema__expect_cached_without_schema(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("fleets") as t:
+        t.string("name")
+    with create_table("vessels") as t:
+        t.references("fleets")
+
+    cache = ReflectionCache(schema="main")
+    with db_runner.begin() as conn:
+        vessels = cache.get_table(conn, "vessels")
+        assert cache.has_table(conn, "fleets")
+
+    assert list(cache.metadata.tables) == ["vessels"]
+    assert vessels.schema is None
+    assert [fk.target_fullname for fk in vessels.foreign_keys] == ["fleets.id"]
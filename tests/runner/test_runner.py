@@ -1,10 +1,33 @@
+import sys
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
-from sqlalchemy import inspect
-
-from pelican import create_table, change_table, drop_table
-from pelican._types import Migration
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    MetaData,
+    Table,
+    create_engine,
+    event,
+    inspect,
+    text,
+)
+from sqlalchemy.exc import NoSuchTableError
+from sqlalchemy.pool import StaticPool
+
+from pelican import (
+    create_table,
+    change_table,
+    drop_table,
+    create_tables,
+    drop_tables,
+    get_runner,
+    use_context,
+)
+from pelican._types import Migration, MigrationBatchError
+from pelican.registry import MigrationRegistry
 from pelican.runner import MigrationRunner, _build_compiler
 from pelican.compilers import SQLiteCompiler
 
@@ -276,6 +299,350 @@ def test_set_database_url__expect_isolated_from_previous_database(
     assert 1 in list(db_runner.get_applied_versions())
 
     db_runner.database_url = "sqlite:///:memory:"
-    db_runner._ensure_version_table_exists()
+    with db_runner.begin() as conn:
+        db_runner._ensure_version_table_exists(conn)
 
     assert 1 not in list(db_runner.get_applied_versions())
+
+
+def test_create_table__with_indexes__expect_no_table_reflection(
+    db_runner: MigrationRunner,
+) -> None:
+    statements: list[str] = []
+    event.listen(
+        db_runner.engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    with create_table("tickets") as t:
+        t.string("code")
+        t.string("status")
+        t.index(["code"], unique=True)
+        t.index(["status"])
+
+    assert not any("index_list" in s or "foreign_key_list" in s for s in statements)
+    assert {"tickets_code_idx", "tickets_status_idx"} <= set(
+        _index_names(db_runner, "tickets")
+    )
+
+
+def test_create_tables__with_children_first__expect_all_created(
+    db_runner: MigrationRunner,
+) -> None:
+    metadata = MetaData()
+    users = Table("users", metadata, Column("id", Integer, primary_key=True))
+    posts = Table(
+        "posts",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("user_id", Integer, ForeignKey("users.id")),
+    )
+
+    create_tables([posts, users])
+
+    assert _table_exists(db_runner, "users")
+    assert _table_exists(db_runner, "posts")
+
+
+def test_create_tables__with_existing_table__expect_skipped(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("users") as t:
+        t.string("name")
+
+    created = db_runner.create_tables(
+        [Table("users", MetaData(), Column("id", Integer, primary_key=True))]
+    )
+
+    assert created == []
+    assert "name" in _column_names(db_runner, "users")
+
+
+def test_drop_tables__expect_referencing_tables_dropped_first(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("users") as t:
+        t.string("name")
+    with create_table("posts") as t:
+        t.references("user")
+    db_runner.reflection.invalidate()
+
+    statements: list[str] = []
+    event.listen(
+        db_runner.engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    drop_tables(["users", "posts"])
+
+    drops = [s for s in statements if s.startswith("DROP TABLE")]
+    assert drops == ["DROP TABLE posts", "DROP TABLE users"]
+    assert not _table_exists(db_runner, "users")
+    assert not _table_exists(db_runner, "posts")
+
+
+def test_drop_table__with_missing_table__expect_no_such_table(
+    db_runner: MigrationRunner,
+) -> None:
+    with pytest.raises(NoSuchTableError, match="nope"):
+        drop_table("nope")
+
+
+def test_drop_tables__with_one_missing__expect_nothing_dropped(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("users") as t:
+        t.string("name")
+
+    with pytest.raises(NoSuchTableError, match="userz"):
+        drop_tables(["users", "userz"])
+
+    assert _table_exists(db_runner, "users")
+
+
+def test_upgrade__with_release__expect_module_and_tables_released(
+    db_runner: MigrationRunner, registry: MigrationRegistry, tmp_path: Path
+) -> None:
+    migration_file = tmp_path / "1_create_crew.py"
+    migration_file.write_text(
+        "from pelican import migration, create_table\n"
+        "\n"
+        "@migration.up\n"
+        "def upgrade():\n"
+        "    with create_table('crew') as t:\n"
+        "        t.string('name')\n"
+    )
+    migration = Migration.from_path(migration_file)
+    registry.register(migration)
+
+    db_runner.upgrade(migration, release=True)
+
+    assert _table_exists(db_runner, "crew")
+    assert not migration.is_loaded
+    assert "1_create_crew" not in sys.modules
+    assert "crew" not in db_runner.metadata.tables
+
+
+def test_upgrade_many__with_release__expect_reflection_cache_flat(
+    db_runner: MigrationRunner,
+) -> None:
+    def step(revision: int) -> Migration:
+        def up() -> None:
+            with create_table(f"table_{revision}") as t:
+                t.string("name")
+            with change_table(f"table_{revision}") as t:
+                t.string("note")
+
+        migration = Migration(name=f"step_{revision}", revision=revision)
+        migration.up = up
+        return migration
+
+    list(db_runner.upgrade_many([step(r) for r in range(1, 6)], release=True))
+
+    assert list(db_runner.get_applied_versions()) == [1, 2, 3, 4, 5]
+    assert not db_runner.metadata.tables
+    assert not db_runner.reflection.metadata.tables
+
+
+def test_create_table__with_reference_to_released_table__expect_fk_resolved(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("users") as t:
+        t.string("name")
+    db_runner.metadata.remove(db_runner.metadata.tables["users"])
+
+    with create_table("posts") as t:
+        t.references("user")
+
+    fks = inspect(db_runner.engine).get_foreign_keys("posts")
+    assert fks[0]["referred_table"] == "users"
+
+
+def test_upgrade_many__with_failure__expect_earlier_migrations_kept(
+    db_runner: MigrationRunner,
+) -> None:
+    def fail() -> None:
+        raise RuntimeError("boom")
+
+    migrations = [Migration(name=f"step_{rev}", revision=rev) for rev in [1, 2, 3]]
+    for m in migrations:
+        m.up = lambda: None
+    migrations[1].up = fail
+
+    applied = []
+    with pytest.raises(MigrationBatchError) as exc_info:
+        for m in db_runner.upgrade_many(migrations):
+            applied.append(m.revision)
+
+    assert applied == [1]
+    assert exc_info.value.migration is migrations[1]
+    assert exc_info.value.completed == [migrations[0]]
+    assert sorted(db_runner.get_applied_versions()) == [1]
+
+
+def test_downgrade_many__expect_one_connection(db_runner: MigrationRunner) -> None:
+    migrations = [Migration(name=f"step_{rev}", revision=rev) for rev in [1, 2, 3]]
+    for m in migrations:
+        m.up = m.down = lambda: None
+        db_runner.upgrade(m)
+
+    checkouts: list[object] = []
+    event.listen(db_runner.engine, "engine_connect", checkouts.append)
+
+    with db_runner.connect():
+        assert sorted(db_runner.get_applied_versions()) == [1, 2, 3]
+        list(db_runner.downgrade_many(reversed(migrations)))
+
+    assert len(checkouts) == 1
+    assert list(db_runner.get_applied_versions()) == []
+
+
+def test_runner__with_engine_options__expect_passed_to_create_engine() -> None:
+    runner = MigrationRunner(
+        database_url="sqlite:///:memory:", engine_options={"poolclass": StaticPool}
+    )
+
+    assert isinstance(runner.engine.pool, StaticPool)
+
+
+def test_runner__with_application_engine__expect_engine_reused() -> None:
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+
+    with use_context(engine=engine, metadata=MetaData()) as runner:
+        with create_table("harbors") as t:
+            t.string("name")
+
+    assert runner.engine is engine
+    assert "harbors" in inspect(engine).get_table_names()
+
+
+def test_runner__with_application_connection__expect_joined_transaction() -> None:
+    engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    migration = Migration(name="init", revision=1)
+    migration.up = lambda: None
+
+    with engine.connect() as conn:
+        with conn.begin():
+            runner = MigrationRunner(connection=conn)
+            runner.upgrade(migration)
+            assert conn.in_transaction()
+
+        assert list(runner.get_applied_versions()) == [1]
+
+
+def test_replay__with_recorded_migration__expect_same_schema_elsewhere(
+    tmp_path: Path,
+) -> None:
+    def create_crew() -> None:
+        with create_table("crew") as t:
+            t.string("name")
+            t.index(["name"])
+
+    migration = Migration(name="create_crew", revision=1)
+    migration.up = create_crew
+
+    with use_context(database_url=f"sqlite:///{tmp_path / 'a.db'}") as first:
+        with first.recording() as statements:
+            first.upgrade(migration)
+    assert statements.replayable
+
+    with use_context(database_url=f"sqlite:///{tmp_path / 'b.db'}") as second:
+        second.replay(migration, statements)
+
+        assert list(second.get_applied_versions()) == [1]
+        assert _index_names(second, "crew") == ["crew_name_idx"]
+    assert all("pelican_migration" not in sql for sql, _ in statements)
+
+
+def test_recording__with_data_migration_on_begin__expect_not_replayable(
+    db_runner: MigrationRunner,
+) -> None:
+    with create_table("crew") as t:
+        t.string("name")
+
+    def rename_crew() -> None:
+        with get_runner().begin() as conn:
+            conn.execute(text("UPDATE crew SET name = upper(name)"))
+
+    migration = Migration(name="rename_crew", revision=1)
+    migration.up = rename_crew
+
+    with db_runner.recording() as statements:
+        db_runner.upgrade(migration)
+
+    assert not statements.replayable
+
+
+def test_upgrade__with_post_phase__expect_phase_recorded(
+    db_runner: MigrationRunner,
+) -> None:
+    migration = Migration(name="index_users", revision=1)
+    migration.up = lambda: None
+    migration.phase = "post"
+
+    db_runner.upgrade(migration)
+
+    with db_runner.begin() as conn:
+        phases = conn.exec_driver_sql("SELECT phase FROM pelican_migration").all()
+    assert phases == [("post",)]
+
+
+def test_upgrade__with_version_table_without_phase__expect_column_added(
+    tmp_path: Path,
+) -> None:
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE pelican_migration "
+            "(version INTEGER PRIMARY KEY, applied_at DATETIME NOT NULL)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO pelican_migration VALUES (1, '2024-01-01 00:00:00')"
+        )
+    engine.dispose()
+
+    migration = Migration(name="second", revision=2)
+    migration.up = lambda: None
+
+    with use_context(database_url=url, metadata=MetaData()) as runner:
+        runner.upgrade(migration)
+
+        with runner.begin() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT version, phase FROM pelican_migration ORDER BY version"
+            ).all()
+    assert rows == [(1, "pre"), (2, "pre")]
+
+
+def test_upgrade__with_profile__expect_settings_applied_then_restored(
+    db_runner: MigrationRunner,
+) -> None:
+    def cache_size() -> int:
+        with db_runner.begin() as conn:
+            return int(conn.exec_driver_sql("PRAGMA cache_size").scalar_one())
+
+    seen = []
+    migration = Migration(name="bulk_load", revision=1)
+    migration.up = lambda: seen.append(cache_size())
+    migration.profile = "bulk"
+    db_runner.profiles["bulk"] = {"cache_size": -65536}
+    before = cache_size()
+
+    db_runner.upgrade(migration)
+
+    assert seen == [-65536]
+    assert cache_size() == before
+
+
+def test_upgrade__with_unknown_profile__expect_error(
+    db_runner: MigrationRunner,
+) -> None:
+    migration = Migration(name="bulk_load", revision=1)
+    migration.up = lambda: None
+    migration.profile = "missing"
+
+    with pytest.raises(ValueError, match="Unknown tuning profile 'missing'"):
+        db_runner.upgrade(migration)
+    assert list(db_runner.get_applied_versions()) == []
@@ -0,0 +1,138 @@
+import pytest
+from sqlalchemy import ForeignKey, Integer
+
+from pelican import change_table, create_table, drop_table, get_runner
+from pelican._types import MigrationBatchError
+from pelican.runner import MigrationRunner
+from pelican.scheduler import Footprint, build_graph, infer_footprint
+from tests.runner.conftest import make_migration
+
+
+def _create_users() -> None:
+    with create_table("users") as t:
+        t.string("name")
+
+
+def _create_posts() -> None:
+    with create_table("posts") as t:
+        t.references("user")
+
+
+def _change_comments() -> None:
+    with change_table("comments") as t:
+        t.text("body")
+
+
+def _drop_tags() -> None:
+    drop_table("tags")
+
+
+def _create_comments() -> None:
+    with create_table("comments") as t:
+        t.integer("post_id", ForeignKey("posts.id"))
+        t.column("author_id", Integer, ForeignKey("public.users.id"), nullable=True)
+
+
+def _create_likes(target: str) -> None:
+    with create_table("likes") as t:
+        t.integer("target_id", ForeignKey(target))
+
+
+def _raw_sql() -> None:
+    get_runner().execute(["UPDATE users SET name = 'x'"])
+
+
+def test_infer_footprint__with_create_table__expect_table_written() -> None:
+    assert infer_footprint(_create_users) == Footprint(frozenset({"users"}))
+
+
+def test_infer_footprint__with_references__expect_referenced_table_read() -> None:
+    assert infer_footprint(_create_posts) == Footprint(
+        frozenset({"posts"}), frozenset({"users"})
+    )
+
+
+def test_infer_footprint__with_foreign_keys__expect_referenced_tables_read() -> None:
+    assert infer_footprint(_create_comments) == Footprint(
+        frozenset({"comments"}), frozenset({"posts", "users"})
+    )
+
+
+def test_build_graph__with_foreign_key__expect_wait_for_target_table() -> None:
+    graph = build_graph(
+        [make_migration(1, _create_users), make_migration(2, _create_comments)]
+    )
+    assert graph == {1: set(), 2: {1}}
+
+
+def test_infer_footprint__with_computed_foreign_key__expect_unknown() -> None:
+    assert infer_footprint(_create_likes) is None
+
+
+def test_infer_footprint__with_drop_table__expect_table_written() -> None:
+    assert infer_footprint(_drop_tags) == Footprint(frozenset({"tags"}))
+
+
+def test_infer_footprint__with_raw_sql__expect_unknown() -> None:
+    assert infer_footprint(_raw_sql) is None
+
+
+def test_build_graph__expect_only_conflicting_migrations_ordered() -> None:
+    graph = build_graph(
+        [
+            make_migration(1, _create_users),
+            make_migration(2, _change_comments),
+            make_migration(3, _create_posts),
+            make_migration(4, _drop_tags),
+        ]
+    )
+
+    assert graph == {1: set(), 2: set(), 3: {1}, 4: set()}
+
+
+def test_build_graph__with_unknown_footprint__expect_barrier() -> None:
+    graph = build_graph(
+        [
+            make_migration(1, _create_users),
+            make_migration(2, _raw_sql),
+            make_migration(3, _drop_tags),
+        ]
+    )
+
+    assert graph == {1: set(), 2: {1}, 3: {2}}
+
+
+def test_build_graph__with_touches__expect_declared_tables_used() -> None:
+    raw = make_migration(2, _raw_sql)
+    raw.touches = frozenset({"audit_log"})
+
+    graph = build_graph([make_migration(1, _create_users), raw])
+
+    assert graph == {1: set(), 2: set()}
+
+
+def test_upgrade_parallel__on_sqlite__expect_all_applied_in_order(
+    db_runner: MigrationRunner,
+) -> None:
+    migrations = [make_migration(1, _create_users), make_migration(2, _drop_tags)]
+    migrations[1].up = lambda: None
+
+    applied = list(db_runner.upgrade_parallel(migrations, jobs=4))
+
+    assert [m.revision for m in applied] == [1, 2]
+    assert list(db_runner.get_applied_versions()) == [1, 2]
+
+
+def test_upgrade_parallel__with_failure__expect_batch_error(
+    db_runner: MigrationRunner,
+) -> None:
+    def fail() -> None:
+        raise RuntimeError("boom")
+
+    migrations = [make_migration(1, _create_users), make_migration(2, fail)]
+
+    with pytest.raises(MigrationBatchError) as info:
+        list(db_runner.upgrade_parallel(migrations))
+
+    assert info.value.migration.revision == 2
+    assert [m.revision for m in info.value.completed] == [1]
@@ -0,0 +1,127 @@
+import sqlite3
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import MetaData
+
+from pelican import get_runner, use_context
+from pelican._types import IntegrityCheckError, Migration, MigrationBatchError
+from pelican.runner import MigrationRunner
+from pelican.swap import fast_swap
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    path = tmp_path / "edge.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT);
+        INSERT INTO users VALUES (1, 'ada');
+        """)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def file_runner(db_path: Path) -> Generator[MigrationRunner, None, None]:
+    with use_context(database_url=f"sqlite:///{db_path}", metadata=MetaData()) as r:
+        r.get_applied_versions()
+        yield r
+        r.dispose()
+
+
+def _migration(revision: int, *statements: str) -> Migration:
+    migration = Migration(name=f"step_{revision}", revision=revision)
+    migration.up = lambda: get_runner().execute(list(statements))
+    return migration
+
+
+def _tables(path: Path) -> list[str]:
+    conn = sqlite3.connect(path)
+    try:
+        return [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+            )
+        ]
+    finally:
+        conn.close()
+
+
+def test_fast_swap__expect_migrated_copy_swapped_in(
+    file_runner: MigrationRunner, db_path: Path
+) -> None:
+    reader = sqlite3.connect(db_path)
+    reader.execute("BEGIN")
+    reader.execute("SELECT * FROM users").fetchall()
+
+    applied = list(
+        fast_swap(
+            file_runner,
+            [_migration(1, "CREATE TABLE posts (id INTEGER PRIMARY KEY)")],
+        )
+    )
+
+    assert [m.revision for m in applied] == [1]
+    assert "posts" in _tables(db_path)
+    assert list(file_runner.get_applied_versions()) == [1]
+    assert not db_path.with_name("edge.db.pelican-swap").exists()
+    # A reader that started before the swap keeps its view of the old file.
+    assert reader.execute(
+        "SELECT count(*) FROM sqlite_master WHERE name = 'posts'"
+    ).fetchone() == (0,)
+    reader.close()
+
+
+def test_fast_swap__with_failing_migration__expect_original_untouched(
+    file_runner: MigrationRunner, db_path: Path
+) -> None:
+    migrations = [
+        _migration(1, "CREATE TABLE posts (id INTEGER PRIMARY KEY)"),
+        _migration(2, "ALTER TABLE missing ADD COLUMN x INTEGER"),
+    ]
+
+    with pytest.raises(MigrationBatchError) as exc_info:
+        list(fast_swap(file_runner, migrations))
+
+    assert exc_info.value.migration.revision == 2
+    assert exc_info.value.completed == []
+    assert "posts" not in _tables(db_path)
+    assert list(file_runner.get_applied_versions()) == []
+    assert not db_path.with_name("edge.db.pelican-swap").exists()
+
+
+def test_fast_swap__with_foreign_key_violation__expect_integrity_error(
+    file_runner: MigrationRunner, db_path: Path
+) -> None:
+    migration = _migration(
+        1,
+        "CREATE TABLE posts (id INTEGER PRIMARY KEY, "
+        "user_id INTEGER REFERENCES users (id))",
+        "INSERT INTO posts VALUES (1, 42)",
+    )
+
+    with pytest.raises(IntegrityCheckError, match="references missing row in users"):
+        list(fast_swap(file_runner, [migration]))
+
+    assert "posts" not in _tables(db_path)
+
+
+def test_fast_swap__with_wal_database__expect_error(
+    file_runner: MigrationRunner, db_path: Path
+) -> None:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.close()
+
+    with pytest.raises(ValueError, match="WAL"):
+        list(fast_swap(file_runner, [_migration(1, "SELECT 1")]))
+
+
+def test_fast_swap__with_memory_database__expect_error(
+    db_runner: MigrationRunner,
+) -> None:
+    with pytest.raises(ValueError, match="SQLite database file"):
+        list(fast_swap(db_runner, []))
@@ -0,0 +1,116 @@
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from pelican import use_context
+from pelican.jobs import Worker, enqueue_job
+from pelican.migration import MigrationRegistry
+from pelican.runner import MigrationRunner
+from pelican.throttle import (
+    ActiveSessions,
+    SQLiteBusy,
+    SQLiteWalSize,
+    Throttler,
+)
+
+
+class _Readings:
+    def __init__(self, name: str, values: list[float]) -> None:
+        self.name = name
+        self._values: Iterator[float] = iter(values)
+
+    def sample(self, conn: Connection) -> float | None:
+        return next(self._values, 0.0)
+
+
+class _Broken:
+    name = "broken"
+
+    def sample(self, conn: Connection) -> float | None:
+        raise OperationalError("SELECT 1", {}, Exception("permission denied"))
+
+
+def test_pause__under_pressure__expect_backoff_and_smaller_batches(
+    db_runner: MigrationRunner,
+) -> None:
+    paused: list[tuple[list[str], float]] = []
+    waits: list[float] = []
+    throttler = Throttler(
+        [(_Readings("replication_lag", [12, 8, 1]), 5.0)],
+        on_pause=lambda exceeded, delay: paused.append((exceeded, delay)),
+    )
+
+    assert throttler.pause(db_runner, wait=waits.append)
+
+    assert waits == [1.0, 2.0]
+    assert paused[0] == (["replication_lag 12 > 5"], 1.0)
+    assert throttler.scaled(1000) == 250
+
+
+def test_pause__with_interrupting_wait__expect_false(
+    db_runner: MigrationRunner,
+) -> None:
+    throttler = Throttler([(_Readings("lock_waits", [9]), 1.0)])
+
+    assert not throttler.pause(db_runner, wait=lambda delay: True)
+
+
+def test_check__with_failing_signal__expect_skipped(
+    db_runner: MigrationRunner,
+) -> None:
+    throttler = Throttler([(_Broken(), 0.0), (_Readings("lock_waits", [3]), 1.0)])
+
+    assert throttler.check(db_runner) == ["lock_waits 3 > 1"]
+
+
+def test_from_limits__with_unknown_signal__expect_error() -> None:
+    with pytest.raises(ValueError, match="Unknown throttle signal"):
+        Throttler.from_limits({"cpu": 80})
+
+
+def test_postgresql_signal__on_sqlite__expect_unavailable(
+    db_runner: MigrationRunner,
+) -> None:
+    with db_runner.begin() as conn:
+        assert ActiveSessions().sample(conn) is None
+
+
+def test_sqlite_signals__with_wal_database__expect_sampled(tmp_path: Path) -> None:
+    with use_context(
+        database_url=f"sqlite:///{tmp_path / 'wal.db'}", metadata=MetaData()
+    ) as runner:
+        with runner.begin() as conn:
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+            conn.exec_driver_sql("INSERT INTO t VALUES (1)")
+
+        with runner.begin() as conn:
+            assert (SQLiteWalSize().sample(conn) or 0) > 0
+            assert SQLiteBusy().sample(conn) == 0
+
+
+def test_worker__with_throttler__expect_batch_size_scaled(
+    db_runner: MigrationRunner,
+) -> None:
+    sizes: list[int] = []
+
+    def backfill(conn: Connection, checkpoint: Any, batch_size: int) -> Any:
+        sizes.append(batch_size)
+        return None if checkpoint == 2 else (checkpoint or 0) + 1
+
+    registry = MigrationRegistry()
+    registry.register_job(1, "backfill", backfill)
+    enqueue_job(1, "backfill", {"batch_size": 1000})
+    throttler = Throttler(
+        [(_Readings("active_sessions", [50, 0, 50]), 10.0)], base_delay=0.0
+    )
+
+    worker = Worker(db_runner, registry, throttler=throttler)
+
+    assert worker.run(once=True) == 1
+    assert sizes == [500, 250, 500]
@@ -0,0 +1,234 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from pelican import change_table, create_table
+from pelican._types import LockContentionError, Migration
+from pelican.runner import MigrationRunner
+from pelican.watchdog import (
+    BlockedSession,
+    BlockingReport,
+    LockWatchdog,
+    Monitor,
+    Watch,
+)
+
+
+def _session(waiting_ms: float) -> BlockedSession:
+    return BlockedSession(
+        pid=42, state="active", query="SELECT 1", waiting_ms=waiting_ms
+    )
+
+
+def _contention() -> LockContentionError:
+    report = BlockingReport("ALTER TABLE crew ADD x int", 7, 120.0, [_session(100)])
+    return LockContentionError(report)
+
+
+def test_exceeded__with_too_many_sessions__expect_true() -> None:
+    watchdog = LockWatchdog(max_blocked=2)
+
+    assert not watchdog.exceeded([_session(0), _session(0)])
+    assert watchdog.exceeded([_session(0), _session(0), _session(0)])
+
+
+def test_exceeded__with_long_wait__expect_true() -> None:
+    watchdog = LockWatchdog(max_blocking_ms=500)
+
+    assert not watchdog.exceeded([_session(499)])
+    assert watchdog.exceeded([_session(501)])
+
+
+def test_lock_watchdog__without_thresholds__expect_error() -> None:
+    with pytest.raises(ValueError):
+        LockWatchdog()
+
+
+def test_delay__expect_exponential_backoff_capped() -> None:
+    watchdog = LockWatchdog(max_blocked=1, base_delay=1.0, max_delay=5.0)
+
+    assert [watchdog.delay(retry) for retry in range(4)] == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_watch__on_sqlite__expect_not_watched(db_runner: MigrationRunner) -> None:
+    watchdog = LockWatchdog(max_blocked=0)
+
+    with db_runner.begin() as conn:
+        with watchdog.watch(conn, "SELECT 1") as watch:
+            conn.exec_driver_sql("SELECT 1")
+
+    assert watch.report is None
+
+
+def test_upgrade__with_cancelled_statement__expect_migration_retried(
+    db_runner: MigrationRunner,
+) -> None:
+    attempts = []
+
+    def create_crew() -> None:
+        attempts.append(1)
+        with create_table("crew") as t:
+            t.string("name")
+        if len(attempts) == 1:
+            raise _contention()
+
+    migration = Migration(name="create_crew", revision=1)
+    migration.up = create_crew
+    db_runner.lock_watchdog = LockWatchdog(max_blocked=0, base_delay=0.0)
+
+    db_runner.upgrade(migration)
+
+    assert len(attempts) == 2
+    assert list(db_runner.get_applied_versions()) == [1]
+
+
+def test_upgrade__with_retries_exhausted__expect_lock_contention_error(
+    db_runner: MigrationRunner,
+) -> None:
+    attempts = []
+
+    def blocked() -> None:
+        attempts.append(1)
+        raise _contention()
+
+    migration = Migration(name="blocked", revision=1)
+    migration.up = blocked
+    db_runner.lock_watchdog = LockWatchdog(max_blocked=0, retries=2, base_delay=0.0)
+
+    with pytest.raises(LockContentionError, match="blocking 1 session"):
+        db_runner.upgrade(migration)
+
+    assert len(attempts) == 3
+    assert list(db_runner.get_applied_versions()) == []
+
+
+class _CancelledMonitor(Monitor):
+    @contextmanager
+    def watch(self, statement: str) -> Iterator[Watch]:
+        # As if the poll thread cancelled the statement while it ran
+        with super().watch(statement) as watch:
+            watch.report = BlockingReport(statement, 7, 120.0, [_session(100)])
+            yield watch
+
+
+class _CancellingWatchdog(LockWatchdog):
+    @contextmanager
+    def monitoring(self, conn: Connection) -> Iterator[Monitor]:
+        yield _CancelledMonitor(self, conn)
+
+
+def _failing_conn(orig: Exception) -> MagicMock:
+    conn = MagicMock()
+    conn.exec_driver_sql.side_effect = DBAPIError("ALTER TABLE crew", {}, orig)
+    return conn
+
+
+class _QueryCanceled(Exception):
+    pgcode = "57014"
+
+
+def test_run_statement__with_cancelled_statement__expect_lock_contention_error(
+    db_runner: MigrationRunner,
+) -> None:
+    watchdog = _CancellingWatchdog(max_blocked=0)
+    db_runner.lock_watchdog = watchdog
+
+    with pytest.raises(LockContentionError):
+        db_runner._run_statement(_failing_conn(_QueryCanceled()), "ALTER TABLE", {})
+
+    assert len(watchdog.reports) == 1
+
+
+def test_run_statement__with_report_and_other_error__expect_original_error(
+    db_runner: MigrationRunner,
+) -> None:
+    watchdog = _CancellingWatchdog(max_blocked=0)
+    db_runner.lock_watchdog = watchdog
+
+    with pytest.raises(DBAPIError) as excinfo:
+        db_runner._run_statement(_failing_conn(ValueError("boom")), "ALTER TABLE", {})
+
+    assert not isinstance(excinfo.value, LockContentionError)
+    assert watchdog.reports == []
+
+
+def test_upgrade__with_watchdog__expect_one_monitor_per_migration(
+    db_runner: MigrationRunner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    watchdog = LockWatchdog(max_blocked=0)
+    monitors: list[Monitor] = []
+    monitoring = watchdog.monitoring
+
+    @contextmanager
+    def counting(conn: Connection) -> Iterator[Monitor]:
+        with monitoring(conn) as monitor:
+            monitors.append(monitor)
+            yield monitor
+
+    monkeypatch.setattr(watchdog, "monitoring", counting)
+    db_runner.lock_watchdog = watchdog
+
+    def create_crew() -> None:
+        with create_table("crew") as t:
+            t.string("name")
+            t.index(["name"])
+        with change_table("crew") as t:
+            t.string("rank")
+
+    migration = Migration(name="create_crew", revision=1)
+    migration.up = create_crew
+    db_runner.upgrade(migration)
+
+    assert len(monitors) == 1
+
+
+def _monitor_connection(
+    watch: Watch, cancels: list[bool], cancelled: bool = True
+) -> MagicMock:
+    def execute(query: Any, params: dict[str, Any]) -> Any:
+        if "pg_cancel_backend" in str(query):
+            cancels.append(watch.report is not None)
+            return MagicMock(scalar=MagicMock(return_value=cancelled))
+        row = MagicMock(pid=42, state="active", query="SELECT 1", waiting_ms=10)
+        return [row]
+
+    monitor = MagicMock()
+    monitor.execute.side_effect = execute
+    return monitor
+
+
+def test_poll__with_cancellation__expect_report_before_cancel() -> None:
+    monitor = Monitor(LockWatchdog(max_blocked=0), MagicMock(), pid=7)
+    cancels: list[bool] = []
+
+    with monitor.watch("ALTER TABLE crew ADD x int") as watch:
+        monitor._poll(_monitor_connection(watch, cancels))
+
+    assert cancels == [True]
+    assert watch.report is not None
+    assert watch.report.pid == 7
+
+
+def test_poll__with_nothing_to_cancel__expect_report_dropped() -> None:
+    monitor = Monitor(LockWatchdog(max_blocked=0), MagicMock(), pid=7)
+    cancels: list[bool] = []
+
+    with monitor.watch("ALTER TABLE crew ADD x int") as watch:
+        monitor._poll(_monitor_connection(watch, cancels, cancelled=False))
+
+    assert cancels == [True]
+    assert watch.report is None
+
+
+def test_poll__without_watched_statement__expect_no_query() -> None:
+    monitor = Monitor(LockWatchdog(max_blocked=0), MagicMock(), pid=7)
+    connection = MagicMock()
+
+    monitor._poll(connection)
+
+    assert not connection.execute.called
@@ -1,26 +1,71 @@
 from collections.abc import Iterator
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Generator
+from typing import Any, Callable, Generator
 
 import pytest
 from click.testing import CliRunner
 
 import pelican.cli as cli_module
 from pelican.cli import cli
-from pelican.migration import Migration, MigrationRegistry
+from pelican.migration import (
+    IndexBuildError,
+    Migration,
+    MigrationBatchError,
+    MigrationRegistry,
+)
 from pelican._context import _active_runner, _active_registry
+from pelican.check import SchemaStatus
+from pelican.manifest import DEFAULT_MANIFEST_PATH
+from pelican.runner import MigrationRunner
 
 
-class _EmptyRunner:
+class _StubRunner:
     has_database_url = True
+    profiles: dict[str, dict[str, Any]] = {}
+    profile: str | None = None
+    get_profile = MigrationRunner.get_profile
+
+    @contextmanager
+    def connect(self) -> Iterator[None]:
+        yield
+
+    def upgrade(self, migration: Migration, **kwargs: Any) -> None:
+        pass
+
+    def downgrade(self, migration: Migration, **kwargs: Any) -> None:
+        pass
+
+    def upgrade_many(
+        self, migrations: list[Migration], **kwargs: Any
+    ) -> Iterator[Migration]:
+        return self._run(migrations, self.upgrade)
+
+    def downgrade_many(
+        self, migrations: list[Migration], **kwargs: Any
+    ) -> Iterator[Migration]:
+        return self._run(migrations, self.downgrade)
+
+    def _run(
+        self, migrations: list[Migration], step: Callable[[Migration], None]
+    ) -> Iterator[Migration]:
+        completed: list[Migration] = []
+        for migration in migrations:
+            try:
+                step(migration)
+            except Exception as e:
+                raise MigrationBatchError(migration, completed) from e
+            completed.append(migration)
+            yield migration
+
+
+class _EmptyRunner(_StubRunner):
 
     def get_applied_versions(self) -> Iterator[int]:
         return iter([])
 
 
-class _AppliedRunner:
-    has_database_url = True
+class _AppliedRunner(_StubRunner):
 
     def __init__(self, applied: list[int]) -> None:
         self._applied = applied
@@ -29,20 +74,31 @@ class _AppliedRunner:
         return iter(self._applied)
 
 
-class _SuccessRunner:
-    has_database_url = True
-
+class _SuccessRunner(_StubRunner):
     def __init__(self, applied: list[int] | None = None) -> None:
         self._applied = applied or []
+        self.upgraded: list[int] = []
+        self.downgraded: list[int] = []
 
     def get_applied_versions(self) -> Iterator[int]:
         return iter(self._applied)
 
-    def upgrade(self, migration: Migration) -> None:
-        pass
+    def upgrade(self, migration: Migration, **kwargs: Any) -> None:
+        self.upgraded.append(migration.revision)
 
-    def downgrade(self, migration: Migration) -> None:
-        pass
+    def downgrade(self, migration: Migration, **kwargs: Any) -> None:
+        self.downgraded.append(migration.revision)
+
+
+class _FailingRunner(_SuccessRunner):
+    def __init__(self, applied: list[int], fail_at: int) -> None:
+        super().__init__(applied)
+        self._fail_at = fail_at
+
+    def upgrade(self, migration: Migration, **kwargs: Any) -> None:
+        if migration.revision == self._fail_at:
+            raise RuntimeError("boom")
+        super().upgrade(migration)
 
 
 def _registry_with(*revisions: int) -> MigrationRegistry:
@@ -67,6 +123,7 @@ def _patch_context(
             _active_registry.reset(reg_token)
 
     monkeypatch.setattr(cli_module, "use_context", fake_use_context)
+    monkeypatch.setattr("pelican.jobs.get_jobs", lambda runner: [])
 
 
 @pytest.fixture(autouse=True)
@@ -75,7 +132,7 @@ def patch_loader(monkeypatch: pytest.MonkeyPatch) -> None:
     from pelican.registry import MigrationRegistry
 
     class _NoopLoader:
-        def load_migrations(self) -> MigrationRegistry:
+        def load_migrations(self, **kwargs: Any) -> MigrationRegistry:
             return get_registry()
 
     monkeypatch.setattr(cli_module, "loader", _NoopLoader())
@@ -184,3 +241,318 @@ def test_status__with_mixed_migrations__expect_correct_symbols(
     assert result.exit_code == 0
     assert "✓" in result.output
     assert "○" in result.output
+
+
+def _registry_with_phases(**phases: str) -> MigrationRegistry:
+    r = MigrationRegistry()
+    for key, phase in phases.items():
+        rev = int(key.removeprefix("r"))
+        r.register_up(rev, f"migration_{rev}", lambda: None, phase=phase)  # type: ignore[arg-type]
+    return r
+
+
+def test_status__with_pending_post_deploy__expect_listed_separately(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    registry = _registry_with_phases(r1="pre", r2="post", r3="pre")
+    _patch_context(monkeypatch, _AppliedRunner([1]), registry)
+
+    result = CliRunner().invoke(cli, ["status"])
+
+    assert result.exit_code == 0
+    assert "2 Migration 2 (post-deploy)" in result.output
+    assert "Pending: 1 pre-deploy, 1 post-deploy" in result.output
+
+
+def test_status__with_migration_files__expect_phases_without_import(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    from pelican import loader
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli_module, "loader", loader)
+    migrations_dir = tmp_path / "db" / "migrations"
+    migrations_dir.mkdir(parents=True)
+    (migrations_dir / "1_backfill.py").write_text(
+        "from pelican import migration\n\n"
+        "raise RuntimeError('imported')\n\n\n"
+        '@migration.up(phase="post")\n'
+        "def upgrade() -> None:\n"
+        "    pass\n"
+    )
+
+    result = CliRunner().invoke(
+        cli, ["--database-url", f"sqlite:///{tmp_path / 'app.db'}", "status"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "1 Backfill (post-deploy)" in result.output
+    assert "Pending: 0 pre-deploy, 1 post-deploy" in result.output
+
+
+def test_up__with_pre_phase__expect_post_deploy_skipped(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner()
+    registry = _registry_with_phases(r1="pre", r2="post", r3="pre")
+    _patch_context(monkeypatch, runner, registry)
+
+    result = CliRunner().invoke(cli, ["up", "--phase", "pre"])
+
+    assert result.exit_code == 0
+    assert runner.upgraded == [1, 3]
+
+
+def test_up__with_post_phase__expect_post_deploy_applied(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner(applied=[1, 3])
+    registry = _registry_with_phases(r1="pre", r2="post", r3="pre")
+    _patch_context(monkeypatch, runner, registry)
+
+    result = CliRunner().invoke(cli, ["up", "--phase", "post"])
+
+    assert result.exit_code == 0
+    assert runner.upgraded == [2]
+
+
+def test_up__with_post_phase_and_pending_pre__expect_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner()
+    registry = _registry_with_phases(r1="pre", r2="post")
+    _patch_context(monkeypatch, runner, registry)
+
+    result = CliRunner().invoke(cli, ["up", "--phase", "post"])
+
+    assert result.exit_code == 1
+    assert "--phase pre" in result.output
+    assert runner.upgraded == []
+
+
+def test_up__with_profile__expect_runner_default_set(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.pelican.profiles.bulk]\nmaintenance_work_mem = "1GB"\n'
+    )
+    runner = _SuccessRunner()
+    _patch_context(monkeypatch, runner, _registry_with(1))
+
+    result = CliRunner().invoke(cli, ["up", "--profile", "bulk"])
+
+    assert result.exit_code == 0
+    assert runner.profile == "bulk"
+    assert runner.upgraded == [1]
+
+
+def test_up__with_unknown_profile__expect_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner()
+    _patch_context(monkeypatch, runner, _registry_with(1))
+
+    result = CliRunner().invoke(cli, ["up", "--profile", "bulk"])
+
+    assert result.exit_code == 1
+    assert "Unknown tuning profile 'bulk'" in result.output
+    assert runner.upgraded == []
+
+
+def test_up__with_fast_swap_and_parallel__expect_usage_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner()
+    _patch_context(monkeypatch, runner, _registry_with(1))
+
+    result = CliRunner().invoke(cli, ["up", "--fast-swap", "--parallel", "2"])
+
+    assert result.exit_code == 2
+    assert runner.upgraded == []
+
+
+def test_up__with_analyze__expect_touched_tables_maintained(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class _MaintainedRunner(_SuccessRunner):
+        def maintain(self, *, vacuum: bool = False) -> list[str]:
+            self.vacuumed = vacuum
+            return ["users"]
+
+    runner = _MaintainedRunner()
+    _patch_context(monkeypatch, runner, _registry_with(1))
+
+    result = CliRunner().invoke(cli, ["up", "--analyze"])
+
+    assert result.exit_code == 0
+    assert runner.vacuumed is False
+    assert "Analyzed 1 table(s): users" in result.output
+
+
+def test_up__with_to__expect_applied_through_target(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner(applied=[1])
+    _patch_context(monkeypatch, runner, _registry_with(1, 2, 3, 4))
+
+    result = CliRunner().invoke(cli, ["up", "--to", "3"])
+
+    assert result.exit_code == 0
+    assert runner.upgraded == [2, 3]
+
+
+def test_up__with_failure__expect_stop_and_reached_revision(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _FailingRunner(applied=[1], fail_at=3)
+    _patch_context(monkeypatch, runner, _registry_with(1, 2, 3, 4))
+
+    result = CliRunner().invoke(cli, ["up"])
+
+    assert result.exit_code == 1
+    assert runner.upgraded == [2]
+    assert "Failed 3" in result.output
+    assert "boom" in result.output
+    assert "Stopped at revision 2." in result.output
+
+
+def test_up__with_failed_index_build__expect_applied_and_exit_1(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class _IndexFailingRunner(_SuccessRunner):
+        def upgrade_many(
+            self, migrations: list[Migration], **kwargs: Any
+        ) -> Iterator[Migration]:
+            yield from super().upgrade_many(migrations)
+            raise IndexBuildError({"users_email_idx": RuntimeError("boom")}, [])
+
+    runner = _IndexFailingRunner(applied=[1])
+    _patch_context(monkeypatch, runner, _registry_with(1, 2, 3))
+
+    result = CliRunner().invoke(cli, ["up"])
+
+    assert result.exit_code == 1
+    assert runner.upgraded == [2, 3]
+    assert "Applied 3" in result.output
+    assert "Failed to build index users_email_idx: boom" in result.output
+    assert "Stopped at" not in result.output
+
+
+def test_down__with_steps__expect_latest_rolled_back_in_order(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner(applied=[1, 2, 3, 4])
+    _patch_context(monkeypatch, runner, _registry_with(1, 2, 3, 4))
+
+    result = CliRunner().invoke(cli, ["down", "--steps", "3"])
+
+    assert result.exit_code == 0
+    assert runner.downgraded == [4, 3, 2]
+
+
+def test_down__with_to__expect_revisions_after_target_rolled_back(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _SuccessRunner(applied=[1, 2, 3])
+    _patch_context(monkeypatch, runner, _registry_with(1, 2, 3))
+
+    result = CliRunner().invoke(cli, ["down", "--to", "1"])
+
+    assert result.exit_code == 0
+    assert runner.downgraded == [3, 2]
+
+
+def test_down__with_revision_and_steps__expect_usage_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _patch_context(monkeypatch, _SuccessRunner(applied=[1]), _registry_with(1))
+
+    result = CliRunner().invoke(cli, ["down", "1", "--steps", "1"])
+
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize(
+    ("disk", "database", "exit_code"),
+    [(2, 2, 0), (None, None, 0), (3, 2, 1), (None, 2, 2), (2, 3, 2)],
+)
+def test_check__expect_exit_code_for_schema_state(
+    monkeypatch: pytest.MonkeyPatch,
+    disk: int | None,
+    database: int | None,
+    exit_code: int,
+) -> None:
+    _patch_context(monkeypatch, _EmptyRunner(), MigrationRegistry())
+    monkeypatch.setattr(
+        cli_module, "get_schema_status", lambda **kwargs: SchemaStatus(disk, database)
+    )
+
+    result = CliRunner().invoke(cli, ["check"])
+
+    assert result.exit_code == exit_code
+
+
+def test_check__with_pre_phase__expect_phase_passed(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    _patch_context(monkeypatch, _EmptyRunner(), MigrationRegistry())
+    calls = []
+
+    def get_schema_status(**kwargs: Any) -> SchemaStatus:
+        calls.append(kwargs)
+        return SchemaStatus(3, 2, 2)
+
+    monkeypatch.setattr(cli_module, "get_schema_status", get_schema_status)
+
+    result = CliRunner().invoke(cli, ["check", "--phase", "pre"])
+
+    assert result.exit_code == 0
+    assert calls == [{"phase": "pre", "manifest_path": DEFAULT_MANIFEST_PATH}]
+
+
+def test_check__without_database_url__expect_exit_2(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    runner = _EmptyRunner()
+    runner.has_database_url = False
+    _patch_context(monkeypatch, runner, MigrationRegistry())
+
+    result = CliRunner().invoke(cli, ["check"])
+
+    assert result.exit_code == 2
+
+
+def test_up__with_fast_swap_and_migration_files__expect_applied(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    import sqlite3
+
+    from pelican import loader
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cli_module, "loader", loader)
+    migrations_dir = tmp_path / "db" / "migrations"
+    migrations_dir.mkdir(parents=True)
+    (migrations_dir / "1_first.py").write_text(
+        "from pelican import create_table, migration\n\n\n"
+        "@migration.up\n"
+        "def upgrade() -> None:\n"
+        "    with create_table('users') as t:\n"
+        "        t.string('name')\n"
+    )
+    db_path = tmp_path / "edge.db"
+    sqlite3.connect(db_path).close()
+
+    result = CliRunner().invoke(
+        cli, ["--database-url", f"sqlite:///{db_path}", "up", "--fast-swap"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Applied 1" in result.output
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    finally:
+        conn.close()
+    assert "users" in tables
@@ -0,0 +1,178 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy.pool import NullPool
+
+from pelican.config import EngineConfig, load_config
+
+
+@pytest.fixture(autouse=True)
+def clean_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+
+@pytest.fixture
+def pyproject(tmp_path: Path) -> Path:
+    path = tmp_path / "pyproject.toml"
+    path.write_text(
+        "[tool.pelican.engine]\n"
+        'poolclass = "null"\n'
+        "pool_pre_ping = true\n"
+        'isolation_level = "AUTOCOMMIT"\n'
+        "connect_args = { timeout = 5 }\n"
+    )
+    return path
+
+
+def test_load_config__with_pyproject__expect_engine_options(
+    pyproject: Path, tmp_path: Path
+) -> None:
+    config = load_config(pyproject, tmp_path / ".env")
+
+    assert config.engine.to_engine_options() == {
+        "poolclass": NullPool,
+        "pool_pre_ping": True,
+        "isolation_level": "AUTOCOMMIT",
+        "connect_args": {"timeout": 5},
+    }
+
+
+def test_load_config__with_env_file__expect_override_and_database_url(
+    pyproject: Path, tmp_path: Path
+) -> None:
+    env_file = tmp_path / ".env"
+    env_file.write_text(
+        "DATABASE_URL=sqlite:///app.db\n"
+        "PELICAN_POOLCLASS=queue\n"
+        "PELICAN_POOL_SIZE=8\n"
+        "PELICAN_POOL_PRE_PING=false\n"
+    )
+
+    config = load_config(pyproject, env_file)
+
+    assert config.database_url == "sqlite:///app.db"
+    assert config.engine.poolclass == "queue"
+    assert config.engine.pool_size == 8
+    assert config.engine.pool_pre_ping is False
+
+
+def test_load_config__with_environment__expect_highest_precedence(
+    pyproject: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    env_file = tmp_path / ".env"
+    env_file.write_text("DATABASE_URL=sqlite:///file.db\nPELICAN_POOL_SIZE=8\n")
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///env.db")
+    monkeypatch.setenv("PELICAN_POOL_SIZE", "2")
+    monkeypatch.setenv("PELICAN_CONNECT_ARGS", '{"timeout": 1}')
+
+    config = load_config(pyproject, env_file)
+
+    assert config.database_url == "sqlite:///env.db"
+    assert config.engine.pool_size == 2
+    assert config.engine.connect_args == {"timeout": 1}
+
+
+def test_load_config__with_unrelated_prefixed_variables__expect_ignored(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    env_file = tmp_path / ".env"
+    env_file.write_text("PELICAN_THEME=dark\nPELICAN_POOL_SIZE=3\n")
+    monkeypatch.setenv("PELICAN_HOME", "/tmp")
+
+    config = load_config(tmp_path / "pyproject.toml", env_file)
+
+    assert config.engine.to_engine_options() == {"pool_size": 3}
+
+
+def test_load_config__without_files__expect_defaults(tmp_path: Path) -> None:
+    config = load_config(tmp_path / "pyproject.toml", tmp_path / ".env")
+
+    assert config.database_url is None
+    assert config.engine.to_engine_options() == {}
+
+
+@pytest.mark.parametrize(
+    "values",
+    [{"pool_size": "many"}, {"poolclass": "bogus"}, {"pool_pre_ping": "maybe"}],
+)
+def test_engine_config_update__with_invalid_value__expect_error(
+    values: dict[str, str],
+) -> None:
+    with pytest.raises(ValueError, match="Invalid value"):
+        EngineConfig().update(values, "test")
+
+
+def test_engine_config_update__with_unknown_option__expect_error() -> None:
+    with pytest.raises(ValueError, match="Unknown engine option"):
+        EngineConfig().update({"pool_sise": 5}, "test")
+
+
+def test_load_config__with_worker_table__expect_worker_options(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "pyproject.toml"
+    path.write_text(
+        "[tool.pelican.worker]\n" 'windows = ["22:00-06:00"]\n' "poll_interval = 1\n"
+    )
+
+    config = load_config(path, tmp_path / ".env")
+
+    assert config.worker.windows == ["22:00-06:00"]
+    assert config.worker.poll_interval == 1.0
+    assert config.worker.lease == 600.0
+
+
+def test_load_config__with_unknown_worker_option__expect_error(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "pyproject.toml"
+    path.write_text("[tool.pelican.worker]\nthreads = 4\n")
+
+    with pytest.raises(ValueError, match="Unknown worker option"):
+        load_config(path, tmp_path / ".env")
+
+
+def test_load_config__with_throttle_table__expect_limits(tmp_path: Path) -> None:
+    path = tmp_path / "pyproject.toml"
+    path.write_text("[tool.pelican.throttle]\nreplication_lag = 5\nmax_delay = 30\n")
+
+    config = load_config(path, tmp_path / ".env")
+
+    assert config.throttle.limits == {"replication_lag": 5.0}
+    assert config.throttle.max_delay == 30.0
+
+
+def test_load_config__with_watchdog_table__expect_enabled(tmp_path: Path) -> None:
+    path = tmp_path / "pyproject.toml"
+    path.write_text("[tool.pelican.watchdog]\nmax_blocked = 5\nretries = 1\n")
+
+    config = load_config(path, tmp_path / ".env")
+
+    assert config.watchdog.enabled
+    assert (config.watchdog.max_blocked, config.watchdog.retries) == (5, 1)
+    assert not load_config(tmp_path / "none.toml", tmp_path / ".env").watchdog.enabled
+
+
+def test_load_config__with_profiles__expect_settings_by_name(tmp_path: Path) -> None:
+    path = tmp_path / "pyproject.toml"
+    path.write_text(
+        "[tool.pelican.profiles.bulk]\n"
+        'maintenance_work_mem = "2GB"\n'
+        "synchronous_commit = false\n"
+    )
+
+    config = load_config(path, tmp_path / ".env")
+
+    assert config.profiles == {
+        "bulk": {"maintenance_work_mem": "2GB", "synchronous_commit": False}
+    }
+
+
+def test_load_config__with_invalid_profile_value__expect_error(
+    tmp_path: Path,
+) -> None:
+    path = tmp_path / "pyproject.toml"
+    path.write_text("[tool.pelican.profiles.bulk]\nwork_mem = [1, 2]\n")
+
+    with pytest.raises(ValueError, match="profile 'bulk'"):
+        load_config(path, tmp_path / ".env")
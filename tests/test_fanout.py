@@ -0,0 +1,154 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from click.testing import CliRunner
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Connection
+
+import pelican.cli as cli_module
+from pelican import bulk_insert, create_table
+from pelican.cli import cli
+from pelican.fanout import fan_out, read_targets
+from pelican.migration import MigrationRegistry
+from pelican.throttle import Throttler
+
+
+@pytest.fixture
+def shard_registry() -> MigrationRegistry:
+    registry = MigrationRegistry()
+
+    def create_users() -> None:
+        with create_table("users") as t:
+            t.string("name")
+
+    def create_orders() -> None:
+        with create_table("orders") as t:
+            t.integer("total")
+
+    registry.register_up(1, "create_users", create_users)
+    registry.register_up(2, "create_orders", create_orders)
+    return registry
+
+
+def _shards(tmp_path: Path, count: int) -> list[str]:
+    return [f"sqlite:///{tmp_path / f'shard_{i}.db'}" for i in range(count)]
+
+
+def _tables(url: str) -> set[str]:
+    engine = create_engine(url)
+    try:
+        return set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+
+
+_BROKEN_TARGET = "sqlite:////nonexistent/directory/shard.db"
+
+
+def test_fan_out__expect_every_target_migrated(
+    shard_registry: MigrationRegistry, tmp_path: Path
+) -> None:
+    targets = _shards(tmp_path, 5)
+
+    results = fan_out(targets, shard_registry, jobs=3)
+
+    assert [r.status for r in results] == ["applied"] * 5
+    assert all(r.applied == [1, 2] for r in results)
+    assert all({"users", "orders"} <= _tables(url) for url in targets)
+
+
+class _Sampled:
+    name = "lock_waits"
+
+    def __init__(self) -> None:
+        self.databases: set[str] = set()
+
+    def sample(self, conn: Connection) -> float | None:
+        self.databases.add(str(conn.engine.url))
+        return 0.0
+
+
+def test_fan_out__with_throttler__expect_bulk_insert_throttled_per_target(
+    tmp_path: Path,
+) -> None:
+    registry = MigrationRegistry()
+
+    def load_users() -> None:
+        with create_table("users") as t:
+            t.string("name")
+        bulk_insert("users", [{"name": "a"}, {"name": "b"}], batch_size=1)
+
+    registry.register_up(1, "load_users", load_users)
+    signal = _Sampled()
+    targets = _shards(tmp_path, 2)
+
+    results = fan_out(targets, registry, throttler=Throttler([(signal, 1.0)]))
+
+    assert [r.status for r in results] == ["applied"] * 2
+    assert signal.databases == set(targets)
+
+
+def test_fan_out__with_migrated_targets__expect_up_to_date(
+    shard_registry: MigrationRegistry, tmp_path: Path
+) -> None:
+    targets = _shards(tmp_path, 2)
+    fan_out(targets, shard_registry, up_to=1)
+
+    results = fan_out(targets, shard_registry)
+    again = fan_out(targets, shard_registry)
+
+    assert [r.applied for r in results] == [[2], [2]]
+    assert [r.status for r in again] == ["up-to-date", "up-to-date"]
+
+
+def test_fan_out__with_failing_canary__expect_others_skipped(
+    shard_registry: MigrationRegistry, tmp_path: Path
+) -> None:
+    targets = [_BROKEN_TARGET, *_shards(tmp_path, 3)]
+
+    results = fan_out(targets, shard_registry, jobs=2, canary=True)
+
+    assert [r.status for r in results] == ["failed", "skipped", "skipped", "skipped"]
+    assert results[0].error is not None
+
+
+def test_fan_out__with_failure__expect_no_new_targets_started(
+    shard_registry: MigrationRegistry, tmp_path: Path
+) -> None:
+    first, last = _shards(tmp_path, 2)
+
+    results = fan_out([first, _BROKEN_TARGET, last], shard_registry, jobs=1)
+
+    assert [r.status for r in results] == ["applied", "failed", "skipped"]
+
+
+def test_read_targets__expect_comments_and_blanks_ignored(tmp_path: Path) -> None:
+    targets_file = tmp_path / "shards.txt"
+    targets_file.write_text("# shards\nsqlite:///a.db\n\n  sqlite:///b.db  \n")
+
+    assert read_targets(targets_file) == ["sqlite:///a.db", "sqlite:///b.db"]
+
+
+def test_up__with_targets__expect_report_and_exit_code(
+    shard_registry: MigrationRegistry,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class _Loader:
+        def load_migrations(self, **kwargs: Any) -> MigrationRegistry:
+            return shard_registry
+
+    monkeypatch.setattr(cli_module, "loader", _Loader())
+    targets_file = tmp_path / "shards.txt"
+    targets_file.write_text("\n".join(_shards(tmp_path, 2)))
+
+    result = CliRunner().invoke(cli, ["up", "--targets", str(targets_file)])
+
+    assert result.exit_code == 0
+    assert "2 migrated, 0 up to date, 0 failed, 0 skipped" in result.output
+
+    targets_file.write_text(_BROKEN_TARGET)
+    result = CliRunner().invoke(cli, ["up", "--targets", str(targets_file)])
+
+    assert result.exit_code == 1
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from pelican.runner import MigrationRunner
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+_PROBE = """
+import sys
+from click.testing import CliRunner
+from pelican.cli import cli
+
+result = CliRunner().invoke(cli, {args!r})
+assert result.exit_code == 0, result.output
+loaded = sorted(m for m in sys.modules if m.split(".")[0] in {{"sqlalchemy", "sqlmodel"}} or m.startswith(("pelican.runner", "pelican.diff")))
+print(",".join(loaded))
+"""
+
+
+def _modules_loaded_by(args: list[str], cwd: str) -> list[str]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(args=args)],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(_PROJECT_ROOT)},
+    ).stdout.strip()
+    return [module for module in output.split(",") if module]
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["--help"], ["init"], ["generate", "create_users"]],
+)
+def test_cli__without_database_work__expect_no_heavy_imports(
+    args: list[str], tmp_path: Path
+) -> None:
+    assert _modules_loaded_by(args, str(tmp_path)) == []
+
+
+def test_import_pelican__expect_schema_helpers_resolved_lazily() -> None:
+    import pelican
+
+    assert pelican.create_table.__module__ == "pelican.schema.helpers"
+    assert "MigrationRunner" in dir(pelican)
+
+
+def test_runner__expect_engine_created_on_first_use() -> None:
+    runner = MigrationRunner(database_url="sqlite:///:memory:")
+
+    assert runner._engine is None
+    assert runner.engine is runner.engine
+
+
+def test_runner__with_unsupported_dialect__expect_error_at_configuration() -> None:
+    with pytest.raises(ValueError, match="Unsupported dialect"):
+        MigrationRunner(database_url="mysql://localhost/db")
@@ -0,0 +1,229 @@
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from click.testing import CliRunner
+from sqlalchemy import MetaData, text
+from sqlalchemy.engine import Connection
+
+import pelican.cli as cli_module
+from pelican import use_context
+from pelican.cli import cli
+from pelican.jobs import RunWindow, Worker, enqueue_job, get_jobs
+from pelican.migration import Migration, MigrationRegistry
+from pelican.runner import MigrationRunner
+
+
+@pytest.fixture
+def job_runner() -> Generator[MigrationRunner, None, None]:
+    with use_context(database_url="sqlite:///:memory:", metadata=MetaData()) as runner:
+        with runner.begin() as conn:
+            conn.execute(
+                text("CREATE TABLE items (id INTEGER PRIMARY KEY, seen INTEGER)")
+            )
+            for i in range(1, 8):
+                conn.execute(text("INSERT INTO items VALUES (:id, 0)"), {"id": i})
+        yield runner
+
+
+def _mark_seen(conn: Connection, checkpoint: Any, batch_size: int = 3) -> Any:
+    ids = (
+        conn.execute(
+            text("SELECT id FROM items WHERE id > :last ORDER BY id LIMIT :n"),
+            {"last": checkpoint or 0, "n": batch_size},
+        )
+        .scalars()
+        .all()
+    )
+    if not ids:
+        return None
+    conn.execute(
+        text("UPDATE items SET seen = 1 WHERE id BETWEEN :lo AND :hi"),
+        {"lo": ids[0], "hi": ids[-1]},
+    )
+    return ids[-1]
+
+
+def _always_fails(conn: Connection, checkpoint: Any) -> Any:
+    raise RuntimeError("boom")
+
+
+def _registry_with_job(func: Any) -> MigrationRegistry:
+    registry = MigrationRegistry()
+    registry.register_up(1, "backfill", lambda: None)
+    registry.register_job(1, "backfill", func)
+    return registry
+
+
+class _Loader:
+    def __init__(self, registry: MigrationRegistry) -> None:
+        self.registry = registry
+
+    def load_migrations(self, **kwargs: Any) -> MigrationRegistry:
+        return self.registry
+
+
+def test_run_window__wrapping_midnight__expect_night_hours_only() -> None:
+    window = RunWindow.parse("22:00-06:00")
+
+    assert time(23, 30) in window
+    assert time(5, 59) in window
+    assert time(12, 0) not in window
+
+
+def test_run_window__with_invalid_value__expect_error() -> None:
+    with pytest.raises(ValueError, match="Invalid run window"):
+        RunWindow.parse("nightly")
+
+
+def test_enqueue_job__in_migration__expect_queued_with_migration(
+    job_runner: MigrationRunner,
+) -> None:
+    migration = Migration(name="backfill", revision=1)
+    migration.up = lambda: enqueue_job(1, "_mark_seen", {"batch_size": 2})
+
+    job_runner.upgrade(migration)
+
+    [job] = get_jobs(job_runner)
+    assert (job.revision, job.name, job.status) == (1, "_mark_seen", "pending")
+    assert job.args == {"batch_size": 2}
+
+
+def test_enqueue_job__in_failed_migration__expect_rolled_back(
+    job_runner: MigrationRunner,
+) -> None:
+    def upgrade() -> None:
+        enqueue_job(1, "_mark_seen")
+        raise RuntimeError("boom")
+
+    migration = Migration(name="backfill", revision=1)
+    migration.up = upgrade
+
+    with pytest.raises(RuntimeError):
+        job_runner.upgrade(migration)
+
+    with job_runner.begin() as conn:
+        assert conn.execute(text("SELECT count(*) FROM pelican_job")).scalar() == 0
+
+
+def test_worker_run__expect_job_done_in_checkpointed_batches(
+    job_runner: MigrationRunner,
+) -> None:
+    enqueue_job(1, "_mark_seen", {"batch_size": 3})
+    checkpoints: list[Any] = []
+
+    def mark_seen(conn: Connection, checkpoint: Any, batch_size: int) -> Any:
+        checkpoints.append(checkpoint)
+        return _mark_seen(conn, checkpoint, batch_size)
+
+    mark_seen.__name__ = "_mark_seen"
+    worker = Worker(job_runner, _registry_with_job(mark_seen))
+
+    assert worker.run(once=True) == 1
+
+    assert checkpoints == [None, 3, 6, 7]
+    [job] = get_jobs(job_runner)
+    assert job.status == "done"
+    with job_runner.begin() as conn:
+        assert conn.execute(text("SELECT min(seen) FROM items")).scalar() == 1
+
+
+def test_worker_run__with_failing_job__expect_retried_then_failed(
+    job_runner: MigrationRunner,
+) -> None:
+    enqueue_job(1, "_always_fails", max_attempts=2)
+    worker = Worker(
+        job_runner, _registry_with_job(_always_fails), retry_delay=timedelta(0)
+    )
+    reported: list[str] = []
+
+    worker.run(once=True, on_job=lambda job: reported.append(job.status))
+
+    assert reported == ["pending", "failed"]
+    [job] = get_jobs(job_runner)
+    assert job.attempts == 2
+    assert job.last_error == "RuntimeError: boom"
+
+
+def test_worker_run__outside_window__expect_nothing_claimed(
+    job_runner: MigrationRunner,
+) -> None:
+    enqueue_job(1, "_mark_seen")
+    worker = Worker(
+        job_runner,
+        _registry_with_job(_mark_seen),
+        windows=[RunWindow.parse("01:00-02:00")],
+        clock=lambda: datetime(2025, 1, 1, 12, 0),
+    )
+
+    assert worker.run(once=True) == 0
+    assert get_jobs(job_runner)[0].status == "pending"
+
+
+def test_worker_claim__with_abandoned_job__expect_reclaimed(
+    job_runner: MigrationRunner,
+) -> None:
+    enqueue_job(1, "_mark_seen")
+    registry = _registry_with_job(_mark_seen)
+    now = datetime.now()
+
+    crashed = Worker(job_runner, registry, worker_id="crashed", clock=lambda: now)
+    assert crashed.claim() is not None
+
+    later = Worker(
+        job_runner,
+        registry,
+        worker_id="later",
+        clock=lambda: now + timedelta(minutes=5),
+        lease=timedelta(minutes=10),
+    )
+    assert later.claim() is None
+
+    much_later = Worker(
+        job_runner,
+        registry,
+        worker_id="much_later",
+        clock=lambda: now + timedelta(minutes=11),
+    )
+    job = much_later.claim()
+    assert job is not None
+    assert much_later.run_job(job).status == "done"
+
+
+def test_cli_worker__with_once__expect_jobs_run_and_listed_in_status(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    monkeypatch.setattr(
+        cli_module, "loader", _Loader(_registry_with_job(_always_fails))
+    )
+    with use_context(database_url=url, metadata=MetaData()):
+        enqueue_job(1, "_always_fails", max_attempts=1)
+
+    result = CliRunner().invoke(cli, ["--database-url", url, "worker", "--once"])
+
+    assert result.exit_code == 0
+    assert "1 _always_fails [1] failed (attempt 1/1, RuntimeError: boom)" in (
+        result.output
+    )
+    assert "0 job(s) finished." in result.output
+
+    result = CliRunner().invoke(cli, ["--database-url", url, "status"])
+
+    assert "Background Jobs" in result.output
+    assert "_always_fails [1] failed" in result.output
+
+
+def test_cli_worker__with_invalid_window__expect_usage_error(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(cli_module, "loader", _Loader(MigrationRegistry()))
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+
+    result = CliRunner().invoke(
+        cli, ["--database-url", url, "worker", "--once", "--window", "nightly"]
+    )
+
+    assert result.exit_code == 2
+    assert "Invalid run window" in result.output
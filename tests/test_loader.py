@@ -4,6 +4,7 @@ import pytest
 
 from pelican.loader import (
     discover_migration_files,
+    get_head_revision,
     load_migration_file,
     load_migrations,
 )
@@ -111,3 +112,67 @@ def test_load_migrations__with_empty_directory__expect_empty_registry(
 def test_load_migrations__with_missing_directory__expect_error(tmp_path: Path) -> None:
     with pytest.raises(FileNotFoundError):
         load_migrations(tmp_path / "nonexistent")
+
+
+def test_load_migrations__expect_modules_not_imported(
+    tmp_path: Path, registry: MigrationRegistry
+) -> None:
+    (tmp_path / "1_create_users.py").write_text("raise RuntimeError('imported')\n")
+
+    load_migrations(tmp_path)
+
+    migration = registry.get(1)
+    assert migration is not None
+    assert migration.name == "create_users"
+    assert not migration.is_loaded
+
+
+def test_load_migrations__when_up_accessed__expect_module_imported(
+    tmp_path: Path, registry: MigrationRegistry
+) -> None:
+    (tmp_path / "1_create_users.py").write_text(_MIGRATION_TEMPLATE)
+    (tmp_path / "2_add_email.py").write_text(_MIGRATION_TEMPLATE)
+
+    load_migrations(tmp_path)
+    first, second = registry.get(1), registry.get(2)
+    assert first is not None and second is not None
+
+    assert first.up is not None
+    assert first.is_loaded
+    assert not second.is_loaded
+
+
+def test_load_migrations__with_private_files__expect_skipped(
+    tmp_path: Path, registry: MigrationRegistry
+) -> None:
+    (tmp_path / "__init__.py").write_text("")
+    (tmp_path / "1_create_users.py").write_text(_MIGRATION_TEMPLATE)
+
+    load_migrations(tmp_path)
+
+    assert len(registry) == 1
+
+
+def test_load_migrations__with_invalid_file_name__expect_error(
+    tmp_path: Path, registry: MigrationRegistry
+) -> None:
+    (tmp_path / "create_users.py").write_text(_MIGRATION_TEMPLATE)
+
+    with pytest.raises(ValueError, match="Invalid migration file name"):
+        load_migrations(tmp_path)
+
+
+# --- get_head_revision ---
+
+
+def test_get_head_revision__expect_highest_revision(tmp_path: Path) -> None:
+    (tmp_path / "2025").mkdir()
+    (tmp_path / "1_create_users.py").write_text("raise RuntimeError")
+    (tmp_path / "2025" / "30_add_email.py").write_text("raise RuntimeError")
+    (tmp_path / "4_add_name.py").write_text("raise RuntimeError")
+
+    assert get_head_revision(tmp_path) == 30
+
+
+def test_get_head_revision__with_empty_directory__expect_none(tmp_path: Path) -> None:
+    assert get_head_revision(tmp_path) is None
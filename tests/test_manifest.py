@@ -0,0 +1,155 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import pelican.manifest as manifest_module
+from pelican.loader import discover_migration_files, load_migrations
+from pelican.manifest import Manifest, find_phase
+from pelican.migration import MigrationRegistry
+
+_MIGRATION_TEMPLATE = """\
+from pelican import migration
+
+@migration.up
+def upgrade():
+    pass
+
+@migration.down()
+def downgrade():
+    pass
+"""
+
+_UP_ONLY_TEMPLATE = """\
+from pelican.migration import up
+
+@up
+def upgrade():
+    pass
+"""
+
+
+@pytest.fixture
+def migrations_dir(tmp_path: Path) -> Path:
+    directory = tmp_path / "migrations"
+    (directory / "2025").mkdir(parents=True)
+    (directory / "1_create_users.py").write_text(_MIGRATION_TEMPLATE)
+    (directory / "2025" / "2_add_email.py").write_text(_UP_ONLY_TEMPLATE)
+    return directory
+
+
+@pytest.fixture
+def manifest_path(tmp_path: Path) -> Path:
+    return tmp_path / ".pelican" / "manifest"
+
+
+def test_open__expect_entries_indexed(
+    migrations_dir: Path, manifest_path: Path
+) -> None:
+    manifest = Manifest.open(migrations_dir, manifest_path)
+
+    entries = list(manifest)
+    assert [(e.revision, e.name, e.path) for e in entries] == [
+        (1, "create_users", "1_create_users.py"),
+        (2, "add_email", "2025/2_add_email.py"),
+    ]
+    assert (entries[0].has_up, entries[0].has_down) == (True, True)
+    assert (entries[1].has_up, entries[1].has_down) == (True, False)
+    assert [e.phase for e in entries] == ["pre", "pre"]
+    assert manifest_path.exists()
+
+
+def test_open__with_unchanged_files__expect_no_rehash(
+    migrations_dir: Path, manifest_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    Manifest.open(migrations_dir, manifest_path)
+
+    def fail(*args: object) -> None:
+        raise AssertionError("file was re-indexed")
+
+    monkeypatch.setattr(manifest_module, "_index_file", fail)
+
+    assert len(Manifest.open(migrations_dir, manifest_path)) == 2
+
+
+def test_refresh__with_modified_file__expect_reparsed(
+    migrations_dir: Path, manifest_path: Path
+) -> None:
+    Manifest.open(migrations_dir, manifest_path)
+    (migrations_dir / "2025" / "2_add_email.py").write_text(
+        _UP_ONLY_TEMPLATE.replace("@up", '@up(phase="post")')
+    )
+
+    manifest = Manifest.open(migrations_dir, manifest_path)
+
+    entry = manifest.entries["2025/2_add_email.py"]
+    assert entry.phase == "post"
+
+
+def test_refresh__with_touched_file__expect_hash_reused(
+    migrations_dir: Path, manifest_path: Path
+) -> None:
+    before = Manifest.open(migrations_dir, manifest_path).entries["1_create_users.py"]
+    os.utime(migrations_dir / "1_create_users.py", ns=(0, 0))
+
+    after = Manifest.open(migrations_dir, manifest_path).entries["1_create_users.py"]
+
+    assert after.mtime_ns == 0
+    assert after.sha256 == before.sha256
+
+
+def test_refresh__with_deleted_file__expect_entry_removed(
+    migrations_dir: Path, manifest_path: Path
+) -> None:
+    Manifest.open(migrations_dir, manifest_path)
+    (migrations_dir / "1_create_users.py").unlink()
+
+    manifest = Manifest.open(migrations_dir, manifest_path)
+
+    assert list(manifest.entries) == ["2025/2_add_email.py"]
+
+
+def test_open__with_unwritable_manifest__expect_entries_in_memory(
+    migrations_dir: Path, tmp_path: Path
+) -> None:
+    (tmp_path / "readonly").write_text("")
+    manifest_path = tmp_path / "readonly" / "manifest"
+
+    manifest = Manifest.open(migrations_dir, manifest_path)
+
+    assert [e.revision for e in manifest] == [1, 2]
+    assert not manifest_path.exists()
+
+
+def test_discover_migration_files__with_subdirectories__expect_nested_files(
+    migrations_dir: Path,
+) -> None:
+    files = discover_migration_files(migrations_dir)
+
+    assert set(files) == {Path("1_create_users.py"), Path("2025/2_add_email.py")}
+
+
+def test_load_migrations__with_manifest__expect_registered_without_import(
+    migrations_dir: Path, manifest_path: Path, registry: MigrationRegistry
+) -> None:
+    load_migrations(migrations_dir, manifest_path=manifest_path)
+
+    assert [m.revision for m in registry] == [1, 2]
+    assert not any(m.is_loaded for m in registry)
+
+
+@pytest.mark.parametrize(
+    ("decorator", "phase"),
+    [
+        ("@migration.up", "pre"),
+        ("@migration.up()", "pre"),
+        ('@migration.up(phase="post")', "post"),
+        ('@migration.up(phase="post", profile="bulk")', "post"),
+        ("@migration.up(phase=PHASE)", "pre"),
+    ],
+)
+def test_find_phase__with_decorator__expect_declared_phase(
+    decorator: str, phase: str
+) -> None:
+    source = f"from pelican import migration\n\n{decorator}\ndef upgrade():\n    pass\n"
+    assert find_phase(source.encode()) == phase
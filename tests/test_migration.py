@@ -9,6 +9,7 @@ from pelican.migration import (
     DuplicateMigrationError,
     up,
     down,
+    job,
 )
 
 
@@ -100,3 +101,102 @@ def test_registry_iter__expect_sorted_by_revision(registry: MigrationRegistry) -
     revisions = [m.revision for m in registry]
     assert revisions == [1, 2, 3]
     assert len(registry) == 3
+
+
+@pytest.fixture
+def populated_registry(registry: MigrationRegistry) -> MigrationRegistry:
+    for revision in [40, 10, 30, 20]:
+        registry.register_up(revision, f"step_{revision}", lambda: None)
+    return registry
+
+
+def test_registry_between__expect_inclusive_range(
+    populated_registry: MigrationRegistry,
+) -> None:
+    revisions = [m.revision for m in populated_registry.between(15, 30)]
+    assert revisions == [20, 30]
+
+
+def test_registry_after__expect_newer_revisions(
+    populated_registry: MigrationRegistry,
+) -> None:
+    assert [m.revision for m in populated_registry.after(20)] == [30, 40]
+    assert populated_registry.after(40) == []
+
+
+def test_registry_latest__expect_highest_revision(
+    populated_registry: MigrationRegistry,
+) -> None:
+    latest = populated_registry.latest()
+    assert latest is not None
+    assert latest.revision == 40
+    assert MigrationRegistry().latest() is None
+
+
+def test_registry_pending__expect_unapplied_in_order(
+    populated_registry: MigrationRegistry,
+) -> None:
+    pending = populated_registry.pending([10, 30, 99])
+    assert [m.revision for m in pending] == [20, 40]
+
+
+def test_registry_register__with_duplicate_revision__expect_error(
+    registry: MigrationRegistry,
+) -> None:
+    registry.register(Migration(name="first", revision=1))
+
+    with pytest.raises(DuplicateMigrationError):
+        registry.register(Migration(name="second", revision=1))
+
+
+def test_migration__expect_slots_without_instance_dict() -> None:
+    migration = Migration(name="init", revision=1)
+    assert not hasattr(migration, "__dict__")
+
+
+def test_up_decorator__with_post_phase__expect_phase_recorded(
+    registry: MigrationRegistry, migration_func: Callable
+) -> None:
+    up(phase="post")(migration_func)
+
+    migration = registry.get(1)
+    assert migration is not None
+    assert migration.phase == "post"
+    assert migration.up is migration_func
+
+
+def test_up_decorator__with_profile__expect_profile_recorded(
+    registry: MigrationRegistry, migration_func: Callable
+) -> None:
+    up(profile="bulk")(migration_func)
+
+    migration = registry.get(1)
+    assert migration is not None
+    assert migration.profile == "bulk"
+
+
+def test_up_decorator__with_invalid_phase__expect_error(
+    registry: MigrationRegistry, migration_func: Callable
+) -> None:
+    with pytest.raises(ValueError, match="Invalid migration phase"):
+        up(phase="later")(migration_func)  # type: ignore[call-overload]
+
+
+def test_registry_pending__with_phase__expect_only_that_phase() -> None:
+    registry = MigrationRegistry()
+    registry.register_up(1, "create_users", lambda: None)
+    registry.register_up(2, "index_users", lambda: None, phase="post")
+    registry.register_up(3, "add_email", lambda: None)
+
+    assert [m.revision for m in registry.pending([], "pre")] == [1, 3]
+    assert [m.revision for m in registry.pending([1], "post")] == [2]
+
+
+def test_job_decorator__expect_job_registered_by_name(
+    registry: MigrationRegistry, migration_func: Callable
+) -> None:
+    assert job(migration_func) is migration_func
+
+    migration = registry.get(1)
+    assert migration is not None
+    assert migration.jobs == {"func": migration_func}